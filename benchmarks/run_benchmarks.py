@@ -0,0 +1,353 @@
+"""
+Benchmark suite with regression gates for the nex_ai hot paths.
+
+Times package import (startup), signal generation, dataset construction,
+model training/prediction and ingestion on synthetic series of 1e3 to 1e7 points,
+pair-snapshot parsing (raw dicts vs PairSnapshot vs structured array, with
+memory per snapshot reported alongside) and screener index builds and queries.
+Ingestion runs against a local mock HTTP server that serves the recorded
+Dexscreener payloads in `benchmarks/fixtures/`.
+
+Usage:
+    python benchmarks/run_benchmarks.py                   # compare against the baseline
+    python benchmarks/run_benchmarks.py --update-baseline # record a new baseline
+    python benchmarks/run_benchmarks.py --max-size 10000000 --only signals
+
+Results are compared with the JSON baseline (`benchmarks/baseline.json` by
+default). The run fails (exit code 1) when a benchmark is slower than
+`threshold` times its baseline, and with exit code 2 when there is no baseline
+to compare against. Baselines are machine specific, so none is committed:
+record one with `--update-baseline` on the machine that runs the gate (in CI,
+restore it from the runner's cache or a previous job's artifact).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCHMARK_DIR, os.pardir, 'src')
+sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+
+from nex_ai import data_ingestion, models, pipeline, screener, signal_generation
+
+FIXTURE_PATH = os.path.join(BENCHMARK_DIR, 'fixtures', 'dexscreener_tokens_v1.json')
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 1.5 # Fail when more than 50% slower than the baseline
+MIN_REGRESSION_SECONDS = 0.005 # Ignore slowdowns smaller than this (timer noise)
+SERIES_SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+
+def synthetic_prices(n: int, seed: int = 0) -> np.ndarray:
+    """A geometric random walk, like a token's price history."""
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+
+class MockDexscreenerHandler(BaseHTTPRequestHandler):
+    """Serves /tokens/v1/<chain>/<addresses> from the recorded payloads."""
+
+    def do_GET(self):
+        addresses = self.path.rsplit('/', 1)[-1].split(',')
+        templates = self.server.templates
+        pairs = []
+        for i, address in enumerate(addresses):
+            pair = dict(templates[i % len(templates)])
+            pair['baseToken'] = dict(pair['baseToken'], address=address)
+            pairs.append(pair)
+        body = json.dumps(pairs).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@contextlib.contextmanager
+def mock_dexscreener_server():
+    """Runs the mock API on a free local port and yields its base URL."""
+    with open(FIXTURE_PATH) as f:
+        templates = json.load(f)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockDexscreenerHandler)
+    server.daemon_threads = True
+    server.templates = templates
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+# Each case: (group, name, sizes, setup(size, context) -> args, run(*args)).
+# `setup` is not timed.
+
+def _fetch_sequential(base_url, addresses):
+    for address in addresses:
+        data_ingestion.fetch_token_pair_data('solana', address, base_url=base_url)
+
+def _predict_many(model, windows):
+    for window in windows:
+        models.predict_next_price(model, window)
+
+def _import_in_subprocess(module):
+    # A fresh interpreter, so nothing is already imported.
+    subprocess.run([sys.executable, '-c', f'import {module}'], check=True,
+                   env=dict(os.environ, PYTHONPATH=SRC_DIR))
+
+def _addresses(n):
+    return [f'Token{i:06d}pump' for i in range(n)]
+
+def _pairs_payload(n):
+    """A /tokens/v1 response body with n pairs built from the recorded payloads."""
+    with open(FIXTURE_PATH) as f:
+        templates = json.load(f)
+    pairs = []
+    for i, address in enumerate(_addresses(n)):
+        pair = dict(templates[i % len(templates)])
+        pair['baseToken'] = dict(pair['baseToken'], address=address)
+        pairs.append(pair)
+    return json.dumps(pairs).encode()
+
+def _parse_dicts(body):
+    return json.loads(body) # What callers kept before snapshots: the raw nested dicts
+
+def _parse_snapshots(body):
+    return [data_ingestion.process_raw_data(pair) for pair in data_ingestion._json_loads(body)]
+
+SNAPSHOT_PARSERS = {
+    'dict': _parse_dicts,
+    'PairSnapshot': _parse_snapshots,
+    'structured array': data_ingestion.process_raw_batch,
+}
+
+def measure_snapshot_memory(n: int = 10**4) -> dict:
+    """Returns the bytes retained per snapshot by each representation."""
+    body = _pairs_payload(n)
+    memory = {}
+    for name, parse in SNAPSHOT_PARSERS.items():
+        tracemalloc.start()
+        parsed = parse(body)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del parsed
+        memory[name] = retained / n
+    return memory
+
+def _warm_anomaly_detector(n):
+    """A detector over n tokens after 30 cycles, and the next cycle's prices and volumes."""
+    rng = np.random.default_rng(0)
+    prices = np.exp(np.cumsum(rng.normal(0.0, 0.01, (31, n)), axis=0))
+    volumes = rng.lognormal(10, 0.3, (31, n))
+    detector = models.AnomalyDetector([f'token{i}' for i in range(n)])
+    for t in range(30):
+        detector.update(prices[t], volumes[t])
+    return detector, prices[30], volumes[30]
+
+def _screener_snapshots(n):
+    """n snapshots of distinct pairs over a few chains and DEXes, with log-normal liquidity and volume."""
+    rng = np.random.default_rng(0)
+    template = data_ingestion.process_raw_data(json.loads(_pairs_payload(1))[0])
+    venues = [('solana', 'raydium'), ('solana', 'orca'), ('solana', 'meteora'), ('base', 'uniswap'), ('ethereum', 'uniswap')]
+    liquidity, volume, change = rng.lognormal(11, 2, n), rng.lognormal(8, 2, n), rng.normal(0, 5, n)
+    return [template._replace(chain_id=venues[i % len(venues)][0], dex_id=venues[i % len(venues)][1], pair_address=f'Pair{i:07d}',
+                              liquidity_usd=liquidity[i], volume_h1=volume[i], price_change_h1=change[i])
+            for i in range(n)]
+
+def _screener_index(n):
+    index = screener.ScreenerIndex()
+    index.update(_screener_snapshots(n))
+    return index
+
+def _screener_queries(index, repeat=100):
+    for _ in range(repeat):
+        index.query(chain_id='solana', where={'liquidity_usd': (100_000, None)}, sort_by='volume_h1', top=50)
+
+BENCHMARKS = [
+    # Import time of a fresh interpreter (including interpreter startup); the
+    # CLI and ingestion must not pull in NumPy or scikit-learn.
+    *[('startup', f'import {module}', (1,), lambda n, ctx, module=module: (module,), _import_in_subprocess)
+      for module in ('nex_ai.cli', 'nex_ai.data_ingestion', 'nex_ai.models')],
+    ('signals', 'calculate_sma', SERIES_SIZES,
+     lambda n, ctx: (synthetic_prices(n).tolist(), 30),
+     signal_generation.calculate_sma),
+    ('signals', 'generate_trading_signals', SERIES_SIZES,
+     lambda n, ctx: (synthetic_prices(n).tolist(), 10, 30),
+     signal_generation.generate_trading_signals),
+    ('signals', 'generate_trading_signals_array', SERIES_SIZES,
+     lambda n, ctx: (synthetic_prices(n), 10, 30),
+     signal_generation.generate_trading_signals_array),
+    ('signals', 'compute_indicators', SERIES_SIZES,
+     lambda n, ctx: (synthetic_prices(n), ['sma_20', 'ema_12', 'std_20', 'bollinger_20_2', 'zscore_20',
+                                           'rsi_14', 'macd_12_26_9', 'volatility_20', 'roc_10']),
+     signal_generation.compute_indicators),
+    ('datasets', 'create_dataset', SERIES_SIZES,
+     lambda n, ctx: (synthetic_prices(n).tolist(), 5),
+     models.create_dataset),
+    ('models', 'train_price_prediction_model', SERIES_SIZES,
+     lambda n, ctx: (synthetic_prices(n).tolist(), 5),
+     models.train_price_prediction_model),
+    ('models', 'predict_next_price', (10**3, 10**4),
+     lambda n, ctx: (models.train_price_prediction_model(synthetic_prices(1000).tolist(), 5),
+                     [list(w) for w in np.lib.stride_tricks.sliding_window_view(synthetic_prices(n + 4), 5)]),
+     _predict_many),
+    ('models', 'train_price_prediction_models', (10**3, 10**4),
+     lambda n, ctx: (synthetic_prices(n * 200).reshape(n, 200), 5),
+     models.train_price_prediction_models),
+    ('models', 'predict_next_prices', (10**3, 10**4, 10**5),
+     lambda n, ctx: (models.train_price_prediction_models(synthetic_prices(n * 50).reshape(n, 50), 5),
+                     synthetic_prices(n * 5, seed=1).reshape(n, 5)),
+     models.predict_next_prices),
+    # One polling cycle of the whole universe.
+    ('models', 'anomaly_update', (10**3, 10**4, 10**5),
+     lambda n, ctx: _warm_anomaly_detector(n),
+     lambda detector, prices, volumes: detector.update(prices, volumes)),
+    ('pipeline', 'run_pipeline', (10**5, 10**6, 10**7),
+     lambda n, ctx: ([synthetic_prices(n // 200 * (1 + i % 4), seed=i) for i in range(80)],),
+     pipeline.run_pipeline),
+    ('snapshots', 'parse_dicts', (10**3, 10**4, 10**5),
+     lambda n, ctx: (_pairs_payload(n),),
+     _parse_dicts),
+    ('snapshots', 'process_raw_data', (10**3, 10**4, 10**5),
+     lambda n, ctx: (_pairs_payload(n),),
+     _parse_snapshots),
+    ('snapshots', 'process_raw_batch', (10**3, 10**4, 10**5),
+     lambda n, ctx: (_pairs_payload(n),),
+     data_ingestion.process_raw_batch),
+    ('screener', 'build', (10**4, 10**5),
+     lambda n, ctx: (_screener_snapshots(n),),
+     lambda snapshots: screener.ScreenerIndex().update(snapshots)),
+    # 100 top-50 queries with a liquidity filter (sub-millisecond each).
+    ('screener', 'query', (10**4, 10**5),
+     lambda n, ctx: (_screener_index(n),),
+     _screener_queries),
+    ('ingestion', 'fetch_token_pair_data', (10**2, 10**3),
+     lambda n, ctx: (ctx['base_url'], _addresses(n)),
+     _fetch_sequential),
+    ('ingestion', 'fetch_token_pairs', (10**3, 10**4),
+     lambda n, ctx: (ctx['base_url'], _addresses(n)),
+     lambda base_url, addresses: data_ingestion.fetch_token_pairs('solana', addresses, base_url=base_url)),
+]
+
+def time_call(func, args, repeat: int) -> float:
+    """Returns the best wall-clock time of `repeat` calls, with stdout silenced."""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(*args)
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return best
+
+def run_benchmarks(max_size: int = 10**6, only: list | None = None, repeat: int = 3) -> dict:
+    """
+    Runs the selected benchmarks and returns {"<group>.<name>[<size>]": seconds}.
+    """
+    results = {}
+    with mock_dexscreener_server() as base_url:
+        context = {'base_url': base_url}
+        for group, name, sizes, setup, run in BENCHMARKS:
+            if only and group not in only and name not in only:
+                continue
+            for size in sizes:
+                if size > max_size:
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):
+                    args = setup(size, context)
+                # Large inputs dominate the run time; one timing is enough there.
+                seconds = time_call(run, args, repeat if size <= 10**5 else 1)
+                key = f'{group}.{name}[{size}]'
+                results[key] = seconds
+                print(f'{key:<55} {seconds * 1000:>12.3f} ms')
+    return results
+
+def compare_results(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+                    min_delta: float = MIN_REGRESSION_SECONDS) -> list:
+    """
+    Returns (key, baseline_seconds, current_seconds) for every regressed benchmark.
+
+    A benchmark regresses when it is more than `threshold` times slower than its
+    baseline and the slowdown exceeds `min_delta` seconds. Benchmarks missing
+    from either side are ignored.
+    """
+    regressions = []
+    for key, seconds in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if seconds > reference * threshold and seconds - reference > min_delta:
+            regressions.append((key, reference, seconds))
+    return regressions
+
+def load_baseline(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)['results']
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path: str, results: dict) -> None:
+    record = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(record, f, indent=2, sort_keys=True)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help='Baseline JSON file.')
+    parser.add_argument('--update-baseline', action='store_true', help='Write results as the new baseline.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown factor before failing (default: %(default)s).')
+    parser.add_argument('--max-size', type=float, default=1e6,
+                        help='Largest series size to run, up to 1e7 (default: %(default)g).')
+    parser.add_argument('--only', nargs='*', help='Limit to these groups or benchmark names.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timings per benchmark; the best is kept.')
+    parser.add_argument('--output', help='Also write this run\'s results to a JSON file.')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(int(args.max_size), args.only, args.repeat)
+    if not args.only or 'snapshots' in args.only:
+        # Reported only; memory is not part of the regression gate.
+        print('\nMemory per snapshot (10000 pairs):')
+        for name, size in measure_snapshot_memory().items():
+            print(f'  {name:<20} {size:>10.0f} bytes')
+    if args.output:
+        save_baseline(args.output, results)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f'\nBaseline written to {args.baseline}')
+        return 0
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        # Failing here keeps a fresh checkout from passing the gate without comparing anything.
+        print(f'\nNo baseline at {args.baseline}; record one on this machine with --update-baseline.', file=sys.stderr)
+        return 2
+
+    regressions = compare_results(results, baseline, args.threshold)
+    if not regressions:
+        print(f'\nNo regressions beyond {args.threshold:.2f}x of {args.baseline}')
+        return 0
+    print(f'\n{len(regressions)} regression(s) beyond {args.threshold:.2f}x:')
+    for key, reference, seconds in regressions:
+        print(f'  {key}: {reference * 1000:.3f} ms -> {seconds * 1000:.3f} ms ({seconds / reference:.2f}x)')
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
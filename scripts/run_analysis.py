@@ -16,9 +16,16 @@ sys.path.insert(0, os.path.join(project_root, 'src'))
 from nex_ai.data_ingestion import fetch_token_pair_data
 from nex_ai.signal_generation import generate_trading_signals
 from nex_ai.models import train_price_prediction_model, predict_next_price
-from nex_ai.utils import load_config
+from nex_ai.history import PriceHistoryStore
+from nex_ai.utils import configure_logging, load_config
+
+# Snapshots are accumulated here across runs; override with NEX_HISTORY_DIR.
+HISTORY_DIR = os.environ.get('NEX_HISTORY_DIR', os.path.join(project_root, 'data', 'history'))
+MIN_HISTORY_POINTS = 24 # Fall back to a simulated series until this many snapshots are stored
 
 if __name__ == "__main__":
+    # Library messages go through logging; NEX_LOG_LEVEL=DEBUG shows per-call detail.
+    configure_logging(os.environ.get('NEX_LOG_LEVEL', 'INFO'))
     print("--- NEX: Decentralized Crypto Intelligence Analysis Script ---")
 
     # 1. Load configuration (if any)
@@ -41,7 +48,13 @@ if __name__ == "__main__":
     print(f"\nCurrent Price (USD) for {pair_data['baseToken']['symbol']}: {current_price_usd:.8f}")
     print(f"24-hour Price Change: {price_change_h24:.2f}%")
 
-    # --- Using 'real' data from the response for signal generation ---
+    # Keep every snapshot so that later runs can work on real history.
+    history_store = PriceHistoryStore(HISTORY_DIR)
+    history_store.append_snapshot(chain_id, token_address, pair_data)
+    stored_prices = [p for p in history_store.query(chain_id, token_address).price_usd.tolist() if p == p] # skip NaN
+
+    # --- Using stored history when there is enough of it ---
+    # --- Otherwise, using 'real' data from the response for signal generation ---
     # The Dexscreener API provides a snapshot, not a historical series.
     # To use the `generate_trading_signals` function, which requires a list of prices,
     # we will infer an approximate price 24 hours ago based on the current price
@@ -56,15 +69,20 @@ if __name__ == "__main__":
     else:
         price_24h_ago = 0.0 # If it dropped 100%, assume it was 0 or very close
 
-    num_simulated_points = 24 # One point per hour for the last 24 hours
-    simulated_prices = []
-    for i in range(num_simulated_points):
-        # Linear interpolation between price_24h_ago and current_price_usd
-        interpolated_price = price_24h_ago + (current_price_usd - price_24h_ago) * (i / (num_simulated_points - 1))
-        simulated_prices.append(interpolated_price)
-
-    print(f"\nSimulated Historical Prices (derived from 24h change, {num_simulated_points} points):")
-    print([f"{p:.8f}" for p in simulated_prices]) # Format for cleaner output
+    if len(stored_prices) >= MIN_HISTORY_POINTS:
+        simulated_prices = stored_prices
+        print(f"\nStored Historical Prices ({len(stored_prices)} snapshots from {HISTORY_DIR}).")
+    else:
+        num_simulated_points = 24 # One point per hour for the last 24 hours
+        simulated_prices = []
+        for i in range(num_simulated_points):
+            # Linear interpolation between price_24h_ago and current_price_usd
+            interpolated_price = price_24h_ago + (current_price_usd - price_24h_ago) * (i / (num_simulated_points - 1))
+            simulated_prices.append(interpolated_price)
+
+        print(f"\nSimulated Historical Prices (derived from 24h change, {num_simulated_points} points;"
+              f" {len(stored_prices)} of {MIN_HISTORY_POINTS} snapshots stored so far):")
+        print([f"{p:.8f}" for p in simulated_prices]) # Format for cleaner output
 
     # 3. Generate Signals
     # Adjust window sizes based on the number of simulated points
@@ -0,0 +1,30 @@
+"""
+Runs the scanner service: keeps a watchlist of tokens fresh and prints signals.
+
+Usage:
+    python scripts/run_scanner.py --chain solana 8NCievmJCg2d9Vc2TWgz2HkE6ANeSX7kwvdq5AL7pump
+    python scripts/run_scanner.py --chain solana --watchlist tokens.txt --rate 2 --history
+
+A watchlist file holds one token address per line (or `<chain_id> <address>`
+to watch tokens on several chains). Stop with Ctrl+C.
+
+Equivalent to `nex-ai scan ...` once the package is installed.
+"""
+
+import os
+import sys
+
+# Get the absolute path of the directory containing this script (scripts/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the project root directory (one level up from scripts/)
+project_root = os.path.join(script_dir, os.pardir)
+# Add the 'src' directory to Python's path
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from nex_ai.cli import main
+
+HISTORY_DIR = os.environ.get('NEX_HISTORY_DIR', os.path.join(project_root, 'data', 'history'))
+
+if __name__ == "__main__":
+    log_level = os.environ.get('NEX_LOG_LEVEL', 'INFO')
+    sys.exit(main(['--log-level', log_level, '--history-dir', HISTORY_DIR, 'scan', *sys.argv[1:]]))
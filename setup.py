@@ -6,10 +6,16 @@ setup(
     packages=find_packages(where='src'),
     package_dir={'': 'src'},
     install_requires=[
-        # List your dependencies here, or keep them in requirements.txt
-        # 'requests',
-        # 'scikit-learn',
+        # Keep in sync with requirements.txt
+        'requests',
+        'numpy',
+        'scikit-learn',
     ],
+    entry_points={
+        'console_scripts': [
+            'nex-ai=nex_ai.cli:main',
+        ],
+    },
     author='Your Name',
     author_email='your.email@example.com',
     description='AI for Decentralized Crypto Intelligence',
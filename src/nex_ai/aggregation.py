@@ -0,0 +1,163 @@
+"""
+Module for aggregating raw price snapshots into OHLCV bars.
+
+`BarAggregator` folds each incoming tick (timestamp, price, volume) into open
+candles for several intervals at once and emits a bar as soon as its interval
+is closed. Ticks may arrive out of order: a tick is still accepted as long as
+its bar is within the grace period of the newest timestamp seen.
+"""
+import math
+from typing import NamedTuple
+
+DEFAULT_INTERVALS = ('1m', '5m', '1h', '1d')
+
+_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+def parse_interval(interval: str) -> int:
+    """
+    Converts an interval label such as '5m' or '1h' into seconds.
+    """
+    try:
+        seconds = int(interval[:-1]) * _INTERVAL_UNITS[interval[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Invalid interval '{interval}'. Expected e.g. '30s', '5m', '1h', '1d'.") from None
+    if seconds <= 0:
+        raise ValueError(f"Interval must be positive, got '{interval}'.")
+    return seconds
+
+class Bar(NamedTuple):
+    """A closed OHLCV candle covering [start, start + interval seconds)."""
+    interval: str
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    ticks: int
+
+class _OpenBar:
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume', 'ticks', 'open_time', 'close_time')
+
+    def __init__(self, start: float, timestamp: float, price: float, volume: float):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.ticks = 1
+        self.open_time = self.close_time = timestamp
+
+    def add(self, timestamp: float, price: float, volume: float) -> None:
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        if timestamp < self.open_time:
+            self.open_time, self.open = timestamp, price
+        if timestamp >= self.close_time:
+            self.close_time, self.close = timestamp, price
+        self.volume += volume
+        self.ticks += 1
+
+class BarAggregator:
+    """
+    Incrementally builds OHLCV bars for several intervals from ticks.
+
+    Only bars that are still open are held in memory, so memory per interval is
+    bounded by (grace_period / interval + 1) bars. Intervals without ticks
+    produce no bar.
+
+    Args:
+        intervals (iterable of str): Interval labels, e.g. ('1m', '5m', '1h', '1d').
+        grace_period (float): Seconds a bar stays open after its end, to accept late ticks.
+        on_bar (callable | None): Called with each closed `Bar`.
+    """
+
+    def __init__(self, intervals=DEFAULT_INTERVALS, grace_period: float = 0.0, on_bar=None):
+        if grace_period < 0:
+            raise ValueError("grace_period must be non-negative.")
+        self.intervals = [(label, parse_interval(label)) for label in intervals]
+        self.grace_period = grace_period
+        self.on_bar = on_bar
+        self.watermark = -math.inf # Newest timestamp seen
+        self.dropped_ticks = {label: 0 for label, _ in self.intervals}
+        self._open_bars = {label: {} for label, _ in self.intervals}
+
+    def add_tick(self, timestamp: float, price: float, volume: float = 0.0) -> list:
+        """
+        Folds one tick into every interval.
+
+        Args:
+            timestamp (float): Unix timestamp of the tick, in seconds.
+            price (float): Traded or quoted price.
+            volume (float): Volume attributed to this tick.
+
+        Returns:
+            list: Bars closed by this tick, oldest first.
+        """
+        timestamp, price, volume = float(timestamp), float(price), float(volume)
+        if timestamp > self.watermark:
+            self.watermark = timestamp
+
+        for label, seconds in self.intervals:
+            start = math.floor(timestamp / seconds) * seconds
+            if start + seconds + self.grace_period <= self.watermark:
+                self.dropped_ticks[label] += 1 # Its bar has already been emitted
+                continue
+            open_bars = self._open_bars[label]
+            bar = open_bars.get(start)
+            if bar is None:
+                open_bars[start] = _OpenBar(start, timestamp, price, volume)
+            else:
+                bar.add(timestamp, price, volume)
+        return self._close_bars(self.watermark - self.grace_period)
+
+    def add_snapshot(self, pair_data, timestamp: float, volume: float = 0.0) -> list:
+        """
+        Folds a Dexscreener pair snapshot: a `PairSnapshot` (as returned by
+        `process_raw_data`) or a raw pair dictionary.
+
+        Snapshots carry rolling volume totals rather than per-tick volume, so the
+        tick volume has to be supplied by the caller. Snapshots without a usable
+        USD price are skipped.
+
+        Returns:
+            list: Bars closed by this snapshot, oldest first.
+        """
+        try:
+            price = float(pair_data.get('priceUsd') if isinstance(pair_data, dict) else pair_data.price_usd)
+        except (TypeError, ValueError):
+            return []
+        if math.isnan(price):
+            return []
+        return self.add_tick(timestamp, price, volume)
+
+    def flush(self) -> list:
+        """
+        Closes and returns every open bar, e.g. at the end of a replay.
+        """
+        return self._close_bars(math.inf)
+
+    def _close_bars(self, cutoff: float) -> list:
+        closed = []
+        for label, seconds in self.intervals:
+            open_bars = self._open_bars[label]
+            for start in sorted(start for start in open_bars if start + seconds <= cutoff):
+                bar = open_bars.pop(start)
+                closed.append(Bar(label, bar.start, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.ticks))
+        if self.on_bar is not None:
+            for bar in closed:
+                self.on_bar(bar)
+        return closed
+
+def aggregate_ticks(ticks, intervals=DEFAULT_INTERVALS, grace_period: float = 0.0):
+    """
+    Generator that turns an iterable of (timestamp, price[, volume]) ticks into bars.
+
+    Yields:
+        Bar: Closed bars as they complete, followed by the remaining open bars
+             once the ticks are exhausted.
+    """
+    aggregator = BarAggregator(intervals, grace_period)
+    for tick in ticks:
+        yield from aggregator.add_tick(*tick)
+    yield from aggregator.flush()
@@ -0,0 +1,206 @@
+"""
+Module for backtesting SMA crossover strategies and sweeping their parameters.
+
+Every candidate window's SMA is computed once per series (see
+`signal_generation.rolling_means`), then the whole (short, long) grid is
+evaluated with broadcast array operations instead of re-running
+`generate_trading_signals` for every combination.
+
+Strategy model: go long on a BUY crossover, go flat on a SELL crossover. A
+signal is acted on at the close of its bar, so the position earns the
+following bar's return.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .signal_generation import SIGNAL_BUY, detect_crossovers, rolling_means
+
+RESULT_DTYPE = np.dtype([
+    ('token', np.int32),
+    ('short_window', np.int32),
+    ('long_window', np.int32),
+    ('pnl', np.float64),          # Total compounded return, e.g. 0.12 for +12%
+    ('hit_rate', np.float64),     # Fraction of trades with a positive return (NaN without trades)
+    ('max_drawdown', np.float64), # Largest peak-to-trough equity loss, as a fraction
+    ('turnover', np.int32),       # Number of position changes (entries + exits)
+    ('trades', np.int32),         # Number of entries
+])
+
+SUMMARY_DTYPE = np.dtype([
+    ('short_window', np.int32),
+    ('long_window', np.int32),
+    ('tokens', np.int32),
+    ('mean_pnl', np.float64),
+    ('median_pnl', np.float64),
+    ('mean_hit_rate', np.float64),
+    ('mean_max_drawdown', np.float64),
+    ('mean_turnover', np.float64),
+])
+
+# Upper bound on (combinations x prices) elements evaluated at once.
+_MAX_CHUNK_ELEMENTS = 2_000_000
+
+def parameter_grid(short_windows, long_windows) -> list:
+    """
+    Returns the valid (short, long) window pairs, i.e. those with short < long.
+    """
+    return [(int(s), int(l)) for s in sorted(set(short_windows)) for l in sorted(set(long_windows)) if s < l]
+
+def _log_returns(prices: np.ndarray) -> np.ndarray:
+    returns = np.zeros(len(prices))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.log(prices[1:] / prices[:-1])
+    returns[~np.isfinite(returns)] = 0.0 # Missing or non-positive prices earn nothing
+    return returns
+
+def _evaluate(short_sma: np.ndarray, long_sma: np.ndarray, returns: np.ndarray, fee: float) -> tuple:
+    """
+    Evaluates a (k, n) stack of SMA pairs against one return series.
+    """
+    k, n = short_sma.shape
+    codes = detect_crossovers(short_sma, long_sma)
+
+    # Forward-fill the most recent signal to get the position at each bar.
+    index = np.arange(n)
+    last_signal = np.maximum.accumulate(np.where(codes != 0, index, 0), axis=1)
+    position = (np.take_along_axis(codes, last_signal, axis=1) == SIGNAL_BUY).astype(np.int8)
+
+    changes = np.zeros((k, n), dtype=np.int8)
+    changes[:, 1:] = np.diff(position, axis=1)
+    entries, exits = changes == 1, changes == -1
+
+    strategy = np.zeros((k, n))
+    strategy[:, 1:] = position[:, :-1] * returns[1:]
+    if fee:
+        strategy += (entries | exits) * np.log1p(-fee)
+    equity = np.cumsum(strategy, axis=1) # Log equity; starts at 0
+
+    pnl = np.expm1(equity[:, -1])
+    drawdown = -np.expm1(equity - np.maximum.accumulate(equity, axis=1))
+    max_drawdown = drawdown.max(axis=1)
+
+    # Per-trade returns: equity at each exit (or the last bar, if still open)
+    # minus equity just before the matching entry.
+    closes = exits.copy()
+    closes[:, -1] |= position[:, -1] == 1
+    last_entry = np.maximum.accumulate(np.where(entries, index, 0), axis=1)
+    base = np.take_along_axis(equity, np.maximum(last_entry - 1, 0), axis=1)
+    trade_won = closes & (equity - base > 0)
+    trades = entries.sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        hit_rate = trade_won.sum(axis=1) / trades
+
+    return pnl, hit_rate, max_drawdown, entries.sum(axis=1) + exits.sum(axis=1), trades
+
+def backtest_grid(prices, short_windows, long_windows, fee: float = 0.0, token: int = 0) -> np.ndarray:
+    """
+    Backtests every (short, long) SMA crossover combination on one price series.
+
+    Args:
+        prices (array-like): A one-dimensional sequence of prices.
+        short_windows (iterable of int): Candidate short-term SMA windows.
+        long_windows (iterable of int): Candidate long-term SMA windows.
+        fee (float): Proportional cost charged on every position change, e.g. 0.003.
+        token (int): Value stored in the `token` column of the results.
+
+    Returns:
+        np.ndarray: A RESULT_DTYPE structured array with one row per valid combination.
+    """
+    values = np.asarray(prices, dtype=np.float64)
+    grid = parameter_grid(short_windows, long_windows)
+    results = np.zeros(len(grid), dtype=RESULT_DTYPE)
+    if not grid:
+        return results
+
+    results['token'] = token
+    results['short_window'] = [s for s, _ in grid]
+    results['long_window'] = [l for _, l in grid]
+
+    means = rolling_means(values, {w for pair in grid for w in pair})
+    returns = _log_returns(values)
+    chunk = max(1, _MAX_CHUNK_ELEMENTS // max(len(values), 1))
+    for start in range(0, len(grid), chunk):
+        pairs = grid[start:start + chunk]
+        short_sma = np.stack([means[s] for s, _ in pairs])
+        long_sma = np.stack([means[l] for _, l in pairs])
+        rows = slice(start, start + len(pairs))
+        (results['pnl'][rows], results['hit_rate'][rows], results['max_drawdown'][rows],
+         results['turnover'][rows], results['trades'][rows]) = _evaluate(short_sma, long_sma, returns, fee)
+    return results
+
+def _backtest_task(args) -> np.ndarray:
+    token, prices, short_windows, long_windows, fee = args
+    return backtest_grid(prices, short_windows, long_windows, fee, token)
+
+def sweep_universe(price_series, short_windows, long_windows, fee: float = 0.0,
+                   max_workers: int | None = None) -> np.ndarray:
+    """
+    Runs `backtest_grid` for many tokens, fanning out across a process pool.
+
+    Args:
+        price_series (list): One price sequence per token; `token` in the
+                             results is the index into this list.
+        short_windows (iterable of int): Candidate short-term SMA windows.
+        long_windows (iterable of int): Candidate long-term SMA windows.
+        fee (float): Proportional cost charged on every position change.
+        max_workers (int | None): Pool size; 1 runs everything in this process.
+
+    Returns:
+        np.ndarray: RESULT_DTYPE rows for every token and combination, in token order.
+    """
+    short_windows, long_windows = list(short_windows), list(long_windows)
+    tasks = [(token, np.asarray(prices, dtype=np.float64), short_windows, long_windows, fee)
+             for token, prices in enumerate(price_series)]
+    if not tasks:
+        return np.zeros(0, dtype=RESULT_DTYPE)
+    if max_workers == 1:
+        return np.concatenate([_backtest_task(task) for task in tasks])
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return np.concatenate(list(pool.map(_backtest_task, tasks, chunksize=chunksize)))
+
+def summarize_grid(results: np.ndarray, by: str = 'mean_pnl', top: int | None = None) -> np.ndarray:
+    """
+    Aggregates per-token results into one ranked row per (short, long) combination.
+
+    Args:
+        results (np.ndarray): RESULT_DTYPE rows, e.g. from `sweep_universe`.
+        by (str): SUMMARY_DTYPE field to rank by (descending; ascending for
+                  'mean_max_drawdown' and 'mean_turnover').
+        top (int | None): Keep only the best `top` combinations.
+
+    Returns:
+        np.ndarray: A SUMMARY_DTYPE structured array, best combination first.
+    """
+    if by not in SUMMARY_DTYPE.names:
+        raise ValueError(f"Unknown ranking field '{by}'. Choose one of {SUMMARY_DTYPE.names}.")
+    keys, group = np.unique(results[['short_window', 'long_window']], return_inverse=True)
+    group = group.ravel()
+    summary = np.zeros(len(keys), dtype=SUMMARY_DTYPE)
+    summary['short_window'] = keys['short_window']
+    summary['long_window'] = keys['long_window']
+    counts = np.bincount(group, minlength=len(keys))
+    summary['tokens'] = counts
+
+    def group_mean(values):
+        finite = np.isfinite(values)
+        totals = np.bincount(group[finite], weights=values[finite], minlength=len(keys))
+        with np.errstate(invalid='ignore'):
+            return totals / np.bincount(group[finite], minlength=len(keys))
+
+    summary['mean_pnl'] = group_mean(results['pnl'])
+    summary['mean_hit_rate'] = group_mean(results['hit_rate'])
+    summary['mean_max_drawdown'] = group_mean(results['max_drawdown'])
+    summary['mean_turnover'] = group_mean(results['turnover'].astype(np.float64))
+    order = np.argsort(group, kind='stable')
+    boundaries = np.cumsum(counts)[:-1]
+    summary['median_pnl'] = [np.median(chunk) for chunk in np.split(results['pnl'][order], boundaries)]
+
+    ascending = by in ('mean_max_drawdown', 'mean_turnover')
+    ranking = summary[by] if ascending else -summary[by]
+    summary = summary[np.argsort(np.where(np.isnan(ranking), np.inf, ranking), kind='stable')]
+    return summary if top is None else summary[:top]
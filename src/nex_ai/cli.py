@@ -0,0 +1,227 @@
+"""
+Command-line entry point, installed as `nex-ai`.
+
+    nex-ai fetch solana <token_address> [<token_address> ...] [--history]
+    nex-ai signals solana <token_address> [--short 8 --long 16]
+    nex-ai train solana <token_address> [--look-back 5]
+    nex-ai scan --chain solana <token_address> ... | --watchlist tokens.txt
+                [--record feed.jsonl.gz | --replay feed.jsonl.gz --speed 60]
+
+Only the standard library is imported at module load: every subcommand imports
+the package modules (and through them requests, NumPy or scikit-learn) it
+needs when it runs, so `nex-ai fetch` never loads NumPy and only `nex-ai train`
+loads scikit-learn.
+"""
+import argparse
+import os
+import sys
+
+# `nex-ai` may run from any directory, so the default store is per user
+# (under XDG_DATA_HOME) rather than relative to the working directory.
+DEFAULT_HISTORY_DIR = os.path.join(os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share'),
+                                   'nex-ai', 'history')
+
+def _history_store(args):
+    from .history import PriceHistoryStore
+    return PriceHistoryStore(args.history_dir)
+
+def _stored_prices(args):
+    """Returns the token's stored prices as a float array, NaN rows skipped."""
+    import numpy as np
+    prices = np.asarray(_history_store(args).query(args.chain, args.token).price_usd)
+    return prices[~np.isnan(prices)]
+
+def _print_pair(snapshot) -> None:
+    line = f"{snapshot.base_symbol or '?'}/{snapshot.quote_symbol or '?':<8} {snapshot.price_usd:>18.8f} USD"
+    if snapshot.price_change_h24 == snapshot.price_change_h24: # Not NaN
+        line += f"  {snapshot.price_change_h24:+7.2f}% 24h"
+    print(line)
+
+def cmd_fetch(args) -> int:
+    import json
+
+    from .data_ingestion import fetch_token_pair_data, fetch_token_pairs, process_raw_data
+
+    if len(args.tokens) == 1:
+        pair = fetch_token_pair_data(args.chain, args.tokens[0])
+        pairs = [pair] if pair else []
+    else:
+        # Keep the most liquid pair per token.
+        best = {}
+        for pair in fetch_token_pairs(args.chain, args.tokens):
+            snapshot = process_raw_data(pair)
+            current = best.get(snapshot.base_address)
+            if current is None or snapshot.liquidity_usd > current[0].liquidity_usd:
+                best[snapshot.base_address] = (snapshot, pair)
+        pairs = [best[address][1] for address in args.tokens if address in best]
+    if not pairs:
+        print("No pair data found.", file=sys.stderr)
+        return 1
+
+    snapshots = [process_raw_data(pair) for pair in pairs]
+    if args.history:
+        store = _history_store(args)
+        for snapshot in snapshots:
+            store.append_snapshot(args.chain, snapshot.base_address, snapshot)
+    if args.json:
+        print(json.dumps(pairs, indent=2))
+    else:
+        for snapshot in snapshots:
+            _print_pair(snapshot)
+    return 0
+
+def cmd_signals(args) -> int:
+    from .signal_generation import SIGNAL_LABELS, generate_trading_signals_array
+
+    prices = _stored_prices(args)
+    if len(prices) < args.long:
+        print(f"Only {len(prices)} stored prices; need at least {args.long}. "
+              f"Collect more with `nex-ai fetch --history` or `nex-ai scan --history`.", file=sys.stderr)
+        return 1
+    signals = generate_trading_signals_array(prices, args.short, args.long)
+    points = signals.nonzero()[0][-args.last:] if args.last else signals.nonzero()[0]
+    print(f"Signals over {len(prices)} stored prices (Short SMA: {args.short}, Long SMA: {args.long}):")
+    for i in points:
+        print(f"Point {i + 1} (Price: {prices[i]:.8f}): {SIGNAL_LABELS[signals[i]]}")
+    return 0
+
+def cmd_train(args) -> int:
+    from .models import predict_next_price, train_price_prediction_model
+
+    prices = _stored_prices(args)
+    model = train_price_prediction_model(prices, look_back=args.look_back)
+    if model is None:
+        print(f"Only {len(prices)} stored prices; need more than {args.look_back}.", file=sys.stderr)
+        return 1
+    prediction = predict_next_price(model, prices[-args.look_back:].tolist())
+    if prediction is None:
+        return 1
+    print(f"Trained on {len(prices) - args.look_back} samples.")
+    print(f"Predicted next price based on last {args.look_back} points: {prediction:.8f}")
+    return 0
+
+def _read_watchlist(path: str, default_chain: str) -> list:
+    tokens = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if len(fields) == 1:
+                tokens.append((default_chain, fields[0]))
+            elif len(fields) == 2:
+                tokens.append((fields[0], fields[1]))
+    return tokens
+
+def cmd_scan(args) -> int:
+    import queue
+    import signal
+    import threading
+
+    from .data_ingestion import get_shared_session
+    from .scanner import Scanner, make_fetcher
+
+    tokens = [(args.chain, address) for address in args.tokens]
+    if args.watchlist:
+        tokens += _read_watchlist(args.watchlist, args.chain)
+    if not tokens:
+        print("No tokens to watch.", file=sys.stderr)
+        return 2
+
+    clock = None
+    stop = threading.Event()
+    if args.replay:
+        from .replay import ReplaySession
+        session = ReplaySession(args.replay, speed=args.speed)
+        # Schedule on the recorded timeline, and stop when the log runs out.
+        clock, stop = session.scanner_clock(), session.finished
+    elif args.record:
+        from .replay import RecordingSession
+        session = RecordingSession(args.record, get_shared_session())
+    else:
+        session = get_shared_session()
+
+    results = queue.Queue()
+    scanner = Scanner(fetcher=make_fetcher(session), publish=results, clock=clock,
+                      requests_per_second=args.rate, min_interval=args.min_interval,
+                      base_interval=min(max(60.0, args.min_interval), args.max_interval),
+                      max_interval=args.max_interval)
+    for chain_id, address in tokens:
+        scanner.add(chain_id, address)
+    history_store = _history_store(args) if args.history else None
+
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    worker = threading.Thread(target=scanner.run, kwargs={'stop_event': stop}, daemon=True)
+    worker.start()
+    print(f"--- NEX: scanning {len(tokens)} tokens (Ctrl+C to stop) ---")
+
+    while not stop.is_set() or not results.empty():
+        try:
+            result = results.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if history_store is not None:
+            history_store.append_snapshot(result.chain_id, result.token_address, result.pair, result.timestamp)
+        symbol = result.pair.base_symbol or result.token_address
+        print(f"{symbol:<12} {result.price_usd:>18.8f} USD  next poll in {result.interval:6.1f}s"
+              + (f"  {result.signal}" if result.signal else ''))
+
+    worker.join()
+    if args.replay or args.record:
+        session.close()
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='nex-ai', description='NEX decentralized crypto intelligence.')
+    parser.add_argument('--log-level', default=os.environ.get('NEX_LOG_LEVEL', 'WARNING'),
+                        help='Package log level (default: NEX_LOG_LEVEL or %(default)s).')
+    parser.add_argument('--history-dir', default=os.environ.get('NEX_HISTORY_DIR', DEFAULT_HISTORY_DIR),
+                        help='Price-history store (default: NEX_HISTORY_DIR or %(default)s).')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch = subparsers.add_parser('fetch', help='Show the current price of one or more tokens.')
+    fetch.add_argument('chain', help="Chain ID, e.g. 'solana'.")
+    fetch.add_argument('tokens', nargs='+', help='Base token addresses.')
+    fetch.add_argument('--json', action='store_true', help='Print the raw pair data.')
+    fetch.add_argument('--history', action='store_true', help='Append the snapshots to the history store.')
+    fetch.set_defaults(handler=cmd_fetch)
+
+    signals = subparsers.add_parser('signals', help='SMA crossover signals over a token\'s stored history.')
+    signals.add_argument('chain', help="Chain ID, e.g. 'solana'.")
+    signals.add_argument('token', help='Base token address.')
+    signals.add_argument('--short', type=int, default=8, help='Short SMA window (default: %(default)s).')
+    signals.add_argument('--long', type=int, default=16, help='Long SMA window (default: %(default)s).')
+    signals.add_argument('--last', type=int, default=20, help='Show only the last N signals (0 for all).')
+    signals.set_defaults(handler=cmd_signals)
+
+    train = subparsers.add_parser('train', help='Fit a price model on a token\'s stored history and predict.')
+    train.add_argument('chain', help="Chain ID, e.g. 'solana'.")
+    train.add_argument('token', help='Base token address.')
+    train.add_argument('--look-back', type=int, default=5, help='Prices per sample (default: %(default)s).')
+    train.set_defaults(handler=cmd_train)
+
+    scan = subparsers.add_parser('scan', help='Keep a watchlist of tokens fresh and print signals.')
+    scan.add_argument('tokens', nargs='*', help='Token addresses to watch.')
+    scan.add_argument('--chain', default='solana', help='Chain of the given tokens (default: %(default)s).')
+    scan.add_argument('--watchlist', help='File with one token address (or "<chain> <address>") per line.')
+    scan.add_argument('--rate', type=float, default=4.0, # scanner.DEFAULT_REQUESTS_PER_SECOND, without importing it
+                      help='Global request budget per second (default: %(default)s).')
+    scan.add_argument('--min-interval', type=float, default=10.0, help='Fastest per-token polling interval (s).')
+    scan.add_argument('--max-interval', type=float, default=600.0, help='Slowest per-token polling interval (s).')
+    scan.add_argument('--history', action='store_true', help='Append every snapshot to the history store.')
+    feed = scan.add_mutually_exclusive_group()
+    feed.add_argument('--record', metavar='LOG', help='Also append every raw response to a compressed log.')
+    feed.add_argument('--replay', metavar='LOG', help='Serve responses from a recorded log instead of the API; '
+                      'the scan ends when the log runs out.')
+    scan.add_argument('--speed', type=float, default=1.0,
+                      help='Replay speed: 1 for real time, N for N times faster, inf for no waiting.')
+    scan.set_defaults(handler=cmd_scan)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    from .utils import configure_logging
+    configure_logging(args.log_level)
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,37 +1,325 @@
+import hashlib
+import json
+import os
+import threading
 import requests
 import time
 import datetime
+import math
+from collections import OrderedDict
+from typing import NamedTuple
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson # Optional, several times faster than json for large payloads
+except ImportError:
+    orjson = None
+
+from .utils import METRICS, get_logger, instrument, timed
 
 """
 Module for data ingestion and initial processing.
 This would include functions to:
 - Fetch current token pair data from Dexscreener.
+- Fetch many tokens concurrently over pooled keep-alive connections.
+- Cache responses in memory (and optionally on disk) with TTL and revalidation.
+- Parse pairs into compact `PairSnapshot` records (or a NumPy structured array in bulk).
 - Handle API rate limits and errors.
 """
 
-def fetch_token_pair_data(chain_id: str, token_address: str) -> dict | None:
+DEXSCREENER_API_BASE_URL = "https://api.dexscreener.com"
+MAX_ADDRESSES_PER_REQUEST = 30 # Dexscreener accepts up to 30 comma-separated addresses
+DEFAULT_TIMEOUT = 10.0 # seconds
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_CACHE_TTL = 30.0 # seconds
+
+logger = get_logger(__name__)
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def create_session(pool_size: int = DEFAULT_MAX_CONCURRENCY) -> requests.Session:
+    """
+    Creates a requests session with a keep-alive connection pool.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host.
+
+    Returns:
+        requests.Session: A session that reuses connections across requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_shared_session() -> requests.Session:
+    """
+    Returns the module-wide pooled session, creating it on first use.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+class CacheEntry:
+    """
+    A cached response body together with its HTTP validators.
+    """
+    __slots__ = ('data', 'etag', 'last_modified', 'stored_at', 'expires_at')
+
+    def __init__(self, data, etag: str | None, last_modified: str | None, stored_at: float, expires_at: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class _InFlightRequest:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    """
+    Thread-safe response cache with an in-process LRU and an optional disk tier.
+
+    Entries expire after a per-entry TTL. Expired entries are kept so their
+    ETag/Last-Modified validators can be used to revalidate with a conditional
+    request; a 304 response simply extends the entry. Concurrent loads of the
+    same key are collapsed into a single upstream call.
+
+    Cached data is shared between callers and must be treated as read-only.
+
+    Args:
+        ttl (float): Default time-to-live for entries, in seconds.
+        max_entries (int): Maximum number of entries held in memory.
+        disk_path (str | None): Directory for the on-disk tier. Entries written
+                                there survive process restarts.
+        clock (callable): Returns the current Unix time; overridable in tests.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = 1024,
+                 disk_path: str | None = None, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stale': 0, 'revalidated': 0, 'coalesced': 0}
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read_disk(self, key: str) -> CacheEntry | None:
+        try:
+            with open(self._disk_file(key), 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(**record)
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        path = self._disk_file(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry.to_dict(), f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as err:
+            logger.warning("Could not write cache entry to disk: %s", err)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        # Caller must hold self._lock.
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Returns the entry for `key` (fresh or expired), or None if absent.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.disk_path:
+            entry = self._read_disk(key)
+            if entry is not None:
+                with self._lock:
+                    self._remember(key, entry)
+        return entry
+
+    def set(self, key: str, data, etag: str | None = None, last_modified: str | None = None,
+            ttl: float | None = None) -> CacheEntry:
+        """
+        Stores `data` under `key` and returns the new entry.
+        """
+        now = self.clock()
+        entry = CacheEntry(data, etag, last_modified, now, now + (self.ttl if ttl is None else ttl))
+        with self._lock:
+            self._remember(key, entry)
+        if self.disk_path:
+            self._write_disk(key, entry)
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self.clock() < entry.expires_at
+
+    def load(self, key: str, loader):
+        """
+        Returns cached data for `key`, calling `loader` on a miss or expiry.
+
+        `loader(stale_entry)` receives the expired entry (or None) and returns
+        either a new `(data, etag, last_modified)` tuple, or None to signal that
+        the stale entry is still valid (HTTP 304). Concurrent calls for the same
+        key wait for a single loader call instead of issuing their own.
+        """
+        entry = self.get(key)
+        with self._lock:
+            if entry is not None and self.is_fresh(entry):
+                self._counters['hits'] += 1
+                return entry.data
+            request = self._in_flight.get(key)
+            is_leader = request is None
+            if is_leader:
+                request = self._in_flight[key] = _InFlightRequest()
+                self._counters['misses' if entry is None else 'stale'] += 1
+            else:
+                self._counters['coalesced'] += 1
+
+        if not is_leader:
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+            return request.value
+
+        try:
+            result = loader(entry)
+            if result is None and entry is not None:
+                with self._lock:
+                    self._counters['revalidated'] += 1
+                entry = self.set(key, entry.data, entry.etag, entry.last_modified)
+            else:
+                entry = self.set(key, *result)
+            request.value = entry.data
+            return entry.data
+        except BaseException as err:
+            request.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            request.done.set()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss/stale/revalidated/coalesced counters and the entry count.
+        """
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries))
+
+    def clear(self) -> None:
+        """
+        Drops all entries (including the disk tier) and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        if self.disk_path:
+            for name in os.listdir(self.disk_path):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.disk_path, name))
+
+def _send(session: requests.Session, url: str, timeout: float, headers: dict | None = None) -> requests.Response:
+    """
+    Sends one GET, recording its latency and response size.
+    """
+    with timed('ingestion.request'):
+        response = session.get(url, timeout=timeout, headers=headers)
+    METRICS.increment('ingestion.bytes_received', len(response.content))
+    if response.status_code >= 400:
+        METRICS.increment('ingestion.http_errors')
+    return response
+
+def _json_loads(content: bytes):
+    # orjson.JSONDecodeError subclasses ValueError, like json's.
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+def _decode(response: requests.Response):
+    data = _json_loads(response.content)
+    METRICS.increment('ingestion.bytes_parsed', len(response.content))
+    return data
+
+def _get_json(url: str, session: requests.Session, timeout: float, cache: ResponseCache | None = None):
+    """
+    GETs `url` and decodes the JSON body, going through `cache` when given.
+    Raises requests exceptions on HTTP/connection errors and ValueError on bad JSON.
+    """
+    if cache is None:
+        response = _send(session, url, timeout)
+        response.raise_for_status()
+        return _decode(response)
+
+    def load(stale_entry):
+        headers = {}
+        if stale_entry is not None:
+            if stale_entry.etag:
+                headers['If-None-Match'] = stale_entry.etag
+            if stale_entry.last_modified:
+                headers['If-Modified-Since'] = stale_entry.last_modified
+        response = _send(session, url, timeout, headers)
+        if response.status_code == 304 and stale_entry is not None:
+            return None
+        response.raise_for_status()
+        return _decode(response), response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+    return cache.load(url, load)
+
+def fetch_token_pair_data(chain_id: str, token_address: str, cache: ResponseCache | None = None,
+                          base_url: str = DEXSCREENER_API_BASE_URL,
+                          session: requests.Session | None = None) -> dict | None:
     """
     Fetches current token pair data from the Dexscreener API.
 
     Args:
         chain_id (str): The blockchain ID (e.g., 'solana', 'ethereum').
         token_address (str): The address of the base token.
+        cache (ResponseCache | None): Optional cache to serve repeated requests from.
+        base_url (str): API root, overridable to point at a stub server.
+        session (requests.Session | None): Session to send the request with (e.g. a
+                                           `replay.RecordingSession` or `ReplaySession`).
+                                           Defaults to the shared pooled session.
 
     Returns:
         dict | None: A dictionary containing the token pair data, or None if fetching fails.
     """
-    print(f"Fetching token pair data for chain '{chain_id}' and token '{token_address}' from Dexscreener API...")
-    url = f"https://api.dexscreener.com/tokens/v1/{chain_id}/{token_address}"
+    logger.debug("Fetching token pair data for chain '%s' and token '%s' from Dexscreener API...", chain_id, token_address)
+    url = f"{base_url}/tokens/v1/{chain_id}/{token_address}"
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-        data = response.json() # This 'data' variable is now a list, e.g., [{...}]
+        # Raises an HTTPError for bad responses (4xx or 5xx)
+        data = _get_json(url, session or get_shared_session(), DEFAULT_TIMEOUT, cache) # This 'data' variable is now a list, e.g., [{...}]
 
         # The API returns a list of pair dictionaries.
         # We expect the first item in this list to be the pair data we want.
         if not isinstance(data, list) or not data:
-            print(f"API response is not a list or is empty for {token_address} on {chain_id}.")
+            logger.warning("API response is not a list or is empty for %s on %s.", token_address, chain_id)
             return None
 
         pair_info = data[0] # Get the first dictionary from the list
@@ -40,32 +328,283 @@ def fetch_token_pair_data(chain_id: str, token_address: str) -> dict | None:
         # Based on your example, the list directly contains the pair dictionary, not a 'pairs' key within it.
         # So, we directly use pair_info.
         if not pair_info:
-            print(f"No pair data found in the first item of the response for {token_address} on {chain_id}.")
+            logger.warning("No pair data found in the first item of the response for %s on %s.", token_address, chain_id)
             return None
 
-        print(f"Successfully fetched data for pair: {pair_info.get('baseToken', {}).get('symbol')} / {pair_info.get('quoteToken', {}).get('symbol')}")
+        logger.debug("Successfully fetched data for pair: %s / %s",
+                     pair_info.get('baseToken', {}).get('symbol'), pair_info.get('quoteToken', {}).get('symbol'))
         return pair_info # Return the pair dictionary
 
     except requests.exceptions.HTTPError as http_err:
-        print(f"HTTP error occurred: {http_err}")
-        print(f"Response content: {response.text}")
+        logger.warning("HTTP error occurred: %s", http_err, extra={'response_content': http_err.response.text})
     except requests.exceptions.ConnectionError as conn_err:
-        print(f"Connection error occurred: {conn_err}")
+        logger.warning("Connection error occurred: %s", conn_err)
     except requests.exceptions.Timeout as timeout_err:
-        print(f"Timeout error occurred: {timeout_err}")
+        logger.warning("Timeout error occurred: %s", timeout_err)
     except requests.exceptions.RequestException as req_err:
-        print(f"An error occurred during the request: {req_err}")
+        logger.warning("An error occurred during the request: %s", req_err)
     except ValueError as json_err:
-        print(f"Error decoding JSON response: {json_err}")
-        print(f"Response content: {response.text}")
+        logger.warning("Error decoding JSON response: %s", json_err)
     except IndexError:
-        print(f"API response list was empty for {token_address} on {chain_id}.")
+        logger.warning("API response list was empty for %s on %s.", token_address, chain_id)
     return None
 
-def process_raw_data(raw_data: dict) -> dict:
+def fetch_token_pairs_batch(chain_id: str, token_addresses: list, session: requests.Session | None = None,
+                            timeout: float = DEFAULT_TIMEOUT, base_url: str = DEXSCREENER_API_BASE_URL,
+                            cache: ResponseCache | None = None) -> list:
     """
-    Performs initial cleaning and structuring of raw data.
-    (Placeholder implementation)
+    Fetches pair data for up to MAX_ADDRESSES_PER_REQUEST tokens in one request.
+
+    Unlike `fetch_token_pair_data`, errors are not swallowed: HTTP and
+    connection failures raise `requests.exceptions.RequestException`, and an
+    unexpected payload raises `ValueError`.
+
+    Args:
+        chain_id (str): The blockchain ID (e.g., 'solana', 'ethereum').
+        token_addresses (list): Base token addresses to look up.
+        session (requests.Session | None): Session to send the request with.
+                                           Defaults to the shared pooled session.
+        timeout (float): Request timeout in seconds.
+        base_url (str): API root, overridable to point at a stub server.
+        cache (ResponseCache | None): Optional cache to serve repeated requests from.
+
+    Returns:
+        list: The pair dictionaries returned by the API (possibly several per token).
+    """
+    if len(token_addresses) > MAX_ADDRESSES_PER_REQUEST:
+        raise ValueError(f"At most {MAX_ADDRESSES_PER_REQUEST} addresses can be fetched per request.")
+    session = session or get_shared_session()
+    url = f"{base_url}/tokens/v1/{chain_id}/{','.join(token_addresses)}"
+    data = _get_json(url, session, timeout, cache)
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a list of pairs from {url}, got {type(data).__name__}.")
+    return data
+
+async def iter_token_pairs(chain_id: str, token_addresses, batch_size: int = MAX_ADDRESSES_PER_REQUEST,
+                           max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                           session: requests.Session | None = None, base_url: str = DEXSCREENER_API_BASE_URL,
+                           cache: ResponseCache | None = None):
+    """
+    Fetches pair data for many tokens concurrently, yielding pairs as they arrive.
+
+    Addresses are de-duplicated and grouped into comma-joined batches. At most
+    `max_concurrency` requests are in flight at once, all sharing one pooled
+    keep-alive session. A batch that fails is reported and skipped so the rest
+    of the scan continues.
+
+    Args:
+        chain_id (str): The blockchain ID (e.g., 'solana', 'ethereum').
+        token_addresses (iterable of str): Base token addresses to look up.
+        batch_size (int): Addresses per request (capped at MAX_ADDRESSES_PER_REQUEST).
+        max_concurrency (int): Maximum number of requests in flight.
+        timeout (float): Per-request timeout in seconds.
+        session (requests.Session | None): Session to reuse. A pooled session is
+                                           created (and closed) if omitted.
+        base_url (str): API root, overridable to point at a stub server.
+        cache (ResponseCache | None): Optional cache shared by all batches.
+
+    Yields:
+        dict: Pair dictionaries in completion order.
+    """
+    addresses = list(dict.fromkeys(token_addresses))
+    batch_size = max(1, min(batch_size, MAX_ADDRESSES_PER_REQUEST))
+    batches = [addresses[i:i + batch_size] for i in range(0, len(addresses), batch_size)]
+    if not batches:
+        return
+
+    # Imported here so that single-token lookups do not pay for asyncio at import time.
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    owns_session = session is None
+    if owns_session:
+        session = create_session(max_concurrency)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def fetch_batch(batch):
+        try:
+            return await loop.run_in_executor(
+                executor, fetch_token_pairs_batch, chain_id, batch, session, timeout, base_url, cache)
+        except (requests.exceptions.RequestException, ValueError) as err:
+            logger.warning("Failed to fetch %d tokens on '%s': %s", len(batch), chain_id, err)
+            return []
+
+    tasks = [asyncio.ensure_future(fetch_batch(batch)) for batch in batches]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for pair in await next_done:
+                yield pair
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if owns_session:
+            session.close()
+
+def fetch_token_pairs(chain_id: str, token_addresses, **kwargs) -> list:
+    """
+    Synchronous wrapper around `iter_token_pairs` for scripts without an event loop.
+
+    Accepts the same keyword arguments as `iter_token_pairs`.
+
+    Returns:
+        list: All pair dictionaries fetched, in completion order.
+    """
+    import asyncio
+
+    async def collect():
+        return [pair async for pair in iter_token_pairs(chain_id, token_addresses, **kwargs)]
+    return asyncio.run(collect())
+
+class PairSnapshot(NamedTuple):
+    """
+    The fields of a Dexscreener pair that the package uses, with numbers already parsed.
+    Missing numbers are NaN and missing strings are ''.
+    """
+    chain_id: str
+    dex_id: str
+    pair_address: str
+    base_address: str
+    base_symbol: str
+    quote_address: str
+    quote_symbol: str
+    price_usd: float
+    price_native: float
+    liquidity_usd: float
+    volume_h1: float
+    volume_h24: float
+    price_change_h1: float
+    price_change_h24: float
+    buys_h24: float
+    sells_h24: float
+    fdv: float
+    market_cap: float
+    pair_created_at: float # Unix seconds
+
+# Field types of the structured array built by `process_raw_batch`. Chain,
+# DEX and addresses are ASCII on every chain Dexscreener lists, so they are
+# stored as bytes; symbols may be any Unicode. String widths are minimums:
+# a batch with longer values (e.g. Sui coin types, `0x<64 hex>::module::NAME`)
+# gets wider fields, so nothing is truncated.
+SNAPSHOT_FIELDS = (
+    ('chain_id', 'S16'),
+    ('dex_id', 'S24'),
+    ('pair_address', 'S66'),
+    ('base_address', 'S66'),
+    ('base_symbol', 'U16'),
+    ('quote_address', 'S66'),
+    ('quote_symbol', 'U16'),
+) + tuple((name, 'f8') for name in PairSnapshot._fields[7:])
+
+_snapshot_dtype = None
+
+def snapshot_dtype(widths: dict | None = None):
+    """
+    Returns the NumPy structured dtype of `process_raw_batch` rows (NumPy is imported on first use).
+
+    Args:
+        widths (dict | None): {field: length} of string fields whose values are
+                              longer than their SNAPSHOT_FIELDS width.
+    """
+    global _snapshot_dtype
+    import numpy as np
+
+    if widths:
+        return np.dtype([(name, kind[0] + str(max(int(kind[1:]), widths.get(name, 0))) if kind[0] in 'SU' else kind)
+                         for name, kind in SNAPSHOT_FIELDS])
+    if _snapshot_dtype is None:
+        _snapshot_dtype = np.dtype(list(SNAPSHOT_FIELDS))
+    return _snapshot_dtype
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _section(raw_data: dict, key: str) -> dict:
+    value = raw_data.get(key)
+    return value if isinstance(value, dict) else {}
+
+def _snapshot_fields(raw_data: dict) -> tuple:
+    base, quote = _section(raw_data, 'baseToken'), _section(raw_data, 'quoteToken')
+    volume, change = _section(raw_data, 'volume'), _section(raw_data, 'priceChange')
+    txns_h24 = _section(_section(raw_data, 'txns'), 'h24')
+    return (
+        raw_data.get('chainId') or '',
+        raw_data.get('dexId') or '',
+        raw_data.get('pairAddress') or '',
+        base.get('address') or '',
+        base.get('symbol') or '',
+        quote.get('address') or '',
+        quote.get('symbol') or '',
+        _number(raw_data.get('priceUsd')),
+        _number(raw_data.get('priceNative')),
+        _number(_section(raw_data, 'liquidity').get('usd')),
+        _number(volume.get('h1')),
+        _number(volume.get('h24')),
+        _number(change.get('h1')),
+        _number(change.get('h24')),
+        _number(txns_h24.get('buys')),
+        _number(txns_h24.get('sells')),
+        _number(raw_data.get('fdv')),
+        _number(raw_data.get('marketCap')),
+        _number(raw_data.get('pairCreatedAt')) / 1000.0,
+    )
+
+def process_raw_data(raw_data: dict) -> PairSnapshot:
+    """
+    Parses a Dexscreener pair dictionary into a compact `PairSnapshot`.
+
+    Numeric fields (sent as strings or numbers) are converted to floats and
+    fields the package does not use are dropped. Called once per pair, so it is
+    only counted (`ingestion.rows_processed`), not timed; bulk parsing with
+    `process_raw_batch` is timed as 'ingestion.process_batch'.
+
+    Args:
+        raw_data (dict): One pair, as returned by `fetch_token_pair_data`.
+
+    Returns:
+        PairSnapshot: The parsed snapshot.
+    """
+    logger.debug("Processing raw data...")
+    METRICS.increment('ingestion.rows_processed')
+    return PairSnapshot(*_snapshot_fields(raw_data))
+
+# Positions of the fields stored as bytes in the structured array, and of all string fields with their widths.
+_BYTES_FIELDS = frozenset(i for i, (_, kind) in enumerate(SNAPSHOT_FIELDS) if kind.startswith('S'))
+_STRING_FIELDS = tuple((i, name, int(kind[1:])) for i, (name, kind) in enumerate(SNAPSHOT_FIELDS) if kind[0] in 'SU')
+
+@instrument('ingestion.process_batch')
+def process_raw_batch(raw_pairs):
     """
-    print("Processing raw data...")
-    return raw_data # For now, just return as is
+    Parses many pair dictionaries (or a raw JSON response body) into a NumPy
+    structured array with one row per pair and the fields of `PairSnapshot`
+    (see SNAPSHOT_FIELDS).
+
+    Args:
+        raw_pairs (list | bytes | str): Pair dictionaries, or the JSON body of a
+                                        `/tokens/v1` response, decoded with orjson
+                                        when it is installed.
+
+    Returns:
+        np.ndarray: Structured array of dtype `snapshot_dtype()`, with string
+                    fields widened to the longest value in the batch.
+    """
+    import numpy as np
+
+    if isinstance(raw_pairs, (bytes, str)):
+        raw_pairs = _json_loads(raw_pairs)
+    rows = [
+        tuple(value.encode('ascii', 'replace') if i in _BYTES_FIELDS else value
+              for i, value in enumerate(_snapshot_fields(raw_data)))
+        for raw_data in raw_pairs
+    ]
+    widths = {}
+    for i, name, width in _STRING_FIELDS:
+        longest = max(map(len, (row[i] for row in rows)), default=0)
+        if longest > width:
+            widths[name] = longest
+    METRICS.increment('ingestion.rows_processed', len(rows))
+    return np.array(rows, dtype=snapshot_dtype(widths))
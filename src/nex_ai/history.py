@@ -0,0 +1,278 @@
+"""
+Module for persisting token price history.
+
+Each fetched pair snapshot is appended to a local, per-(chain, token) columnar
+store so that signals and models can run on real history instead of a series
+simulated from the 24h price change.
+
+Layout on disk::
+
+    <root>/<chain_id>/<token_address>/timestamp.f8
+                                      price_usd.f8
+                                      volume.f8
+                                      liquidity.f8
+
+Every column is a flat, append-only file of little-endian float64 values.
+Reads memory-map these files, so range queries return NumPy views without
+copying or loading the whole history into Python lists.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from .utils import get_logger
+
+COLUMNS = ('timestamp', 'price_usd', 'volume', 'liquidity')
+COLUMN_DTYPE = np.dtype('<f8')
+
+logger = get_logger(__name__)
+
+class PriceHistory(NamedTuple):
+    """Column arrays for one token; all share the same length."""
+    timestamp: np.ndarray
+    price_usd: np.ndarray
+    volume: np.ndarray
+    liquidity: np.ndarray
+
+def _empty_history() -> PriceHistory:
+    return PriceHistory(*(np.empty(0, dtype=COLUMN_DTYPE) for _ in COLUMNS))
+
+def _path_component(name: str) -> str:
+    """
+    Percent-encodes an identifier into one directory name. Dots are escaped too
+    when they are all there is, so '.' and '..' cannot leave the store.
+    """
+    if not name:
+        raise ValueError("Chain and token identifiers must not be empty.")
+    encoded = quote(name, safe='')
+    return encoded.replace('.', '%2E') if encoded.strip('.') == '' else encoded
+
+def _nested_float(data: dict, *keys) -> float:
+    """Reads data[k1][k2]... as a float, returning NaN when missing or invalid."""
+    value = data
+    for key in keys:
+        if not isinstance(value, dict):
+            return np.nan
+        value = value.get(key)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+class PriceHistoryStore:
+    """
+    Append-only, memory-mapped time-series store for token snapshots.
+
+    Args:
+        root_dir (str): Directory holding the store.
+        max_points (int | None): Retention limit applied by `compact`: keep at
+                                 most this many of the most recent points.
+        max_age (float | None): Retention limit applied by `compact`: drop
+                                points older than this many seconds.
+        max_open_tokens (int): How many tokens keep their memory maps open.
+    """
+
+    def __init__(self, root_dir: str, max_points: int | None = None, max_age: float | None = None,
+                 max_open_tokens: int = 256):
+        self.root_dir = root_dir
+        self.max_points = max_points
+        self.max_age = max_age
+        self.max_open_tokens = max_open_tokens
+        self._lock = threading.RLock()
+        self._maps = OrderedDict() # (chain_id, token_address) -> (length, PriceHistory)
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _token_dir(self, chain_id: str, token_address: str) -> str:
+        return os.path.join(self.root_dir, _path_component(chain_id), _path_component(token_address))
+
+    def _column_path(self, token_dir: str, column: str) -> str:
+        return os.path.join(token_dir, f"{column}.f8")
+
+    def _stored_length(self, token_dir: str) -> int:
+        # Columns are appended one after another, so after an interrupted
+        # append they may differ in length; only complete rows count.
+        lengths = []
+        for column in COLUMNS:
+            try:
+                lengths.append(os.path.getsize(self._column_path(token_dir, column)) // COLUMN_DTYPE.itemsize)
+            except OSError:
+                return 0
+        return min(lengths)
+
+    def _open(self, chain_id: str, token_address: str) -> PriceHistory:
+        """Returns memory-mapped columns, reopening them if the files grew."""
+        key = (chain_id, token_address)
+        token_dir = self._token_dir(chain_id, token_address)
+        length = self._stored_length(token_dir)
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None and cached[0] == length:
+                self._maps.move_to_end(key)
+                return cached[1]
+            if length == 0:
+                history = _empty_history()
+            else:
+                history = PriceHistory(*(
+                    np.memmap(self._column_path(token_dir, column), dtype=COLUMN_DTYPE, mode='r', shape=(length,))
+                    for column in COLUMNS
+                ))
+            self._maps[key] = (length, history)
+            self._maps.move_to_end(key)
+            while len(self._maps) > self.max_open_tokens:
+                self._maps.popitem(last=False)
+            return history
+
+    def append(self, chain_id: str, token_address: str, timestamps, prices, volumes=None, liquidity=None) -> int:
+        """
+        Appends rows for one token.
+
+        Rows are sorted by timestamp; rows older than the last stored timestamp
+        are dropped to keep the series ordered.
+
+        Args:
+            chain_id (str): The blockchain ID (e.g., 'solana', 'ethereum').
+            token_address (str): The address of the base token.
+            timestamps (array-like): Unix timestamps in seconds.
+            prices (array-like): USD prices.
+            volumes (array-like | None): Volumes (NaN if omitted).
+            liquidity (array-like | None): Liquidity in USD (NaN if omitted).
+
+        Returns:
+            int: The number of rows written.
+        """
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=COLUMN_DTYPE))
+        n = len(timestamps)
+        columns = [timestamps]
+        for values in (prices, volumes, liquidity):
+            if values is None:
+                columns.append(np.full(n, np.nan, dtype=COLUMN_DTYPE))
+            else:
+                values = np.atleast_1d(np.asarray(values, dtype=COLUMN_DTYPE))
+                if len(values) != n:
+                    raise ValueError("All columns must have the same length as timestamps.")
+                columns.append(values)
+
+        order = np.argsort(timestamps, kind='stable')
+        columns = [values[order] for values in columns]
+
+        token_dir = self._token_dir(chain_id, token_address)
+        with self._lock:
+            existing = self._open(chain_id, token_address)
+            if len(existing.timestamp):
+                keep = columns[0] >= existing.timestamp[-1]
+                if not keep.all():
+                    logger.warning("Dropping %d out-of-order rows for %s on %s.",
+                                   int((~keep).sum()), token_address, chain_id)
+                    columns = [values[keep] for values in columns]
+            if len(columns[0]) == 0:
+                return 0
+
+            os.makedirs(token_dir, exist_ok=True)
+            length = self._stored_length(token_dir)
+            for column, values in zip(COLUMNS, columns):
+                with open(self._column_path(token_dir, column), 'ab') as f:
+                    # Discard the tail of a previously interrupted append.
+                    f.truncate(length * COLUMN_DTYPE.itemsize)
+                    f.write(values.tobytes())
+            return len(columns[0])
+
+    def append_snapshot(self, chain_id: str, token_address: str, pair_data, timestamp: float | None = None) -> int:
+        """
+        Appends one Dexscreener pair snapshot: a `PairSnapshot` (as returned by
+        `process_raw_data`) or a raw pair dictionary (as returned by `fetch_token_pair_data`).
+
+        Uses the USD price, 24h volume and USD liquidity; missing values are stored as NaN.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if isinstance(pair_data, dict):
+            row = (_nested_float(pair_data, 'priceUsd'), _nested_float(pair_data, 'volume', 'h24'),
+                   _nested_float(pair_data, 'liquidity', 'usd'))
+        else:
+            row = (pair_data.price_usd, pair_data.volume_h24, pair_data.liquidity_usd)
+        return self.append(chain_id, token_address, [timestamp], *([value] for value in row))
+
+    def query(self, chain_id: str, token_address: str, start: float | None = None, end: float | None = None) -> PriceHistory:
+        """
+        Returns the rows with start <= timestamp < end as read-only views.
+
+        Args:
+            chain_id (str): The blockchain ID.
+            token_address (str): The address of the base token.
+            start (float | None): Inclusive lower bound (Unix seconds), or None for the beginning.
+            end (float | None): Exclusive upper bound (Unix seconds), or None for the end.
+
+        Returns:
+            PriceHistory: Memory-mapped column views; empty arrays for unknown tokens.
+        """
+        history = self._open(chain_id, token_address)
+        lo = 0 if start is None else int(np.searchsorted(history.timestamp, start, side='left'))
+        hi = len(history.timestamp) if end is None else int(np.searchsorted(history.timestamp, end, side='left'))
+        return PriceHistory(*(values[lo:hi] for values in history))
+
+    def count(self, chain_id: str, token_address: str) -> int:
+        """Returns the number of stored rows for a token."""
+        return self._stored_length(self._token_dir(chain_id, token_address))
+
+    def tokens(self) -> list:
+        """Lists the (chain_id, token_address) pairs held in the store."""
+        found = []
+        for chain_name in sorted(os.listdir(self.root_dir)):
+            chain_dir = os.path.join(self.root_dir, chain_name)
+            if not os.path.isdir(chain_dir):
+                continue
+            for token_name in sorted(os.listdir(chain_dir)):
+                if os.path.isdir(os.path.join(chain_dir, token_name)):
+                    found.append((unquote(chain_name), unquote(token_name)))
+        return found
+
+    def compact(self, chain_id: str, token_address: str, now: float | None = None) -> int:
+        """
+        Rewrites a token's columns, applying the retention limits.
+
+        Rows sharing a timestamp are collapsed to the last one written, then
+        points older than `max_age` and beyond the newest `max_points` are
+        dropped. Files are replaced atomically, so concurrent readers keep
+        their existing (now detached) views.
+
+        Returns:
+            int: The number of rows removed.
+        """
+        with self._lock:
+            history = self._open(chain_id, token_address)
+            n = len(history.timestamp)
+            if n == 0:
+                return 0
+
+            timestamps = np.asarray(history.timestamp)
+            keep = np.ones(n, dtype=bool)
+            keep[:-1] = timestamps[1:] != timestamps[:-1]
+            if self.max_age is not None:
+                now = time.time() if now is None else now
+                keep &= timestamps >= now - self.max_age
+            if self.max_points is not None:
+                kept_index = np.flatnonzero(keep)
+                keep[kept_index[:-self.max_points] if self.max_points else kept_index] = False
+
+            removed = n - int(keep.sum())
+            if removed == 0:
+                return 0
+
+            token_dir = self._token_dir(chain_id, token_address)
+            for column, values in zip(COLUMNS, history):
+                path = self._column_path(token_dir, column)
+                with open(f"{path}.tmp", 'wb') as f:
+                    f.write(np.asarray(values)[keep].tobytes())
+            for column in COLUMNS:
+                path = self._column_path(token_dir, column)
+                os.replace(f"{path}.tmp", path)
+            self._maps.pop((chain_id, token_address), None)
+            return removed
+
+    def compact_all(self, now: float | None = None) -> int:
+        """Compacts every token in the store and returns the total rows removed."""
+        return sum(self.compact(chain_id, token_address, now) for chain_id, token_address in self.tokens())
@@ -5,8 +5,19 @@ This could include:
 - Anomaly detection models.
 - Classification models for market regimes.
 """
-from sklearn.linear_model import LinearRegression
+from typing import NamedTuple
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .utils import METRICS, get_logger, instrument, timed
+
+# Relative cut-off for small eigenvalues of the normal-equation matrices in
+# batched fits; collinear features (e.g. linearly interpolated prices) then get
+# the minimum-norm solution, like LinearRegression.
+_GRAM_RCOND = 1e-10
+
+logger = get_logger(__name__)
 
 def create_dataset(prices: list, look_back: int = 1) -> tuple[np.ndarray, np.ndarray]:
     """
@@ -14,6 +25,9 @@ def create_dataset(prices: list, look_back: int = 1) -> tuple[np.ndarray, np.nda
     Each sample (X) will be a sequence of 'look_back' previous prices,
     and the target (y) will be the next price in the sequence.
 
+    X is a read-only sliding-window view over a single contiguous buffer, so
+    overlapping windows share memory instead of being copied row by row.
+
     Args:
         prices (list): A list of numerical prices.
         look_back (int): The number of previous time steps to use as input features.
@@ -21,13 +35,14 @@ def create_dataset(prices: list, look_back: int = 1) -> tuple[np.ndarray, np.nda
     Returns:
         tuple[np.ndarray, np.ndarray]: A tuple containing X (features) and y (targets).
     """
-    X, y = [], []
-    for i in range(len(prices) - look_back):
-        feature_set = prices[i:(i + look_back)]
-        target = prices[i + look_back]
-        X.append(feature_set)
-        y.append(target)
-    return np.array(X), np.array(y)
+    if look_back < 1:
+        raise ValueError(f"look_back must be a positive integer, got {look_back}.")
+    values = np.asarray(prices)
+    if len(values) <= look_back:
+        return np.empty((0, look_back), dtype=values.dtype), np.empty(0, dtype=values.dtype)
+    X = sliding_window_view(values, look_back)[:-1]
+    y = values[look_back:]
+    return X, y
 
 def train_price_prediction_model(prices: list, look_back: int = 5):
     """
@@ -40,19 +55,331 @@ def train_price_prediction_model(prices: list, look_back: int = 5):
     Returns:
         sklearn.linear_model.LinearRegression: The trained linear regression model.
     """
-    print(f"Preparing data for model training with look_back={look_back}...")
+    logger.debug("Preparing data for model training with look_back=%d...", look_back)
     X, y = create_dataset(prices, look_back)
 
     if len(X) == 0:
-        print("Not enough data to create a dataset for training. Need more prices than look_back.")
+        logger.warning("Not enough data to create a dataset for training. Need more prices than look_back.")
         return None
 
-    print(f"Training linear regression model with {len(X)} samples...")
-    model = LinearRegression()
-    model.fit(X, y)
-    print("Model training complete.")
+    # scikit-learn takes over a second to import; load it only when a model is fit.
+    from sklearn.linear_model import LinearRegression
+
+    logger.debug("Training linear regression model with %d samples...", len(X))
+    with timed('models.fit'):
+        model = LinearRegression()
+        model.fit(X, y)
+    METRICS.increment('models.rows_fitted', len(X))
+    logger.debug("Model training complete.")
     return model
 
+class BatchLinearModel:
+    """
+    A stack of linear price models, one row of coefficients per token.
+
+    Attributes:
+        coef_ (np.ndarray): Coefficients, shape (n_tokens, look_back).
+        intercept_ (np.ndarray): Intercepts, shape (n_tokens,).
+        n_samples_ (np.ndarray): Training samples used per token (0 where the
+                                 series was too short; those rows are NaN).
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, n_samples: np.ndarray):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.n_samples_ = n_samples
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.coef_.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.coef_)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predicts one next price per token from a (n_tokens, look_back) matrix.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        return np.einsum('ij,ij->i', X, self.coef_) + self.intercept_
+
+def _fit_equal_length(series: np.ndarray, look_back: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Least-squares fit for a (n_tokens, n_prices) matrix of equally long series.
+    """
+    # Regression with an intercept is shift-invariant, so subtract each token's
+    # mean first; this keeps the normal equations well conditioned.
+    offsets = series.mean(axis=1)
+    shifted = series - offsets[:, None]
+    windows = sliding_window_view(shifted, look_back, axis=1)[:, :-1] # (tokens, samples, look_back) view
+    targets = shifted[:, look_back:]
+    n_samples = targets.shape[1]
+
+    mean_x = windows.mean(axis=1)
+    mean_y = targets.mean(axis=1)
+    gram = np.einsum('tsi,tsj->tij', windows, windows) - n_samples * mean_x[:, :, None] * mean_x[:, None, :]
+    moment = np.einsum('tsi,ts->ti', windows, targets) - n_samples * mean_x * mean_y[:, None]
+
+    coef = np.einsum('tij,tj->ti', np.linalg.pinv(gram, rcond=_GRAM_RCOND, hermitian=True), moment)
+    intercept = mean_y - np.einsum('ti,ti->t', coef, mean_x)
+    # Undo the shift: y - c = w.(x - c) + b  =>  y = w.x + b + c * (1 - sum(w))
+    intercept = intercept + offsets * (1.0 - coef.sum(axis=1))
+    return coef, intercept
+
+@instrument('models.fit_batch')
+def train_price_prediction_models(price_series, look_back: int = 5) -> BatchLinearModel:
+    """
+    Fits one linear price model per token with vectorised least squares.
+
+    Equivalent to calling `train_price_prediction_model` for every series, but
+    series of equal length are solved together in a single batched solve
+    instead of one scikit-learn fit per token.
+
+    Args:
+        price_series (list | np.ndarray): A list of price sequences (lengths may
+                                          differ), or a 2-D (n_tokens, n_prices) array.
+        look_back (int): The number of previous prices to use as features for prediction.
+
+    Returns:
+        BatchLinearModel: Stacked coefficients in the order of `price_series`.
+                          Tokens with too few prices get NaN coefficients.
+    """
+    if look_back < 1:
+        raise ValueError(f"look_back must be a positive integer, got {look_back}.")
+    n_tokens = len(price_series)
+    coef = np.full((n_tokens, look_back), np.nan)
+    intercept = np.full(n_tokens, np.nan)
+    n_samples = np.zeros(n_tokens, dtype=np.int64)
+
+    if isinstance(price_series, np.ndarray) and price_series.ndim == 2:
+        groups = {price_series.shape[1]: np.arange(n_tokens)}
+    else:
+        lengths = np.array([len(series) for series in price_series], dtype=np.int64)
+        groups = {int(length): np.flatnonzero(lengths == length) for length in np.unique(lengths)}
+
+    for length, rows in groups.items():
+        if length <= look_back:
+            continue
+        if isinstance(price_series, np.ndarray) and price_series.ndim == 2:
+            series = np.asarray(price_series, dtype=np.float64)
+        else:
+            series = np.array([price_series[row] for row in rows], dtype=np.float64)
+        coef[rows], intercept[rows] = _fit_equal_length(series, look_back)
+        n_samples[rows] = length - look_back
+
+    METRICS.increment('models.rows_fitted', int(n_samples.sum()))
+    return BatchLinearModel(coef, intercept, n_samples)
+
+class OnlinePricePredictor:
+    """
+    Linear next-price model updated one observation at a time with recursive least squares.
+
+    Each new price becomes the target for the previous `look_back` prices, so
+    keeping the model current costs O(look_back^2) per tick instead of a full
+    refit. With `forgetting_factor=1` the coefficients match a batch
+    `LinearRegression` fit on the same history; values below 1 weight recent
+    observations more heavily.
+
+    Until the windows span every feature direction (a flat or linearly ramping
+    start never does) the model keeps exact normal-equation statistics, solved
+    lazily with a pseudo-inverse. A Cholesky factorisation checks the rank on
+    each warm-up tick; once the statistics are well conditioned they are
+    inverted exactly and the model switches to O(look_back^2) RLS updates.
+
+    Exposes `coef_`, `intercept_`, `n_features_in_` and `predict`, so it can be
+    passed to `predict_next_price` like a trained scikit-learn model.
+
+    Args:
+        look_back (int): The number of previous prices to use as features for prediction.
+        forgetting_factor (float): Exponential forgetting factor in (0, 1].
+    """
+    __slots__ = ('look_back', 'forgetting_factor', 'n_updates', '_anchor', '_scale',
+                 '_window', '_filled', '_weights', '_inverse', '_max_trace', '_gram', '_moment')
+
+    # Largest condition number of the (diagonally scaled) statistics that is
+    # still inverted to seed RLS; anything worse stays in warm-up.
+    _MAX_WARM_UP_CONDITION = 1e10
+
+    def __init__(self, look_back: int = 5, forgetting_factor: float = 1.0):
+        if look_back < 1:
+            raise ValueError(f"look_back must be a positive integer, got {look_back}.")
+        if not 0.0 < forgetting_factor <= 1.0:
+            raise ValueError(f"forgetting_factor must be in (0, 1], got {forgetting_factor}.")
+        self.look_back = look_back
+        self.forgetting_factor = forgetting_factor
+        self.n_updates = 0
+        self._anchor = None # Prices are stored as (price - anchor) / scale to keep the
+        self._scale = 1.0   # normal equations well conditioned across price magnitudes.
+        self._window = np.zeros(look_back)
+        self._filled = 0
+        self._weights = None # [coefficients..., intercept] in scaled units
+        self._inverse = None # RLS inverse-covariance matrix once warmed up
+        self._max_trace = None # Cap on its trace; forgetting never grows it further
+        self._gram = np.zeros((look_back + 1, look_back + 1))
+        self._moment = np.zeros(look_back + 1)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.look_back
+
+    @property
+    def coef_(self) -> np.ndarray:
+        weights = self._current_weights()
+        if weights is None:
+            return np.full(self.look_back, np.nan)
+        return weights[:-1].copy()
+
+    @property
+    def intercept_(self) -> float:
+        weights = self._current_weights()
+        if weights is None:
+            return np.nan
+        # Undo the scaling: y = w.x + anchor * (1 - sum(w)) + scale * b
+        coef = weights[:-1]
+        return float(self._anchor * (1.0 - coef.sum()) + self._scale * weights[-1])
+
+    def _current_weights(self) -> np.ndarray | None:
+        """
+        Returns the weights, solving the warm-up statistics if they changed since the last call.
+        """
+        if self._weights is None and self._inverse is None and self.n_updates:
+            self._weights = np.linalg.pinv(self._gram, rcond=_GRAM_RCOND, hermitian=True) @ self._moment
+        return self._weights
+
+    def _exact_inverse(self) -> np.ndarray | None:
+        """
+        Inverts the warm-up statistics if they have full rank and are well conditioned.
+        """
+        scale = np.sqrt(np.diag(self._gram))
+        if not scale.all():
+            return None # Some feature has been exactly zero so far (e.g. a flat start)
+        normalised = self._gram / np.outer(scale, scale)
+        try:
+            pivots = np.diag(np.linalg.cholesky(normalised)) ** 2
+        except np.linalg.LinAlgError:
+            return None
+        # The pivot ratio is a cheap lower bound on the condition number; only
+        # candidates that pass it pay for the inverse and the exact check.
+        if pivots.min() * self._MAX_WARM_UP_CONDITION <= pivots.max():
+            return None
+        inverse = np.linalg.inv(normalised)
+        if np.linalg.norm(normalised, 1) * np.linalg.norm(inverse, 1) >= self._MAX_WARM_UP_CONDITION:
+            return None
+        return inverse / np.outer(scale, scale)
+
+    def _observe(self, features: np.ndarray, target: float) -> None:
+        lam = self.forgetting_factor
+        if self._inverse is None:
+            self._gram *= lam
+            self._gram += np.outer(features, features)
+            self._moment *= lam
+            self._moment += features * target
+            self._weights = None # Solved on demand by _current_weights
+            if self.n_updates > self.look_back:
+                inverse = self._exact_inverse()
+                if inverse is not None:
+                    self._inverse = inverse
+                    # Forgetting may inflate the inverse until it is as badly
+                    # conditioned, relative to the seeding statistics, as
+                    # warm-up would have accepted, but no further.
+                    self._max_trace = self._MAX_WARM_UP_CONDITION / float(np.trace(self._gram))
+                    self._weights = inverse @ self._moment
+                    self._gram = self._moment = None
+            return
+
+        projected = self._inverse @ features
+        gain = projected / (lam + features @ projected)
+        self._weights += gain * (target - features @ self._weights)
+        self._inverse -= np.outer(gain, projected)
+        # Forgetting inflates the inverse along directions the prices do not
+        # excite (covariance windup); stop inflating it past the cap.
+        if lam < 1.0 and np.trace(self._inverse) < lam * self._max_trace:
+            self._inverse /= lam
+
+    def update(self, price: float) -> None:
+        """
+        Ingests the next price, updating the model once `look_back` prices are buffered.
+        """
+        price = float(price)
+        if self._anchor is None:
+            self._anchor = price
+            self._scale = abs(price) or 1.0
+        scaled = (price - self._anchor) / self._scale
+
+        if self._filled == self.look_back:
+            self.n_updates += 1
+            self._observe(np.append(self._window, 1.0), scaled)
+            self._window[:-1] = self._window[1:]
+            self._window[-1] = scaled
+        else:
+            self._window[self._filled] = scaled
+            self._filled += 1
+
+    def update_many(self, prices) -> None:
+        """
+        Ingests a batch of prices in order.
+        """
+        for price in prices:
+            self.update(price)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predicts the next price for each row of a (n_samples, look_back) matrix.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        return X @ self.coef_ + self.intercept_
+
+    def predict_next(self) -> float | None:
+        """
+        Predicts the price following the most recent `look_back` prices seen.
+        """
+        weights = self._current_weights()
+        if weights is None or self._filled < self.look_back:
+            return None
+        return float(self._window @ weights[:-1] + weights[-1]) * self._scale + self._anchor
+
+    def get_state(self) -> dict:
+        """
+        Returns a JSON-serialisable snapshot of the model state.
+        """
+        def as_list(array):
+            return None if array is None else array.tolist()
+        return {
+            'look_back': self.look_back,
+            'forgetting_factor': self.forgetting_factor,
+            'n_updates': self.n_updates,
+            'anchor': self._anchor,
+            'scale': self._scale,
+            'window': self._window[:self._filled].tolist(),
+            'weights': as_list(self._current_weights()),
+            'inverse': as_list(self._inverse),
+            'max_trace': self._max_trace,
+            'gram': as_list(self._gram),
+            'moment': as_list(self._moment),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'OnlinePricePredictor':
+        """
+        Restores a model from a snapshot produced by `get_state`.
+        """
+        def as_array(values):
+            return None if values is None else np.array(values, dtype=np.float64)
+        model = cls(state['look_back'], state['forgetting_factor'])
+        model.n_updates = state['n_updates']
+        model._anchor = state['anchor']
+        model._scale = state['scale']
+        model._filled = len(state['window'])
+        model._window[:model._filled] = state['window']
+        model._weights = as_array(state['weights'])
+        model._inverse = as_array(state['inverse'])
+        model._max_trace = state.get('max_trace')
+        if model._max_trace is None and model._inverse is not None: # Saved before the bound existed
+            model._max_trace = float(np.trace(model._inverse))
+        model._gram = as_array(state['gram'])
+        model._moment = as_array(state['moment'])
+        return model
+
 def predict_next_price(model, latest_prices: list) -> float | None:
     """
     Uses the trained model to predict the next price.
@@ -66,13 +393,342 @@ def predict_next_price(model, latest_prices: list) -> float | None:
         float | None: The predicted next price, or None if prediction is not possible.
     """
     if model is None:
-        print("Model is not trained. Cannot make prediction.")
+        logger.warning("Model is not trained. Cannot make prediction.")
         return None
     if len(latest_prices) != model.n_features_in_:
-        print(f"Error: 'latest_prices' length ({len(latest_prices)}) must match model's expected features ({model.n_features_in_}).")
+        logger.warning("'latest_prices' length (%d) must match model's expected features (%d).",
+                       len(latest_prices), model.n_features_in_)
         return None
 
     # Reshape for prediction (model expects 2D array: [[feature1, feature2, ...]])
     input_features = np.array(latest_prices).reshape(1, -1)
     prediction = model.predict(input_features)[0]
     return prediction
+
+class BatchForecast(NamedTuple):
+    """
+    Result of `predict_next_prices`.
+
+    Attributes:
+        predictions (np.ndarray): Forecasts, shape (n_tokens, horizon); column h
+                                  is the price h + 1 steps ahead. Rows that
+                                  failed validation are NaN.
+        errors (dict): Maps row index to a validation message for failed rows.
+    """
+    predictions: np.ndarray
+    errors: dict
+
+def stack_models(models) -> BatchLinearModel:
+    """
+    Stacks individually trained models into a `BatchLinearModel`.
+
+    Accepts anything with `coef_` and `intercept_` (e.g. the result of
+    `train_price_prediction_model`, or an `OnlinePricePredictor`). None entries
+    become NaN rows, which `predict_next_prices` reports as untrained.
+    """
+    look_backs = {model.n_features_in_ for model in models if model is not None}
+    if len(look_backs) > 1:
+        raise ValueError(f"Cannot stack models with different look_back values: {sorted(look_backs)}.")
+    look_back = look_backs.pop() if look_backs else 0
+
+    coef = np.full((len(models), look_back), np.nan)
+    intercept = np.full(len(models), np.nan)
+    n_samples = np.zeros(len(models), dtype=np.int64)
+    for row, model in enumerate(models):
+        if model is not None:
+            coef[row] = model.coef_
+            intercept[row] = model.intercept_
+            n_samples[row] = getattr(model, 'n_updates', 0)
+    return BatchLinearModel(coef, intercept, n_samples)
+
+def _horizon_operators(coef: np.ndarray, intercept: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Returns r[t, h] such that forecast h + 1 steps ahead = r[t, h] . [window_t, 1].
+
+    Feeding forecasts back in is a linear recurrence, so every horizon is a
+    row of a power of the companion matrix. Horizons are filled by doubling
+    (rows for 1..j times M^j give rows for j+1..2j), so the number of batched
+    matrix products grows with log2(horizon), not with the horizon.
+    """
+    n_tokens, look_back = coef.shape
+    companion = np.zeros((n_tokens, look_back + 1, look_back + 1))
+    shift = np.arange(look_back - 1)
+    companion[:, shift, shift + 1] = 1.0
+    companion[:, look_back - 1, :look_back] = coef
+    companion[:, look_back - 1, look_back] = intercept
+    companion[:, look_back, look_back] = 1.0
+
+    rows = companion[:, look_back - 1:look_back, :] # horizon 1
+    power = companion
+    while rows.shape[1] < horizon:
+        rows = np.concatenate([rows, rows @ power], axis=1)
+        power = power @ power
+    return rows[:, :horizon, :]
+
+def predict_next_prices(model, latest_windows, horizon: int = 1) -> BatchForecast:
+    """
+    Predicts the next price(s) for many tokens at once.
+
+    Row i of `latest_windows` holds the most recent prices of token i and is
+    scored against row i of the stacked model in a single matrix product.
+    With horizon > 1, forecasts are fed back recursively (as repeated calls to
+    `predict_next_price` would), without looping over the steps in Python.
+
+    Args:
+        model (BatchLinearModel): Stacked per-token models (see
+                                  `train_price_prediction_models` and `stack_models`).
+        latest_windows (np.ndarray | list): (n_tokens, look_back) matrix, or a list of
+                                            per-token price lists.
+        horizon (int): Number of steps ahead to forecast.
+
+    Returns:
+        BatchForecast: Forecasts plus per-row validation errors.
+    """
+    if horizon < 1:
+        raise ValueError(f"horizon must be a positive integer, got {horizon}.")
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    n_tokens, look_back = coef.shape
+    if len(latest_windows) != n_tokens:
+        raise ValueError(f"Got {len(latest_windows)} windows for a model of {n_tokens} tokens.")
+
+    errors = {}
+    try:
+        windows = np.asarray(latest_windows, dtype=np.float64)
+        if windows.ndim != 2:
+            raise ValueError
+    except (TypeError, ValueError):
+        windows = None
+    if windows is None or windows.shape[1] != look_back:
+        # Ragged input: validate lengths row by row.
+        windows = np.full((n_tokens, look_back), np.nan)
+        for row, prices in enumerate(latest_windows):
+            if len(prices) != look_back:
+                errors[row] = f"Expected {look_back} latest prices, got {len(prices)}."
+                continue
+            try:
+                windows[row] = prices
+            except (TypeError, ValueError):
+                errors[row] = "Latest prices must be numeric."
+
+    untrained = ~(np.isfinite(coef).all(axis=1) & np.isfinite(intercept))
+    bad_prices = ~np.isfinite(windows).all(axis=1)
+    for row in np.flatnonzero(untrained):
+        errors.setdefault(int(row), "Model is not trained.")
+    for row in np.flatnonzero(bad_prices):
+        errors.setdefault(int(row), "Latest prices contain missing or non-finite values.")
+
+    valid = ~(untrained | bad_prices)
+    coef = np.where(valid[:, None], coef, 0.0)
+    intercept = np.where(valid, intercept, 0.0)
+    windows = np.where(valid[:, None], windows, 0.0)
+
+    if horizon == 1:
+        predictions = (np.einsum('ij,ij->i', windows, coef) + intercept)[:, None]
+    else:
+        operators = _horizon_operators(coef, intercept, horizon)
+        states = np.concatenate([windows, np.ones((n_tokens, 1))], axis=1)
+        predictions = np.einsum('thj,tj->th', operators, states)
+    predictions[~valid] = np.nan
+    return BatchForecast(predictions, errors)
+
+# Columns of `AnomalyDetector.state`, one row per token. Dispersion is the
+# EWMA variance, or the EWMA absolute deviation when the detector is robust.
+ANOMALY_STATE_COLUMNS = ('last_price', 'return_count', 'return_center', 'return_dispersion',
+                         'volume_count', 'volume_center', 'volume_dispersion')
+_LAST_PRICE, _RETURN_COUNT, _VOLUME_COUNT = 0, 1, 4
+
+# Scales a mean absolute deviation to a standard deviation for normal data (sqrt(pi / 2)).
+_ABS_DEVIATION_TO_STD = 1.2533141373155003
+
+class AnomalyScores(NamedTuple):
+    """
+    Result of `AnomalyDetector.update`, one entry per input row.
+
+    Attributes:
+        return_z (np.ndarray): z-score of each token's log price return (NaN when not scored).
+        volume_z (np.ndarray): z-score of each token's log volume (NaN when not scored).
+        price_spike (np.ndarray): |return_z| above the threshold.
+        volume_spike (np.ndarray): volume_z above the threshold (volume surges only).
+    """
+    return_z: np.ndarray
+    volume_z: np.ndarray
+    price_spike: np.ndarray
+    volume_spike: np.ndarray
+
+def _score_and_update(state: np.ndarray, column: int, values: np.ndarray, alpha: float,
+                      threshold: float, warm_up: int, robust: bool, min_scale: float) -> np.ndarray:
+    """
+    Scores `values` against the EWMA statistics in state[:, column:column + 3]
+    (count, center, dispersion), then folds them in. Returns NaN-padded z-scores.
+    """
+    count, center, dispersion = state[:, column], state[:, column + 1], state[:, column + 2]
+    # Dispersion starts at 0 with the first observation; debias it by the
+    # weight its (count - 1) updates carry so far, like Adam's moment estimates.
+    weight = 1.0 - (1.0 - alpha) ** np.maximum(count - 1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.where(weight > 0, dispersion / weight, 0.0)
+    scale = spread * _ABS_DEVIATION_TO_STD if robust else np.sqrt(spread)
+    # A flat history has zero dispersion; without a floor its first tiny move scores infinite.
+    scale = np.maximum(scale, min_scale)
+    deviation = values - center
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(scale > 0, deviation / scale, np.sign(deviation) * np.inf)
+    z[deviation == 0] = 0.0
+    z[count < warm_up] = np.nan
+
+    first = count == 0
+    if robust:
+        # Clip observations at the threshold so that spikes barely move the estimates.
+        limit = threshold * scale
+        deviation = np.where(first | (scale == 0), deviation, np.clip(deviation, -limit, limit))
+        center += alpha * deviation
+        dispersion += alpha * (np.abs(deviation) - dispersion)
+    else:
+        increment = alpha * deviation
+        center += increment
+        dispersion *= 1.0 - alpha
+        dispersion += (1.0 - alpha) * deviation * increment
+    center[first] = values[first]
+    dispersion[first] = 0.0
+    count += 1
+    return z
+
+class AnomalyDetector:
+    """
+    Online price and volume spike detector for a whole token universe.
+
+    Every token is a row of one float64 state matrix holding exponentially
+    weighted statistics of its log price returns and log volumes. Each polling
+    cycle scores and updates all tokens with a handful of vectorised
+    operations; an observation is flagged when its z-score against the
+    token's statistics *before* the update exceeds `threshold`.
+
+    With `robust=True`, the statistics are an EWMA center and an EWMA of the
+    absolute deviation (MAD), updated with observations clipped at the
+    threshold, so a burst of spikes inflates the spread far less than it does
+    the EWMA variance.
+
+    The estimated standard deviation is floored at `min_scale`, so a token
+    that has not moved for a while is not flagged on its first tick-sized move.
+
+    Args:
+        tokens (list): Initial token keys (strings, e.g. addresses), one row each.
+        alpha (float): EWMA weight of the newest observation, in (0, 1].
+        threshold (float): z-score above which an observation is flagged.
+        warm_up (int): Observations per token before it can be flagged.
+        robust (bool): Use the clipped center / absolute deviation statistics.
+        min_scale (float): Floor on the standard deviation of log returns and log
+                           volumes (1e-3 is about a 0.1% move); 0 disables it.
+    """
+
+    def __init__(self, tokens=(), alpha: float = 0.05, threshold: float = 4.0, warm_up: int = 20,
+                 robust: bool = False, min_scale: float = 1e-3):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}.")
+        if threshold <= 0:
+            raise ValueError(f"threshold must be positive, got {threshold}.")
+        if warm_up < 1:
+            raise ValueError(f"warm_up must be a positive integer, got {warm_up}.")
+        if not min_scale >= 0:
+            raise ValueError(f"min_scale must be non-negative, got {min_scale}.")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warm_up = warm_up
+        self.robust = robust
+        self.min_scale = min_scale
+        self.tokens = []
+        self._rows = {}
+        self.state = np.empty((0, len(ANOMALY_STATE_COLUMNS)))
+        self.add_tokens(tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def add_tokens(self, tokens) -> np.ndarray:
+        """
+        Adds rows for tokens not tracked yet.
+
+        Returns:
+            np.ndarray: The row of each of `tokens`.
+        """
+        new = [token for token in dict.fromkeys(tokens) if token not in self._rows]
+        if new:
+            for token in new:
+                self._rows[token] = len(self.tokens)
+                self.tokens.append(token)
+            rows = np.zeros((len(new), len(ANOMALY_STATE_COLUMNS)))
+            rows[:, _LAST_PRICE] = np.nan
+            self.state = np.concatenate([self.state, rows])
+        return np.array([self._rows[token] for token in tokens], dtype=np.intp)
+
+    @instrument('models.anomaly_update')
+    def update(self, prices, volumes=None, rows=None) -> AnomalyScores:
+        """
+        Scores one polling cycle and folds it into the state.
+
+        Args:
+            prices (array-like): Latest price per token; NaN (or <= 0) where a
+                                 token was not observed this cycle.
+            volumes (array-like | None): Volume traded per token over the cycle
+                                         (e.g. `volume_h1`); NaN where missing.
+            rows (array-like | None): Rows the entries belong to (see
+                                      `add_tokens`); by default, every tracked
+                                      token in order.
+
+        Returns:
+            AnomalyScores: z-scores and flags aligned with `prices`.
+        """
+        rows = np.arange(len(self.tokens)) if rows is None else np.asarray(rows, dtype=np.intp)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.full(len(rows), np.nan) if volumes is None else np.asarray(volumes, dtype=np.float64)
+        if not len(prices) == len(volumes) == len(rows):
+            raise ValueError(f"Got {len(prices)} prices and {len(volumes)} volumes for {len(rows)} tokens.")
+
+        return_z = np.full(len(rows), np.nan)
+        volume_z = np.full(len(rows), np.nan)
+        priced = prices > 0 # False for NaN
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.log(prices / self.state[rows, _LAST_PRICE])
+        scored = priced & np.isfinite(returns)
+        if scored.any():
+            block = self.state[rows[scored]]
+            return_z[scored] = _score_and_update(block, _RETURN_COUNT, returns[scored], self.alpha,
+                                                 self.threshold, self.warm_up, self.robust, self.min_scale)
+            self.state[rows[scored]] = block
+        self.state[rows[priced], _LAST_PRICE] = prices[priced]
+
+        observed = volumes >= 0 # False for NaN
+        if observed.any():
+            block = self.state[rows[observed]]
+            volume_z[observed] = _score_and_update(block, _VOLUME_COUNT, np.log1p(volumes[observed]), self.alpha,
+                                                   self.threshold, self.warm_up, self.robust, self.min_scale)
+            self.state[rows[observed]] = block
+
+        with np.errstate(invalid='ignore'):
+            scores = AnomalyScores(return_z, volume_z, np.abs(return_z) > self.threshold, volume_z > self.threshold)
+        flagged = int(np.count_nonzero(scores.price_spike | scores.volume_spike))
+        if flagged:
+            METRICS.increment('models.anomalies', flagged)
+            logger.debug("Flagged %d of %d tokens as anomalous.", flagged, len(rows))
+        return scores
+
+    def save(self, path: str) -> None:
+        """
+        Writes the state matrix, token keys and settings to a NumPy `.npz` file.
+        """
+        np.savez(path, state=self.state, tokens=np.array(self.tokens, dtype=str),
+                 settings=np.array([self.alpha, self.threshold, self.warm_up, self.robust, self.min_scale],
+                                   dtype=np.float64))
+
+    @classmethod
+    def load(cls, path: str) -> 'AnomalyDetector':
+        """
+        Restores a detector written by `save`.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            # Files saved before min_scale existed omit it and get the default.
+            alpha, threshold, warm_up, robust, *min_scale = data['settings'].tolist()
+            detector = cls(data['tokens'].tolist(), alpha, threshold, int(warm_up), bool(robust), *min_scale)
+            detector.state = data['state'].copy()
+        return detector
@@ -0,0 +1,259 @@
+"""
+Module for running per-token analysis over a whole token universe in parallel.
+
+Price histories are concatenated once into a single float64 block in shared
+memory (`multiprocessing.shared_memory`), indexed by per-token offsets. Pool
+workers attach to the block in their initializer, so tasks only carry token
+indices: no price array is pickled on the way in, and signals are written
+straight into a shared int8 block on the way out.
+
+Tokens are dispatched with guided self-scheduling: sorted largest-first and
+grouped into chunks that shrink as the remaining work shrinks. Idle workers
+pull the next chunk from the pool's queue, so a few very long series do not
+leave the other cores waiting at the end of the run. Results are reassembled
+in token order regardless of which worker finished first.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+from .models import BatchLinearModel, train_price_prediction_models
+from .signal_generation import generate_trading_signals_array
+from .utils import get_logger, timed
+
+logger = get_logger(__name__)
+
+class SharedSeries:
+    """
+    Variable-length series concatenated into one shared-memory block.
+
+    `series[i]` is a zero-copy view of token i. Use as a context manager (or
+    call `close`) to release the block; the creating process also unlinks it.
+
+    Args:
+        price_series (list | None): One sequence per token; None with `lengths`
+                                    allocates an uninitialised block instead.
+        dtype: Element type of the block.
+        lengths (array-like | None): Series lengths when `price_series` is None.
+    """
+
+    def __init__(self, price_series=None, dtype=np.float64, lengths=None):
+        arrays = None
+        if price_series is not None:
+            arrays = [np.asarray(series, dtype=dtype).ravel() for series in price_series]
+            lengths = [len(values) for values in arrays]
+        lengths = np.asarray(lengths, dtype=np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]) * dtype.itemsize, 1))
+        self._owner = True
+        self._bind(offsets, dtype)
+        if arrays is not None:
+            for values, start in zip(arrays, offsets[:-1].tolist()):
+                self.values[start:start + len(values)] = values
+
+    @classmethod
+    def attach(cls, name: str, offsets, dtype=np.float64) -> 'SharedSeries':
+        """
+        Attaches to a block created by another process.
+        """
+        series = cls.__new__(cls)
+        series._shm = shared_memory.SharedMemory(name=name)
+        series._owner = False
+        series._bind(np.asarray(offsets, dtype=np.int64), np.dtype(dtype))
+        return series
+
+    def _bind(self, offsets: np.ndarray, dtype: np.dtype) -> None:
+        self.offsets = offsets
+        self.dtype = dtype
+        self.values = np.ndarray(int(offsets[-1]), dtype=dtype, buffer=self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    def close(self) -> None:
+        """
+        Detaches from the block (and unlinks it in the creating process).
+        Views handed out earlier must no longer be used.
+        """
+        if self._shm is None:
+            return
+        self.values = None # Release the buffer export before closing
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def guided_chunks(lengths, workers: int, min_chunk_work: int = 10_000) -> list:
+    """
+    Splits token indices into chunks for guided self-scheduling.
+
+    Tokens are taken largest-first; each chunk holds about
+    remaining_work / (2 * workers) prices (at least one token and, unless a
+    single series is larger, at least `min_chunk_work` prices), so chunks
+    shrink towards the end of the run.
+
+    Returns:
+        list: Arrays of token indices, in dispatch order.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    order = np.argsort(-lengths, kind='stable')
+    work = np.maximum(lengths[order], 1) # Empty series still cost a task slot
+    remaining = int(work.sum())
+    chunks = []
+    start = 0
+    while start < len(order):
+        target = max(remaining / (2 * workers), min_chunk_work)
+        # First position whose cumulative work reaches the target.
+        cumulative = np.cumsum(work[start:])
+        stop = start + min(int(np.searchsorted(cumulative, target)) + 1, len(cumulative))
+        chunks.append(order[start:stop])
+        remaining -= int(cumulative[stop - start - 1])
+        start = stop
+    return chunks
+
+# --- Worker side ---
+
+_worker_inputs = None
+_worker_signals = None
+
+def _attach_worker(inputs_name: str, offsets, signals_name: str | None) -> None:
+    global _worker_inputs, _worker_signals
+    _worker_inputs = SharedSeries.attach(inputs_name, offsets)
+    if signals_name is not None:
+        _worker_signals = SharedSeries.attach(signals_name, offsets, np.int8)
+
+def _analyse_chunk_in_worker(indices, short_window: int, long_window: int, look_back: int | None):
+    """Writes each token's signals into the shared output block and fits the chunk's models."""
+    if _worker_signals is not None:
+        for index in indices.tolist():
+            _worker_signals[index][:] = generate_trading_signals_array(_worker_inputs[index], short_window, long_window)
+    if look_back is None:
+        return indices, None
+    return indices, train_price_prediction_models([_worker_inputs[index] for index in indices.tolist()], look_back)
+
+def _map_chunk_in_worker(func, indices):
+    return indices, [func(_worker_inputs[index]) for index in indices.tolist()]
+
+# --- Driver side ---
+
+class PipelineResult(NamedTuple):
+    """Per-token outputs of `run_pipeline`, in the order of the input series."""
+    signals: list | None            # int8 signal codes per token
+    model: BatchLinearModel | None  # Stacked next-price models, one row per token
+
+def _run_chunks(inputs: SharedSeries, signals_name: str | None, chunks: list, submit_args, max_workers: int):
+    """Submits `submit_args(indices)` = (worker function, *args) for every chunk; yields results in dispatch order."""
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_worker,
+                             initargs=(inputs.name, inputs.offsets, signals_name)) as pool:
+        futures = [pool.submit(*submit_args(indices)) for indices in chunks]
+        for future in futures:
+            yield future.result()
+
+def _workers(max_workers: int | None, n_tokens: int) -> int:
+    return max(1, min(max_workers or os.cpu_count() or 1, n_tokens))
+
+def run_pipeline(price_series, short_window: int = 10, long_window: int = 30, look_back: int | None = 5,
+                 signals: bool = True, max_workers: int | None = None,
+                 min_chunk_work: int = 10_000) -> PipelineResult:
+    """
+    Generates crossover signals and fits next-price models for many tokens across a process pool.
+
+    Equivalent to calling `generate_trading_signals_array` on every series and
+    `train_price_prediction_models` on the whole universe in this process.
+
+    Args:
+        price_series (list): One price sequence per token (lengths may differ).
+        short_window (int): The window size for the short-term SMA.
+        long_window (int): The window size for the long-term SMA.
+        look_back (int | None): Look-back of the price models; None skips model fitting.
+        signals (bool): Whether to generate signals.
+        max_workers (int | None): Pool size (defaults to the CPU count); 1 runs
+                                  everything in this process.
+        min_chunk_work (int): Smallest chunk, in prices, worth a round-trip to a worker.
+
+    Returns:
+        PipelineResult: Signals and models in the order of `price_series`.
+    """
+    n_tokens = len(price_series)
+    workers = _workers(max_workers, n_tokens)
+    if workers == 1:
+        with timed('pipeline.run'):
+            arrays = [np.asarray(series, dtype=np.float64).ravel() for series in price_series]
+            return PipelineResult(
+                [generate_trading_signals_array(values, short_window, long_window) for values in arrays] if signals else None,
+                train_price_prediction_models(arrays, look_back) if look_back is not None else None,
+            )
+
+    coef = np.full((n_tokens, look_back or 0), np.nan)
+    intercept = np.full(n_tokens, np.nan)
+    n_samples = np.zeros(n_tokens, dtype=np.int64)
+    signal_codes = None
+    with timed('pipeline.run'), SharedSeries(price_series) as inputs:
+        chunks = guided_chunks(inputs.lengths, workers, min_chunk_work)
+        logger.debug("Analysing %d tokens (%d prices) in %d chunks on %d workers.",
+                     n_tokens, len(inputs.values), len(chunks), workers)
+        output = SharedSeries(lengths=inputs.lengths, dtype=np.int8) if signals else None
+        try:
+            results = _run_chunks(
+                inputs, output.name if output is not None else None, chunks,
+                lambda indices: (_analyse_chunk_in_worker, indices, short_window, long_window, look_back),
+                workers)
+            for indices, model in results:
+                if model is not None:
+                    coef[indices], intercept[indices], n_samples[indices] = model.coef_, model.intercept_, model.n_samples_
+            if output is not None:
+                codes = output.values.copy() # Detach from shared memory before it is released
+                signal_codes = [codes[start:stop] for start, stop in zip(output.offsets[:-1], output.offsets[1:])]
+        finally:
+            if output is not None:
+                output.close()
+
+    model = BatchLinearModel(coef, intercept, n_samples) if look_back is not None else None
+    return PipelineResult(signal_codes, model)
+
+def map_series(func, price_series, max_workers: int | None = None, min_chunk_work: int = 10_000) -> list:
+    """
+    Applies `func(prices)` to every series across a process pool.
+
+    The series are shared with the workers instead of pickled; `func` must be
+    a module-level function and its results must be picklable.
+
+    Returns:
+        list: `func`'s results in the order of `price_series`.
+    """
+    n_tokens = len(price_series)
+    workers = _workers(max_workers, n_tokens)
+    if workers == 1:
+        with timed('pipeline.map'):
+            return [func(np.asarray(series, dtype=np.float64).ravel()) for series in price_series]
+
+    results = [None] * n_tokens
+    with timed('pipeline.map'), SharedSeries(price_series) as inputs:
+        chunks = guided_chunks(inputs.lengths, workers, min_chunk_work)
+        done = _run_chunks(inputs, None, chunks, lambda indices: (_map_chunk_in_worker, func, indices), workers)
+        for indices, values in done:
+            for index, value in zip(indices.tolist(), values):
+                results[index] = value
+    return results
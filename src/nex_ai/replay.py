@@ -0,0 +1,373 @@
+"""
+Module for recording Dexscreener responses and replaying them offline.
+
+`RecordingSession` wraps a requests session and appends every raw response
+(URL, status, caching headers and body) with its timestamp to a gzip-compressed
+JSON-lines log. `ReplaySession` serves a recorded log back through the same
+`get` interface, so anything in the ingestion layer that takes a `session`
+(`fetch_token_pair_data`, `fetch_token_pairs_batch`, `iter_token_pairs`, the
+scanner's fetcher) runs against it unchanged:
+
+    with RecordingSession('feeds/today.jsonl.gz') as session:
+        fetch_token_pairs_batch('solana', addresses, session=session)
+
+    replay = ReplaySession('feeds/today.jsonl.gz', speed=60.0) # one hour per minute
+    fetch_token_pairs_batch('solana', addresses, session=replay)
+
+Playback speed is 1.0 for real time, N for N times faster, or `math.inf` to
+serve responses back to back with no waiting at all. To replay a recorded scan,
+drive the `Scanner` with the session's `scanner_clock()`, so its schedule runs
+on the recorded timeline (at `speed`) and stops when the log runs out:
+
+    replay = ReplaySession('feeds/today.jsonl.gz', speed=math.inf)
+    scanner = Scanner(fetcher=make_fetcher(replay), clock=replay.scanner_clock())
+    scanner.run(stop_event=replay.finished)
+"""
+import bisect
+import gzip
+import http.client
+import json
+import math
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .data_ingestion import create_session
+from .scanner import SystemClock
+from .utils import METRICS, get_logger
+
+logger = get_logger(__name__)
+
+# Response headers worth keeping: the ones the cache and the scanner look at.
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Retry-After')
+
+# Path prefix of the token endpoint, whose recordings are split per token address.
+TOKENS_PATH = '/tokens/v1/'
+
+def _request_key(url: str) -> str:
+    """Path and query of a URL, so recordings replay under any base URL."""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+def _token_request(key: str) -> tuple | None:
+    """Splits a `/tokens/v1/{chain}/{a,b,...}` key into (chain key prefix, addresses)."""
+    if not key.startswith(TOKENS_PATH) or '?' in key:
+        return None
+    chain_id, _, addresses = key[len(TOKENS_PATH):].partition('/')
+    if not chain_id or not addresses or '/' in addresses:
+        return None
+    return f"{TOKENS_PATH}{chain_id}/", [address for address in addresses.split(',') if address]
+
+def _recorded_pairs(record: dict) -> list | None:
+    """The pairs of a successful token response, or None."""
+    if record['status'] != 200:
+        return None
+    try:
+        pairs = json.loads(record['body'])
+    except ValueError:
+        return None
+    return pairs if isinstance(pairs, list) else None
+
+def _split_tokens_record(record: dict, prefix: str, addresses: list) -> list:
+    """
+    Splits a recorded token batch into one record per address, holding the
+    pairs whose base or quote token is that address. Returns (key, record) items.
+    """
+    pairs = _recorded_pairs(record)
+    headers = record['headers']
+    if len(addresses) > 1:
+        # Validators of the whole batch do not describe the parts.
+        headers = {name: value for name, value in headers.items() if name not in ('ETag', 'Last-Modified')}
+    split = []
+    for address in addresses:
+        body = record['body']
+        if pairs is not None:
+            wanted = address.lower()
+            body = json.dumps([pair for pair in pairs if isinstance(pair, dict) and wanted in (
+                str((pair.get('baseToken') or {}).get('address')).lower(),
+                str((pair.get('quoteToken') or {}).get('address')).lower())])
+        split.append((prefix + address.lower(), dict(record, headers=headers, body=body)))
+    return split
+
+class ResponseLog:
+    """
+    Append-only, gzip-compressed JSON-lines log of responses.
+
+    Each record is flushed as it is written, so a log stays readable up to the
+    last complete record if the process dies. Reopening an existing log
+    appends a new gzip member after the previous ones.
+
+    Args:
+        path (str): The log file, conventionally ending in '.jsonl.gz'.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self._file = gzip.open(path, 'ab')
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.records += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_log(path: str):
+    """
+    Yields the records of a response log in the order they were written.
+
+    A truncated tail (e.g. from a crash mid-write) is skipped with a warning.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                if not line.endswith('\n'):
+                    break # Partial last record
+                yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile) as err:
+            logger.warning("Response log %s is truncated: %s", path, err)
+
+class RecordingSession:
+    """
+    A requests-compatible session that records every response it returns.
+
+    Args:
+        path (str): Response log to append to.
+        session (requests.Session | None): Session that performs the requests
+                                           (a new pooled session by default).
+        clock: Object with `time()`, used to timestamp records.
+    """
+
+    def __init__(self, path: str, session: requests.Session | None = None, clock=None):
+        self.session = session or create_session()
+        self.clock = clock or SystemClock()
+        self.log = ResponseLog(path)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        timestamp = self.clock.time()
+        response = self.session.get(url, **kwargs)
+        self.log.append({
+            'ts': timestamp,
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'body': response.content.decode('utf-8', 'replace'),
+        })
+        METRICS.increment('replay.recorded')
+        return response
+
+    def close(self) -> None:
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _build_response(url: str, status: int, headers: dict, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = http.client.responses.get(status, '')
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = 'utf-8'
+    response._content = body
+    return response
+
+class ReplaySession:
+    """
+    A requests-compatible session that serves responses from a recorded log.
+
+    Requests are matched on URL path and query, ignoring the host, so the
+    recording replays under any `base_url`. Token requests
+    (`/tokens/v1/{chain}/{addresses}`) are matched per address instead: the
+    recorded batches are split by token and a request gets the pairs of each
+    of its addresses, however the addresses were grouped when recording.
+
+    With a finite `speed`, the session follows a replay timeline that starts
+    at the first recorded timestamp and advances `speed` times faster than
+    `clock`. A request gets the latest response recorded for its URL at that
+    point of the timeline; a request made before its URL's first recording
+    waits (on `clock`) until it is due.
+
+    With `speed=math.inf`, each request instead gets the next response
+    recorded for its URL, without waiting, and the last one is repeated once
+    they run out. Once a `scanner_clock()` is in use, requests follow its
+    position on the timeline at any speed.
+
+    `finished` is set once the log is exhausted: when the timeline passes the
+    last record, or (with `speed=math.inf` and no scanner clock) when every
+    requested URL has been served all its records.
+
+    Unrecorded URLs get a 404. A matching If-None-Match header gets a 304.
+
+    Args:
+        source (str | list): A log path, or already-loaded records.
+        speed (float): Playback speed (1.0 = real time).
+        clock: Object with `time()` and `sleep(seconds)`, e.g. `ManualClock`.
+    """
+
+    def __init__(self, source, speed: float = 1.0, clock=None):
+        if not speed > 0:
+            raise ValueError("speed must be positive.")
+        records = list(read_log(source)) if isinstance(source, str) else list(source)
+        records.sort(key=lambda record: record['ts'])
+        self.records = records
+        self.speed = speed
+        self.clock = clock or SystemClock()
+        self.start_time = records[0]['ts'] if records else 0.0
+        self.end_time = records[-1]['ts'] if records else 0.0
+        self._by_key = {} # request key (per address for token requests) -> ([timestamps], [records])
+        for record in records:
+            key = _request_key(record['url'])
+            token_request = _token_request(key)
+            for key, record in _split_tokens_record(record, *token_request) if token_request else [(key, record)]:
+                timestamps, recorded = self._by_key.setdefault(key, ([], []))
+                timestamps.append(record['ts'])
+                recorded.append(record)
+        self._cursors = {} # request key -> records served, with speed=math.inf
+        self._exhausted = 0 # Keys in _cursors with every record served
+        self._timeline = None
+        self._started_at = None
+        self._lock = threading.Lock()
+        self.finished = threading.Event()
+
+    def scanner_clock(self) -> 'ReplayClock':
+        """
+        Returns a clock that runs a `Scanner` on the recorded timeline and
+        makes requests follow it (also with `speed=math.inf`).
+        """
+        if self._timeline is None:
+            self._timeline = ReplayClock(self)
+        return self._timeline
+
+    def recorded_time(self) -> float:
+        """
+        The current position on the recorded timeline (starts on first use).
+        """
+        if self._timeline is not None:
+            return self._timeline.time()
+        return self._playback_time()
+
+    def _playback_time(self) -> float:
+        if self._started_at is None:
+            self._started_at = self.clock.time()
+        if math.isinf(self.speed):
+            return self.end_time
+        return self.start_time + (self.clock.time() - self._started_at) * self.speed
+
+    def _wait_until(self, timestamp: float) -> None:
+        if math.isinf(self.speed):
+            return
+        wait = (timestamp - self.recorded_time()) / self.speed
+        if wait > 0:
+            self.clock.sleep(wait)
+
+    def _next_record(self, key: str) -> dict | None:
+        entry = self._by_key.get(key)
+        if entry is None:
+            return None
+        timestamps, recorded = entry
+        if math.isinf(self.speed) and self._timeline is None:
+            with self._lock:
+                served = self._cursors[key] = self._cursors.get(key, 0) + 1
+                if served == len(recorded):
+                    self._exhausted += 1
+            return recorded[min(served, len(recorded)) - 1]
+        index = bisect.bisect_right(timestamps, self.recorded_time()) - 1
+        if index < 0:
+            self._wait_until(timestamps[0])
+            index = 0
+        return recorded[index]
+
+    def _next_tokens_record(self, prefix: str, addresses: list) -> dict | None:
+        """Assembles a token request's response from the records of its addresses."""
+        found = [record for record in (self._next_record(prefix + address.lower()) for address in addresses)
+                 if record is not None]
+        if len(found) <= 1:
+            return found[0] if found else None
+        parts = [pairs for pairs in map(_recorded_pairs, found) if pairs is not None]
+        if not parts:
+            return found[0]
+        return {'status': 200, 'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps([pair for pairs in parts for pair in pairs])}
+
+    def get(self, url: str, headers: dict | None = None, **kwargs) -> requests.Response:
+        """
+        Serves the recorded response for `url` (other requests arguments are ignored).
+        """
+        key = _request_key(url)
+        token_request = _token_request(key)
+        record = self._next_tokens_record(*token_request) if token_request else self._next_record(key)
+        if self._cursors and self._exhausted == len(self._cursors):
+            self.finished.set()
+        METRICS.increment('replay.served')
+        if record is None:
+            return _build_response(url, 404, {'Content-Type': 'text/plain'}, b'Not recorded')
+        etag = record['headers'].get('ETag')
+        if etag and headers and headers.get('If-None-Match') == etag:
+            return _build_response(url, 304, record['headers'], b'')
+        return _build_response(url, record['status'], record['headers'], record['body'].encode('utf-8'))
+
+    def play(self):
+        """
+        Yields (timestamp, url, response) for every record in recorded order,
+        paced by `speed` on `clock`.
+        """
+        for record in self.records:
+            self._wait_until(record['ts'])
+            yield record['ts'], record['url'], _build_response(
+                record['url'], record['status'], record['headers'], record['body'].encode('utf-8'))
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ReplayClock:
+    """
+    A scanner clock on a replay's recorded timeline (see `ReplaySession.scanner_clock`).
+
+    `time()` is the position on the timeline, starting at the first record.
+    Sleeping advances it: `seconds / speed` of real time at a finite speed,
+    instantly with `speed=math.inf`. A sleep that would pass the last record
+    sets the session's `finished` event instead.
+    """
+
+    def __init__(self, session: ReplaySession):
+        self.session = session
+        self.now = session.start_time # Used with speed=math.inf
+
+    def time(self) -> float:
+        if math.isinf(self.session.speed):
+            return self.now
+        return self.session._playback_time()
+
+    def sleep(self, seconds: float, stop_event: threading.Event | None = None) -> None:
+        if seconds <= 0:
+            return
+        if self.time() + seconds > self.session.end_time:
+            self.session.finished.set()
+        elif math.isinf(self.session.speed):
+            self.now += seconds
+        else:
+            self.session.clock.sleep(seconds / self.session.speed, stop_event)
@@ -0,0 +1,395 @@
+"""
+Module for continuously scanning a watchlist of tokens.
+
+`Scanner` keeps thousands of pairs fresh through the ingestion module:
+- Each token has its own polling interval, shortened when its price moves or
+  trades heavily and lengthened when it is quiet.
+- Due tokens are batched per chain (up to MAX_ADDRESSES_PER_REQUEST per request)
+  and requests are paced by a global token-bucket budget.
+- 429 and 5xx responses trigger exponential backoff with jitter (honouring
+  Retry-After).
+- Every fresh price is fed to a per-token `SignalStream` and the result is
+  published to a callback or queue.
+
+Time is read through a clock object, so `ManualClock` makes the scanner fully
+deterministic for offline tests.
+"""
+import functools
+import heapq
+import math
+import random
+import threading
+import time
+from typing import NamedTuple
+
+import requests
+
+from .data_ingestion import MAX_ADDRESSES_PER_REQUEST, PairSnapshot, fetch_token_pairs_batch, process_raw_data
+from .signal_generation import SignalStream
+from .utils import METRICS, get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_REQUESTS_PER_SECOND = 4.0 # Dexscreener allows ~300 requests/minute on the tokens endpoint
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+class SystemClock:
+    """Wall-clock time and real sleeping."""
+
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float, stop_event: threading.Event | None = None) -> None:
+        if seconds <= 0:
+            return
+        if stop_event is not None:
+            stop_event.wait(seconds) # Wakes up early when stopped
+        else:
+            time.sleep(seconds)
+
+class ManualClock:
+    """A deterministic clock for tests and replays: sleeping just advances time."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float, stop_event: threading.Event | None = None) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now += seconds
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None, clock=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock or SystemClock()
+        self._tokens = self.burst
+        self._updated = self.clock.time()
+
+    def _refill(self) -> None:
+        now = self.clock.time()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Takes one request from the budget if available."""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def time_until_available(self) -> float:
+        """Seconds until the next request fits in the budget."""
+        self._refill()
+        return max(0.0, (1.0 - self._tokens) / self.rate)
+
+class ScanResult(NamedTuple):
+    """One polled token, as published by the scanner."""
+    chain_id: str
+    token_address: str
+    timestamp: float
+    price_usd: float
+    signal: str | None     # 'BUY', 'SELL' or None, from the token's SignalStream
+    interval: float        # The token's polling interval after this poll
+    pair: PairSnapshot     # The parsed pair snapshot
+
+class _WatchedToken:
+    __slots__ = ('chain_id', 'token_address', 'interval', 'next_due', 'last_price', 'stream', 'removed')
+
+    def __init__(self, chain_id: str, token_address: str, interval: float, next_due: float, stream: SignalStream):
+        self.chain_id = chain_id
+        self.token_address = token_address
+        self.interval = interval
+        self.next_due = next_due
+        self.last_price = None
+        self.stream = stream
+        self.removed = False
+
+class Scanner:
+    """
+    Long-running multi-token poller with an adaptive per-token schedule.
+
+    Args:
+        fetcher (callable | None): `fetcher(chain_id, addresses) -> list of pairs`,
+                                   raising `requests.HTTPError` on HTTP errors.
+                                   Defaults to `fetch_token_pairs_batch`.
+        publish (callable | queue.Queue | None): Receives each `ScanResult`.
+        clock: Object with `time()` and `sleep(seconds, stop_event)`; defaults to `SystemClock`.
+        requests_per_second (float): Global request budget.
+        base_interval (float): Polling interval for a token with no recent activity signal.
+        min_interval (float): Fastest allowed polling interval, in seconds.
+        max_interval (float): Slowest allowed polling interval, in seconds.
+        volatility_target (float): Fractional price move per poll considered "active".
+        volume_reference (float): 1h USD volume at which volume starts to speed up polling.
+        short_window (int): Short SMA window of each token's SignalStream.
+        long_window (int): Long SMA window of each token's SignalStream.
+        backoff_base (float): First backoff delay after a 429/5xx, in seconds.
+        backoff_max (float): Upper bound on the backoff delay, in seconds.
+        seed (int | None): Seed for the backoff jitter.
+    """
+
+    def __init__(self, fetcher=None, publish=None, clock=None,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 base_interval: float = 60.0, min_interval: float = 10.0, max_interval: float = 600.0,
+                 volatility_target: float = 0.01, volume_reference: float = 100_000.0,
+                 short_window: int = 10, long_window: int = 30,
+                 backoff_base: float = 2.0, backoff_max: float = 300.0, seed: int | None = None):
+        if not 0 < min_interval <= base_interval <= max_interval:
+            raise ValueError("Expected 0 < min_interval <= base_interval <= max_interval.")
+        self.fetcher = fetcher or fetch_token_pairs_batch
+        self.publish = publish
+        self.clock = clock or SystemClock()
+        self.rate_limiter = RateLimiter(requests_per_second, clock=self.clock)
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.volatility_target = volatility_target
+        self.volume_reference = volume_reference
+        self.short_window = short_window
+        self.long_window = long_window
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.backoff_until = -math.inf
+        self.consecutive_failures = 0
+        self._random = random.Random(seed)
+        self._tokens = {} # (chain_id, token_address) -> _WatchedToken
+        self._queue = []  # heap of (next_due, sequence, _WatchedToken)
+        self._sequence = 0
+        self._lock = threading.RLock()
+
+    # --- Watchlist ---
+
+    def add(self, chain_id: str, token_address: str) -> None:
+        """Adds a token to the watchlist; it is due immediately."""
+        with self._lock:
+            key = (chain_id, token_address)
+            if key in self._tokens:
+                return
+            watched = _WatchedToken(chain_id, token_address, self.base_interval, self.clock.time(),
+                                    SignalStream(self.short_window, self.long_window))
+            self._tokens[key] = watched
+            self._push(watched)
+
+    def remove(self, chain_id: str, token_address: str) -> None:
+        """Removes a token from the watchlist."""
+        with self._lock:
+            watched = self._tokens.pop((chain_id, token_address), None)
+            if watched is not None:
+                watched.removed = True # Lazily dropped from the heap
+
+    def watchlist(self) -> list:
+        """Returns the watched (chain_id, token_address) pairs."""
+        with self._lock:
+            return list(self._tokens)
+
+    def interval(self, chain_id: str, token_address: str) -> float:
+        """Returns a token's current polling interval."""
+        return self._tokens[(chain_id, token_address)].interval
+
+    def _push(self, watched: _WatchedToken) -> None:
+        self._sequence += 1
+        heapq.heappush(self._queue, (watched.next_due, self._sequence, watched))
+
+    def next_due(self) -> float:
+        """Returns when the next token is due (inf if the watchlist is empty)."""
+        with self._lock:
+            while self._queue and self._queue[0][2].removed:
+                heapq.heappop(self._queue)
+            return self._queue[0][0] if self._queue else math.inf
+
+    # --- Scheduling ---
+
+    def _adapt_interval(self, watched: _WatchedToken, price: float, volume_h1: float) -> None:
+        move = 0.0
+        if watched.last_price:
+            move = abs(price / watched.last_price - 1.0)
+        urgency = move / self.volatility_target
+        if volume_h1 > 0:
+            urgency += math.log10(1.0 + volume_h1 / self.volume_reference)
+        target = self.base_interval / (1.0 + urgency)
+        # Smooth towards the target so a single spike does not whipsaw the schedule.
+        interval = 0.5 * watched.interval + 0.5 * target
+        watched.interval = min(self.max_interval, max(self.min_interval, interval))
+
+    def _backoff(self, error: Exception) -> float:
+        self.consecutive_failures += 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+        delay *= self._random.uniform(0.5, 1.5) # Jitter
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        self.backoff_until = self.clock.time() + delay
+        METRICS.increment('scanner.backoffs')
+        logger.warning("Backing off for %.1fs after error: %s", delay, error)
+        return delay
+
+    def _due_batches(self, now: float) -> list:
+        """Pops every due token and groups them into per-chain request batches."""
+        by_chain = {}
+        while self._queue and self._queue[0][0] <= now:
+            _, _, watched = heapq.heappop(self._queue)
+            if not watched.removed:
+                by_chain.setdefault(watched.chain_id, []).append(watched)
+        return [
+            (chain_id, tokens[i:i + MAX_ADDRESSES_PER_REQUEST])
+            for chain_id, tokens in by_chain.items()
+            for i in range(0, len(tokens), MAX_ADDRESSES_PER_REQUEST)
+        ]
+
+    def _poll(self, chain_id: str, batch: list) -> list:
+        """
+        Fetches one batch (without holding the lock) and updates its tokens.
+        Every token of the batch is rescheduled, whatever the outcome.
+        Returns the results to publish.
+        """
+        addresses = [watched.token_address for watched in batch]
+        try:
+            pairs = self.fetcher(chain_id, addresses)
+        except Exception as err: # Includes ValueError for payloads that are not a list of pairs
+            status = getattr(getattr(err, 'response', None), 'status_code', None)
+            with self._lock:
+                if isinstance(err, requests.exceptions.RequestException) and (
+                        status is None or status in RETRYABLE_STATUS_CODES):
+                    retry_at = self.clock.time() + self._backoff(err)
+                else:
+                    METRICS.increment('scanner.errors')
+                    logger.warning("Polling %d tokens on '%s' failed: %s", len(batch), chain_id, err)
+                    retry_at = self.clock.time() + self.min_interval
+                for watched in batch:
+                    watched.next_due = retry_at
+                    self._push(watched)
+            return []
+
+        # A token may be the base or the quote of a pair, and EVM addresses come
+        # back checksummed, so match lowercased addresses on either side. Pairs
+        # with the token as base are preferred, since priceUsd is its price; a
+        # quote-side pair prices it as priceUsd / priceNative.
+        first_pair = {}
+        for side in ('baseToken', 'quoteToken'):
+            for pair in pairs:
+                if isinstance(pair, dict):
+                    address = str((pair.get(side) or {}).get('address')).lower()
+                    first_pair.setdefault(address, (pair, side == 'baseToken'))
+
+        results = []
+        with self._lock:
+            self.consecutive_failures = 0
+            now = self.clock.time()
+            for watched in batch:
+                pair, is_base = first_pair.get(watched.token_address.lower(), (None, True))
+                snapshot = process_raw_data(pair) if pair is not None else None
+                if snapshot is None:
+                    price = math.nan
+                elif is_base:
+                    price = snapshot.price_usd
+                else:
+                    price = snapshot.price_usd / snapshot.price_native if snapshot.price_native else math.nan
+                if math.isnan(price):
+                    METRICS.increment('scanner.missing')
+                else:
+                    volume_h1 = 0.0 if math.isnan(snapshot.volume_h1) else snapshot.volume_h1
+                    self._adapt_interval(watched, price, volume_h1)
+                    watched.last_price = price
+                    signal = watched.stream.update(price)
+                    results.append(ScanResult(chain_id, watched.token_address, now, price, signal,
+                                              watched.interval, snapshot))
+                watched.next_due = now + watched.interval
+                self._push(watched)
+        return results
+
+    def _publish(self, result: ScanResult) -> None:
+        if self.publish is None:
+            return
+        put = getattr(self.publish, 'put', None)
+        if put is not None:
+            put(result)
+        else:
+            self.publish(result)
+
+    # --- Running ---
+
+    def run_once(self) -> int:
+        """
+        Polls every due token that fits in the request budget.
+
+        The lock is only held to pop and reschedule tokens, not during
+        requests, so the watchlist stays usable while a batch is in flight.
+
+        Returns:
+            int: The number of requests sent.
+        """
+        with self._lock:
+            if self.clock.time() < self.backoff_until:
+                return 0
+            pending = self._due_batches(self.clock.time())
+        sent = 0
+        try:
+            while pending:
+                with self._lock:
+                    if self.clock.time() < self.backoff_until or not self.rate_limiter.try_acquire():
+                        break # Out of budget (or backing off): the rest is requeued unchanged
+                chain_id, batch = pending.pop(0)
+                sent += 1
+                METRICS.increment('scanner.requests')
+                for result in self._poll(chain_id, batch):
+                    METRICS.increment('scanner.updates')
+                    self._publish(result)
+        finally:
+            with self._lock:
+                for _, batch in pending:
+                    for watched in batch:
+                        self._push(watched)
+        return sent
+
+    def seconds_until_next_poll(self) -> float:
+        """How long the run loop may sleep before there is work to do."""
+        with self._lock:
+            now = self.clock.time()
+            wait = max(self.next_due() - now, self.backoff_until - now, 0.0)
+            if wait == 0.0:
+                wait = self.rate_limiter.time_until_available()
+            return wait
+
+    def run(self, stop_event: threading.Event | None = None, max_iterations: int | None = None,
+            idle_sleep: float = 1.0) -> None:
+        """
+        Polls until `stop_event` is set (or `max_iterations` loop iterations have run).
+        """
+        iterations = 0
+        while not (stop_event and stop_event.is_set()):
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            iterations += 1
+            try:
+                self.run_once()
+            except Exception:
+                # E.g. a failing publish callback: log it and keep the scanner alive.
+                METRICS.increment('scanner.errors')
+                logger.exception("Scanner cycle failed.")
+            wait = self.seconds_until_next_poll()
+            if math.isinf(wait):
+                wait = idle_sleep
+            self.clock.sleep(wait, stop_event)
+
+def make_fetcher(session: requests.Session | None = None, **kwargs):
+    """
+    Builds a scanner fetcher around `fetch_token_pairs_batch` with fixed options
+    (e.g. `session`, `timeout`, `base_url`, `cache`).
+    """
+    return functools.partial(fetch_token_pairs_batch, session=session, **kwargs)
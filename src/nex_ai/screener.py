@@ -0,0 +1,281 @@
+"""
+Module for screening fetched pairs with filter, range and top-K queries.
+
+`ScreenerIndex` keeps the latest `PairSnapshot` of every pair, partitioned by
+chain and DEX. Inside each partition every indexed field is a sorted list, so
+a range filter is two bisections and a top-K query walks a field from its
+largest (or smallest) value and stops after K matches. Upserting a snapshot
+moves only the fields whose values changed, so the index is updated as
+snapshots arrive instead of being rebuilt:
+
+    index = ScreenerIndex()
+    scanner = Scanner(publish=lambda result: index.upsert(result.pair))
+    ...
+    index.query(chain_id='solana', where={'liquidity_usd': (100_000, None)},
+                sort_by='volume_h1', top=50)
+
+Missing (NaN) values are not indexed: such a pair never matches a filter or
+ranking on that field.
+"""
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+
+from .data_ingestion import PairSnapshot, process_raw_data
+
+INDEXED_FIELDS = ('price_usd', 'liquidity_usd', 'volume_h1', 'volume_h24', 'price_change_h1',
+                  'price_change_h24', 'buys_h24', 'sells_h24', 'fdv', 'market_cap', 'pair_created_at')
+
+class _SortedField:
+    """(value, key) entries in ascending order, stored as two parallel lists."""
+    __slots__ = ('values', 'keys')
+
+    def __init__(self):
+        self.values = []
+        self.keys = []
+
+    def _position(self, value: float, key: tuple) -> int:
+        # Ties on value are kept in key order, so every entry has one exact position.
+        lo = bisect_left(self.values, value)
+        return bisect_left(self.keys, key, lo, bisect_right(self.values, value, lo))
+
+    def insert(self, value: float, key: tuple) -> None:
+        i = self._position(value, key)
+        self.values.insert(i, value)
+        self.keys.insert(i, key)
+
+    def remove(self, value: float, key: tuple) -> None:
+        i = self._position(value, key)
+        del self.values[i]
+        del self.keys[i]
+
+    def bounds(self, low: float, high: float) -> tuple:
+        """Index range of the entries with low <= value <= high."""
+        lo = bisect_left(self.values, low)
+        return lo, max(lo, bisect_right(self.values, high))
+
+    def iterate(self, lo: int, hi: int, descending: bool):
+        """Iterates over the (value, key) entries in [lo, hi) without copying them."""
+        indices = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        return zip(map(self.values.__getitem__, indices), map(self.keys.__getitem__, indices))
+
+class _Partition:
+    """The pairs of one (chain, DEX) and a sorted list per indexed field."""
+    __slots__ = ('members', 'fields')
+
+    def __init__(self, fields):
+        self.members = set()
+        self.fields = {field: _SortedField() for field in fields}
+
+def _keyed(snapshot) -> tuple:
+    """Returns the snapshot (parsed if it is a raw pair) and its (chain_id, pair_address) key."""
+    if isinstance(snapshot, dict):
+        snapshot = process_raw_data(snapshot)
+    if not snapshot.pair_address:
+        raise ValueError(f"Snapshot of {snapshot.base_symbol or snapshot.base_address!r} has no pair address.")
+    return snapshot, (snapshot.chain_id, snapshot.pair_address)
+
+class ScreenerIndex:
+    """
+    In-memory index of the latest snapshot of each pair.
+
+    Pairs are identified by (chain_id, pair_address).
+
+    Args:
+        fields (tuple): Numeric `PairSnapshot` fields to index for filtering and sorting.
+    """
+
+    def __init__(self, fields=INDEXED_FIELDS):
+        unknown = [field for field in fields if field not in PairSnapshot._fields]
+        if unknown:
+            raise ValueError(f"Unknown PairSnapshot fields: {', '.join(unknown)}.")
+        self.fields = tuple(fields)
+        self._positions = {field: PairSnapshot._fields.index(field) for field in self.fields}
+        self._pairs = {}      # (chain_id, pair_address) -> PairSnapshot
+        self._partitions = {} # chain_id -> {dex_id -> _Partition}
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def get(self, chain_id: str, pair_address: str) -> PairSnapshot | None:
+        return self._pairs.get((chain_id, pair_address))
+
+    def upsert(self, snapshot) -> None:
+        """
+        Adds a pair or replaces its previous snapshot.
+
+        Args:
+            snapshot: A `PairSnapshot`, or a raw pair dictionary.
+
+        Raises:
+            ValueError: If the snapshot has no pair address.
+        """
+        snapshot, key = _keyed(snapshot)
+        old = self._pairs.get(key)
+        if old is not None and old.dex_id != snapshot.dex_id:
+            self._discard(key, old)
+            old = None
+        partition = self._partition(snapshot.chain_id, snapshot.dex_id)
+        partition.members.add(key)
+        for field, position in self._positions.items():
+            value = snapshot[position]
+            if old is not None:
+                previous = old[position]
+                if previous == value:
+                    continue
+                if previous == previous: # Not NaN
+                    partition.fields[field].remove(previous, key)
+            if value == value:
+                partition.fields[field].insert(value, key)
+        self._pairs[key] = snapshot
+
+    def update(self, snapshots) -> int:
+        """
+        Upserts many snapshots; returns how many were indexed.
+
+        Pairs not indexed yet are merged into their partitions with one sort
+        per field instead of one insertion each, so building an index from a
+        full fetch costs O(n log n).
+        """
+        count = 0
+        pending = {} # New pairs: key -> latest snapshot
+        for snapshot in snapshots:
+            snapshot, key = _keyed(snapshot)
+            if key in self._pairs:
+                self.upsert(snapshot)
+            else:
+                pending[key] = snapshot
+            count += 1
+
+        groups = {}
+        for key, snapshot in pending.items():
+            groups.setdefault((snapshot.chain_id, snapshot.dex_id), []).append((key, snapshot))
+        for (chain_id, dex_id), group in groups.items():
+            partition = self._partition(chain_id, dex_id)
+            partition.members.update(key for key, _ in group)
+            for field, position in self._positions.items():
+                column = partition.fields[field]
+                entries = [(snapshot[position], key) for key, snapshot in group if snapshot[position] == snapshot[position]]
+                if len(entries) * 8 < len(column.values):
+                    for value, key in entries:
+                        column.insert(value, key)
+                else:
+                    entries.extend(zip(column.values, column.keys))
+                    entries.sort()
+                    column.values = [value for value, _ in entries]
+                    column.keys = [key for _, key in entries]
+        self._pairs.update(pending)
+        return count
+
+    def remove(self, chain_id: str, pair_address: str) -> bool:
+        """
+        Drops a pair from the index. Returns False if it was not indexed.
+        """
+        key = (chain_id, pair_address)
+        old = self._pairs.get(key)
+        if old is None:
+            return False
+        self._discard(key, old)
+        return True
+
+    def _discard(self, key: tuple, old: PairSnapshot) -> None:
+        partitions = self._partitions[old.chain_id]
+        partition = partitions[old.dex_id]
+        for field, position in self._positions.items():
+            value = old[position]
+            if value == value:
+                partition.fields[field].remove(value, key)
+        partition.members.discard(key)
+        if not partition.members:
+            del partitions[old.dex_id]
+            if not partitions:
+                del self._partitions[old.chain_id]
+        del self._pairs[key]
+
+    def _partition(self, chain_id: str, dex_id: str) -> _Partition:
+        partitions = self._partitions.setdefault(chain_id, {})
+        partition = partitions.get(dex_id)
+        if partition is None:
+            partition = partitions[dex_id] = _Partition(self.fields)
+        return partition
+
+    def _select(self, chain_id: str | None, dex_id: str | None) -> list:
+        chains = [self._partitions.get(chain_id, {})] if chain_id is not None else self._partitions.values()
+        if dex_id is not None:
+            return [partitions[dex_id] for partitions in chains if dex_id in partitions]
+        return [partition for partitions in chains for partition in partitions.values()]
+
+    def _check_field(self, field: str) -> None:
+        if field not in self._positions:
+            raise ValueError(f"Field '{field}' is not indexed. Indexed fields: {', '.join(self.fields)}.")
+
+    def query(self, chain_id: str | None = None, dex_id: str | None = None, where: dict | None = None,
+              sort_by: str | None = None, descending: bool = True, top: int | None = None) -> list:
+        """
+        Returns the pairs matching every filter, optionally ranked by one field.
+
+        Args:
+            chain_id (str | None): Restrict to one chain.
+            dex_id (str | None): Restrict to one DEX.
+            where (dict | None): {field: (low, high)} inclusive ranges; None leaves a side open.
+            sort_by (str | None): Field to rank by. Without it, matches come in no particular order.
+            descending (bool): Rank from the largest value down.
+            top (int | None): Return at most this many pairs.
+
+        Returns:
+            list: Matching `PairSnapshot`s.
+
+        Raises:
+            ValueError: If a filtered or sorted field is not indexed.
+        """
+        ranges = {}
+        for field, (low, high) in (where or {}).items():
+            self._check_field(field)
+            ranges[field] = (-math.inf if low is None else low, math.inf if high is None else high)
+        if sort_by is not None:
+            self._check_field(sort_by)
+        if top is not None and top <= 0:
+            return []
+        partitions = self._select(chain_id, dex_id)
+
+        # Entries within each filter's range, found by bisection alone.
+        spans = {field: [(p.fields[field], *p.fields[field].bounds(low, high)) for p in partitions]
+                 for field, (low, high) in ranges.items()}
+        counts = {field: sum(hi - lo for _, lo, hi in field_spans) for field, field_spans in spans.items()}
+        driver = min(counts, key=counts.get) if counts else None
+        pairs = self._pairs
+
+        if sort_by is not None and top is not None:
+            sort_spans = spans.get(sort_by) or [(p.fields[sort_by], 0, len(p.fields[sort_by].values)) for p in partitions]
+            # Walking the ranked field visits about top / selectivity entries;
+            # scanning the narrowest filter visits counts[driver]. Take the cheaper.
+            if driver is None or top * sum(hi - lo for _, lo, hi in sort_spans) <= counts[driver] ** 2:
+                checks = [(self._positions[field], low, high) for field, (low, high) in ranges.items() if field != sort_by]
+                walks = [field.iterate(lo, hi, descending) for field, lo, hi in sort_spans if hi > lo]
+                ranked = walks[0] if len(walks) == 1 else heapq.merge(*walks, reverse=descending)
+                results = []
+                for _, key in ranked:
+                    snapshot = pairs[key]
+                    for position, low, high in checks:
+                        if not low <= snapshot[position] <= high:
+                            break
+                    else:
+                        results.append(snapshot)
+                        if len(results) == top:
+                            break
+                return results
+
+        if driver is None:
+            matches = [pairs[key] for partition in partitions for key in partition.members]
+        else:
+            checks = [(self._positions[field], low, high) for field, (low, high) in ranges.items() if field != driver]
+            matches = [snapshot for field, lo, hi in spans[driver] for snapshot in map(pairs.__getitem__, field.keys[lo:hi])
+                       if all(low <= snapshot[position] <= high for position, low, high in checks)]
+        if sort_by is None:
+            return matches if top is None else matches[:top]
+        position = self._positions[sort_by]
+        matches = [snapshot for snapshot in matches if snapshot[position] == snapshot[position]]
+        if top is None:
+            return sorted(matches, key=lambda snapshot: snapshot[position], reverse=descending)
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(top, matches, key=lambda snapshot: snapshot[position])
@@ -1,19 +1,254 @@
 """
 Module for generating trading signals and insights.
 This includes various technical analysis indicators and custom algorithms.
+
+The list-based functions (`calculate_sma`, `generate_trading_signals`) are thin
+compatibility wrappers around a NumPy rolling-window engine. Use the `*_array`
+variants directly when working with long price histories.
+
+`compute_indicators` evaluates a set of indicators (EMA, RSI, MACD, Bollinger
+bands, ...) in one pass with shared intermediates; `IndicatorStream` is its
+incremental counterpart.
 """
+import math
+from collections import deque
+
+import numpy as np
+
+from .utils import METRICS, get_logger, instrument
+
+# Integer signal codes used by the array API.
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+SIGNAL_LABELS = {SIGNAL_NONE: None, SIGNAL_BUY: 'BUY', SIGNAL_SELL: 'SELL'}
+
+logger = get_logger(__name__)
+
+_EPSILON = float(np.finfo(np.float64).eps)
+
+# Prices are summed in blocks of this many values (or of the window, if longer),
+# each centred on its first price, so rounding error does not grow with the
+# length of the series.
+_BLOCK_SIZE = 1024
+
+def _block_sums(values: np.ndarray, block: int) -> tuple:
+  """
+  Running sums of `values` within blocks of `block` values, each block
+  centred on its first value.
+
+  Returns:
+      tuple: The running sums up to and including (`through`) and before
+             (`before`) each position within its block, each position's
+             block anchor, and the anchor and total of every block.
+  """
+  n = len(values)
+  blocks = -(-n // block)
+  starts = values[::block]
+  anchors = np.repeat(starts, block)[:n]
+  padded = np.zeros(blocks * block, dtype=np.float64)
+  np.subtract(values, anchors, out=padded[:n])
+  sums = np.cumsum(padded.reshape(blocks, block), axis=1)
+  through = sums.ravel()[:n]
+  before = np.empty(n, dtype=np.float64)
+  before[1:] = through[:-1]
+  before[::block] = 0.0
+  return through, before, anchors, starts, sums[:, -1]
+
+def rolling_means(prices, windows) -> dict:
+  """
+  Calculates Simple Moving Averages for several windows in a single pass.
+
+  Running sums are shared by every window, so each SMA costs O(n)
+  regardless of the window size. The sums restart every `_BLOCK_SIZE` prices,
+  centred on the first price of their block, which keeps rounding error small
+  and independent of the series length; integer-valued prices give exactly
+  the same results as summing each window directly.
+
+  Args:
+      prices (array-like): A one-dimensional sequence of numerical prices.
+      windows (iterable of int): The window sizes to compute.
+
+  Returns:
+      dict: Maps each window to a float64 array of the same length as `prices`.
+            The first (window - 1) values are NaN.
+  """
+  values = np.asarray(prices, dtype=np.float64)
+  if values.ndim != 1:
+      raise ValueError("prices must be one-dimensional.")
+
+  n = len(values)
+  blocks = {} # block size -> _block_sums
+  means = {}
+  for window in windows:
+      window = int(window)
+      if window < 1:
+          raise ValueError(f"window must be a positive integer, got {window}.")
+      sma = np.full(n, np.nan)
+      if window <= n:
+          block = max(_BLOCK_SIZE, window)
+          if block not in blocks:
+              blocks[block] = _block_sums(values, block)
+          through, before, anchors, starts, totals = blocks[block]
+          window_sums = through[window - 1:] - before[:n - window + 1]
+          window_sums += anchors[window - 1:] * window
+          # Windows ending in the first (window - 1) positions of a block start in the previous one.
+          ends = (np.arange(block, n, block)[:, None] + np.arange(window - 1)).ravel()
+          ends = ends[ends < n]
+          if len(ends):
+              block_index = ends // block
+              carried = window - 1 - ends % block
+              window_sums[ends - (window - 1)] = (through[ends] - before[ends - (window - 1)] + totals[block_index - 1]
+                                                  + anchors[ends] * window
+                                                  + (starts[block_index - 1] - starts[block_index]) * carried)
+          sma[window - 1:] = window_sums / window
+      means[window] = sma
+  return means
+
+def _ordered_window_means(values: np.ndarray, window: int, ends) -> np.ndarray:
+  """
+  Means of the windows ending at indices `ends`, summed left to right like
+  `sum(prices[i - window + 1:i + 1]) / window`, so they are bit-identical to it.
+  """
+  starts = np.asarray(ends, dtype=np.intp) - (window - 1)
+  totals = values[starts].copy()
+  for offset in range(1, window):
+      totals += values[starts + offset]
+  return totals / window
+
+def _block_spreads(values: np.ndarray, block: int) -> tuple:
+  """
+  Sum of |price - block anchor| and largest |price| of each block of `rolling_means`.
+  """
+  n = len(values)
+  blocks = -(-n // block)
+  padded = np.empty(blocks * block, dtype=np.float64)
+  padded[:n] = values
+  padded[n:] = values[-1]
+  padded = padded.reshape(blocks, block)
+  return np.abs(padded - padded[:, :1]).sum(axis=1), np.abs(padded).max(axis=1)
+
+def _mean_error_bounds(values: np.ndarray, window: int, sma: np.ndarray, ends: np.ndarray) -> np.ndarray:
+  """
+  Upper bounds on the difference between the `rolling_means` values of
+  `window` at indices `ends` and the left-to-right means of the same prices:
+  the running-sum error, at most the block length times the block's sum of
+  |price - anchor|, plus the rounding of the window's own terms.
+  """
+  block = max(_BLOCK_SIZE, window)
+  spreads, largest = _block_spreads(values, block)
+  end_blocks, start_blocks = ends // block, (ends - (window - 1)) // block
+  rounding = (block * (spreads[end_blocks] + spreads[start_blocks])
+              + (window + 4) * window * np.maximum(largest[end_blocks], largest[start_blocks])) / window
+  return 2.0 * _EPSILON * (rounding + np.abs(sma[ends]))
+
+def _settle_close_means(values: np.ndarray, short_window: int, long_window: int, short_sma: np.ndarray,
+                        long_sma: np.ndarray) -> None:
+  """
+  Replaces, in place, the `rolling_means` values at every index where their
+  rounding error could change how the short and long SMAs compare (e.g. both
+  are flat) with the left-to-right means, so crossovers are exactly those of
+  the original per-window sums.
+  """
+  with np.errstate(invalid='ignore'):
+      gaps = np.abs(short_sma - long_sma)
+  # A loose bound for every index, from the price range alone, picks the
+  # candidates; the per-block bounds then decide.
+  low, high = values.min(), values.max()
+  largest = max(abs(low), abs(high))
+  loose = 0.0
+  for window in (short_window, long_window):
+      block = max(_BLOCK_SIZE, window)
+      loose += 2.0 * _EPSILON * ((2 * block * block * (high - low) + (window + 4) * window * largest) / window + largest)
+  with np.errstate(invalid='ignore'):
+      candidates = np.flatnonzero(gaps <= loose)
+  if not len(candidates):
+      return
+  margins = (_mean_error_bounds(values, short_window, short_sma, candidates)
+             + _mean_error_bounds(values, long_window, long_sma, candidates))
+  close = candidates[gaps[candidates] <= margins]
+  if len(close):
+      short_sma[close] = _ordered_window_means(values, short_window, close)
+      long_sma[close] = _ordered_window_means(values, long_window, close)
+
+def calculate_sma_array(prices, window: int) -> np.ndarray:
+  """
+  Calculates the Simple Moving Average (SMA) as a NumPy array.
+  The first (window - 1) values are NaN.
+  """
+  return rolling_means(prices, (window,))[int(window)]
+
+def detect_crossovers(short_sma, long_sma) -> np.ndarray:
+  """
+  Finds the points where the short SMA crosses the long SMA.
+
+  Works on arrays of any shape; crossovers are detected along the last axis,
+  so stacks of SMA curves broadcast against each other.
+
+  Args:
+      short_sma (array-like): Short-term SMA values (NaN where undefined).
+      long_sma (array-like): Long-term SMA values (NaN where undefined).
+
+  Returns:
+      np.ndarray: int8 array of SIGNAL_BUY, SIGNAL_SELL or SIGNAL_NONE codes.
+  """
+  short_sma = np.asarray(short_sma, dtype=np.float64)
+  long_sma = np.asarray(long_sma, dtype=np.float64)
+  shape = np.broadcast_shapes(short_sma.shape, long_sma.shape)
+  codes = np.zeros(shape, dtype=np.int8)
+  if shape[-1] < 2:
+      return codes
+
+  # Comparisons against NaN are False, so the warm-up region never signals.
+  current_short, current_long = short_sma[..., 1:], long_sma[..., 1:]
+  previous_short, previous_long = short_sma[..., :-1], long_sma[..., :-1]
+  buy = (current_short > current_long) & (previous_short <= previous_long)
+  sell = (current_short < current_long) & (previous_short >= previous_long)
+  codes[..., 1:][buy] = SIGNAL_BUY
+  codes[..., 1:][sell] = SIGNAL_SELL
+  return codes
+
+@instrument('signals.generate')
+def generate_trading_signals_array(prices, short_window: int = 10, long_window: int = 30) -> np.ndarray:
+  """
+  Generates SMA crossover signals for a price array.
+
+  Args:
+      prices (array-like): A one-dimensional sequence of numerical prices.
+      short_window (int): The window size for the short-term SMA.
+      long_window (int): The window size for the long-term SMA.
+
+  Returns:
+      np.ndarray: int8 array of SIGNAL_BUY, SIGNAL_SELL or SIGNAL_NONE codes,
+                  one per price point.
+  """
+  values = np.asarray(prices, dtype=np.float64)
+  METRICS.increment('signals.rows', len(values))
+  if len(values) < long_window:
+      return np.zeros(len(values), dtype=np.int8)
+
+  short_window, long_window = int(short_window), int(long_window)
+  means = rolling_means(values, (short_window, long_window))
+  short_sma, long_sma = means[short_window], means[long_window]
+  if short_window != long_window: # Equal windows never cross
+      _settle_close_means(values, short_window, long_window, short_sma, long_sma)
+  return detect_crossovers(short_sma, long_sma)
 
 def calculate_sma(prices: list, window: int) -> list:
   """
   Calculates the Simple Moving Average (SMA) for a given list of prices.
+
+  Each window is summed left to right, so the values are exactly those of
+  re-summing every window; `calculate_sma_array` is faster on long series.
   """
-  sma_values = []
-  for i in range(len(prices)):
-      if i < window - 1: # Corrected from &lt;
-          sma_values.append(None)
-      else:
-          current_window_sum = sum(prices[i - window + 1 : i + 1])
-          sma_values.append(current_window_sum / window)
+  values = np.asarray(prices, dtype=np.float64)
+  window = int(window)
+  if window < 1:
+      raise ValueError(f"window must be a positive integer, got {window}.")
+  sma_values = [None] * min(window - 1, len(values))
+  if window <= len(values):
+      sma_values += _ordered_window_means(values, window, np.arange(window - 1, len(values))).tolist()
   return sma_values
 
 def generate_trading_signals(prices: list, short_window: int = 10, long_window: int = 30) -> list:
@@ -21,24 +256,660 @@ def generate_trading_signals(prices: list, short_window: int = 10, long_window:
   Generates basic buy/sell signals based on Simple Moving Average (SMA) crossovers.
   """
   if len(prices) < long_window: # Corrected from &lt;
-      print("Not enough data to calculate long-term moving average.")
+      logger.debug("Not enough data to calculate long-term moving average.")
       return [None] * len(prices)
 
-  short_sma = calculate_sma(prices, short_window)
-  long_sma = calculate_sma(prices, long_window)
+  codes = generate_trading_signals_array(prices, short_window, long_window)
+  return [SIGNAL_LABELS[code] for code in codes.tolist()]
+
+class SignalStream:
+  """
+  Incremental SMA crossover signal generator for live price feeds.
+
+  Each tick costs O(1) amortised: the stream keeps a ring buffer of running
+  (centred) cumulative sums, re-centred every `_BLOCK_SIZE` ticks like the
+  blocks of `rolling_means`. When the two SMAs are too close for the rounding
+  error to tell them apart, they are re-summed from a ring buffer of recent
+  prices, as `generate_trading_signals` does, so replaying a series through
+  the stream yields exactly its signals.
+
+  Args:
+      short_window (int): The window size for the short-term SMA.
+      long_window (int): The window size for the long-term SMA.
+  """
+
+  def __init__(self, short_window: int = 10, long_window: int = 30):
+      short_window, long_window = int(short_window), int(long_window)
+      if short_window < 1 or long_window < 1:
+          raise ValueError("short_window and long_window must be positive integers.")
+      self.short_window = short_window
+      self.long_window = long_window
+      self.anchor = None
+      self.ticks = 0
+      self.short_sma = None
+      self.long_sma = None
+      self._total = 0.0
+      self._spread = 0.0 # Running sum of |price - anchor|, for the rounding error bound
+      self._summed = 0   # Prices added to the running sums since the anchor was set
+      max_window = max(short_window, long_window)
+      self._cumulative = deque([0.0], maxlen=max_window + 1)
+      self._prices = deque(maxlen=max_window)
+      # Coefficients of the rounding error bound of |short_sma - long_sma| (see `_mean_error_bounds`).
+      self._summed_weight = 2.0 / short_window + 2.0 / long_window
+      self._spread_weight = (short_window + 2.0) / short_window + (long_window + 2.0) / long_window
+      self._anchor_weight = short_window + long_window + 6.0
+
+  def _window_mean(self, window: int) -> float | None:
+      if self.ticks < window:
+          return None
+      window_sum = self._cumulative[-1] - self._cumulative[-1 - window] + self.anchor * window
+      return window_sum / window
+
+  def _reanchor(self) -> None:
+      """Restarts the running sums over the buffered prices, centred on the oldest one."""
+      self.anchor = self._prices[0]
+      self._total = self._spread = 0.0
+      self._cumulative.clear()
+      self._cumulative.append(0.0)
+      for price in self._prices:
+          self._total += price - self.anchor
+          self._spread += abs(price - self.anchor)
+          self._cumulative.append(self._total)
+      self._summed = len(self._prices)
+
+  def _ordered_mean(self, window: int, mean: float) -> float:
+      if len(self._prices) < window: # Restored from a snapshot without prices
+          return mean
+      total = 0.0
+      for index in range(len(self._prices) - window, len(self._prices)):
+          total += self._prices[index]
+      return total / window
+
+  def update(self, price: float) -> str | None:
+      """
+      Feeds one price into the stream.
+
+      Returns:
+          str | None: 'BUY' or 'SELL' if a crossover happens on this tick, otherwise None.
+      """
+      price = float(price)
+      if self.anchor is None:
+          self.anchor = price
+      self._total += price - self.anchor
+      self._spread += abs(price - self.anchor)
+      self._cumulative.append(self._total)
+      self._prices.append(price)
+      self.ticks += 1
+      self._summed += 1
+      if self._summed >= _BLOCK_SIZE + len(self._prices) and len(self._prices) == self._prices.maxlen:
+          self._reanchor()
+
+      previous_short, previous_long = self.short_sma, self.long_sma
+      short_sma = self.short_sma = self._window_mean(self.short_window)
+      long_sma = self.long_sma = self._window_mean(self.long_window)
+
+      if None in (previous_short, previous_long, short_sma, long_sma):
+          return None
+      margin = 2.0 * _EPSILON * (self._spread * (self._summed * self._summed_weight + self._spread_weight)
+                                 + self._anchor_weight * abs(self.anchor) + abs(short_sma) + abs(long_sma))
+      if abs(short_sma - long_sma) <= margin:
+          short_sma = self.short_sma = self._ordered_mean(self.short_window, short_sma)
+          long_sma = self.long_sma = self._ordered_mean(self.long_window, long_sma)
+      if short_sma > long_sma and previous_short <= previous_long:
+          return 'BUY'
+      if short_sma < long_sma and previous_short >= previous_long:
+          return 'SELL'
+      return None
+
+  def update_many(self, prices) -> list:
+      """
+      Feeds a batch of prices and returns one signal (or None) per price.
+      """
+      return [self.update(price) for price in prices]
+
+  def get_state(self) -> dict:
+      """
+      Returns a JSON-serialisable snapshot of the stream state.
+      """
+      return {
+          'short_window': self.short_window,
+          'long_window': self.long_window,
+          'anchor': self.anchor,
+          'ticks': self.ticks,
+          'short_sma': self.short_sma,
+          'long_sma': self.long_sma,
+          'total': self._total,
+          'cumulative': list(self._cumulative),
+          'spread': self._spread,
+          'summed': self._summed,
+          'prices': list(self._prices),
+      }
+
+  @classmethod
+  def from_state(cls, state: dict) -> 'SignalStream':
+      """
+      Restores a stream from a snapshot produced by `get_state`.
+      """
+      stream = cls(state['short_window'], state['long_window'])
+      stream.anchor = state['anchor']
+      stream.ticks = state['ticks']
+      stream.short_sma = state['short_sma']
+      stream.long_sma = state['long_sma']
+      stream._total = state['total']
+      stream._cumulative.clear()
+      stream._cumulative.extend(state['cumulative'])
+      # Snapshots from before the exact comparison have no error bound: every
+      # comparison is re-summed (once the prices are buffered again) until the
+      # sums are re-centred.
+      stream._spread = state.get('spread', math.inf)
+      stream._summed = state.get('summed', stream.ticks)
+      stream._prices.extend(state.get('prices', ()))
+      return stream
+
+# --- Indicators ---
+
+# Parameters used when a spec leaves them out, e.g. 'rsi' is 'rsi_14'.
+INDICATOR_DEFAULTS = {
+  'returns': (),
+  'log_returns': (),
+  'sma': (20,),
+  'ema': (20,),
+  'std': (20,),
+  'zscore': (20,),
+  'bollinger': (20, 2.0),
+  'volatility': (20,),
+  'roc': (10,),
+  'momentum': (10,),
+  'rsi': (14,),
+  'macd': (12, 26, 9),
+}
+
+# Indicators producing several columns, named '<spec><suffix>'.
+_COLUMN_SUFFIXES = {
+  'macd': ('', '_signal', '_hist'),
+  'bollinger': ('_upper', '_middle', '_lower'),
+}
+
+# Indicators built on the rolling mean (and variance) of prices over their first parameter.
+_PRICE_WINDOW_INDICATORS = ('sma', 'std', 'zscore', 'bollinger')
+_PRICE_VARIANCE_INDICATORS = ('std', 'zscore', 'bollinger')
+
+def parse_indicator(spec: str) -> tuple:
+  """
+  Splits an indicator spec such as 'sma_20', 'bollinger_20_2' or 'macd_12_26_9'
+  into its name and parameters.
+
+  Returns:
+      tuple: (name, params), with parameters left out of the spec taken from
+             INDICATOR_DEFAULTS.
+  """
+  for name in sorted(INDICATOR_DEFAULTS, key=len, reverse=True):
+      if spec == name or spec.startswith(name + '_'):
+          break
+  else:
+      raise ValueError(f"Unknown indicator '{spec}'.")
+
+  defaults = INDICATOR_DEFAULTS[name]
+  given = spec[len(name) + 1:].split('_') if spec != name else []
+  if len(given) > len(defaults):
+      raise ValueError(f"Too many parameters in indicator '{spec}'.")
+  try:
+      params = tuple(type(default)(value) for default, value in zip(defaults, given)) + defaults[len(given):]
+  except ValueError:
+      raise ValueError(f"Invalid parameters in indicator '{spec}'.") from None
+  if any(isinstance(param, int) and param < 1 for param in params):
+      raise ValueError(f"Indicator windows must be positive integers, got '{spec}'.")
+  return name, params
+
+def indicator_columns(spec: str) -> list:
+  """
+  Returns the output column names of an indicator spec.
+  """
+  name, _ = parse_indicator(spec)
+  return [spec + suffix for suffix in _COLUMN_SUFFIXES.get(name, ('',))]
+
+_UNRESOLVED = object()
+_lfilter = _UNRESOLVED # scipy.signal.lfilter, None without SciPy; imported on first use
+
+def _scipy_lfilter():
+  """Imports SciPy's IIR filter once (it is slow to import and optional)."""
+  global _lfilter
+  if _lfilter is _UNRESOLVED:
+      try:
+          from scipy.signal import lfilter as _lfilter
+      except ImportError:
+          _lfilter = None
+  return _lfilter
+
+def _ema(values: np.ndarray, alpha: float) -> np.ndarray:
+  """
+  Exponential moving average seeded with the first value:
+  y[t] = alpha * x[t] + (1 - alpha) * y[t - 1].
+
+  Runs as a first-order IIR filter with SciPy when it is installed, and as a
+  plain loop otherwise.
+  """
+  if len(values) == 0:
+      return np.empty(0, dtype=np.float64)
+  lfilter = _scipy_lfilter()
+  if lfilter is not None:
+      ema, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+      return ema
+
+  decay = 1.0 - alpha
+  level = float(values[0])
+  ema = []
+  for value in values.tolist():
+      level = alpha * value + decay * level
+      ema.append(level)
+  return np.array(ema, dtype=np.float64)
+
+def _rolling_variances(values: np.ndarray, means: dict, windows) -> dict:
+  """
+  Rolling population variances from the rolling means of `values` and a
+  single shared pass over the (centred) squares.
+  """
+  anchor = values[0] if len(values) else 0.0
+  centred = values - anchor
+  mean_squares = rolling_means(centred * centred, windows)
+  return {window: np.maximum(mean_squares[window] - (means[window] - anchor) ** 2, 0.0) for window in windows}
+
+def _wilder_average(values: np.ndarray, period: int) -> np.ndarray:
+  """
+  Wilder's smoothing: the mean of the first `period` values, then
+  avg[t] = avg[t - 1] + (values[t] - avg[t - 1]) / period.
+  Returns the averages from index period - 1 on.
+  """
+  if len(values) < period:
+      return np.empty(0, dtype=np.float64)
+  seeded = values[period - 1:].copy()
+  seeded[0] = values[:period].mean()
+  return _ema(seeded, 1.0 / period)
+
+def _rsi(gains: np.ndarray, losses: np.ndarray) -> np.ndarray:
+  with np.errstate(divide='ignore', invalid='ignore'):
+      rsi = 100.0 - 100.0 / (1.0 + gains / losses)
+  rsi[losses == 0.0] = 100.0
+  rsi[(losses == 0.0) & (gains == 0.0)] = 50.0 # Flat prices
+  return rsi
+
+def _shifted(values: np.ndarray, periods: int) -> tuple:
+  """Returns (values[t], values[t - periods]) for every t >= periods."""
+  return values[periods:], values[:max(len(values) - periods, 0)]
+
+@instrument('signals.indicators')
+def compute_indicators(prices, specs) -> dict:
+  """
+  Computes a set of technical indicators over a price array in one pass.
+
+  Intermediates shared between indicators are computed once per call,
+  however many indicators use them: price differences, log returns, EMAs, and
+  the rolling sums and sums of squares behind SMA, standard deviation, z-score
+  and Bollinger bands (all of which reuse `rolling_means`).
+
+  Specs are '<name>' or '<name>_<param>[_<param>...]' (see INDICATOR_DEFAULTS):
+      returns, log_returns   One-period simple / log returns.
+      sma_N, ema_N           Simple / exponential moving averages (the EMA is seeded with the first price).
+      std_N                  Rolling population standard deviation.
+      zscore_N               (price - sma_N) / std_N.
+      bollinger_N_K          sma_N -/+ K * std_N ('_lower', '_middle', '_upper').
+      volatility_N           Rolling standard deviation of log returns.
+      roc_N, momentum_N      Relative / absolute price change over N periods.
+      rsi_N                  Relative Strength Index with Wilder's smoothing (seeded with
+                             the mean gain / loss of the first N changes).
+      macd_F_S_G             ema_F - ema_S, its G-period EMA ('_signal') and their difference ('_hist').
+
+  Args:
+      prices (array-like): A one-dimensional sequence of numerical prices.
+      specs (iterable of str): The indicators to compute, e.g. ['rsi_14', 'macd'].
+
+  Returns:
+      dict: Maps each column name (the spec, plus a suffix for multi-column
+            indicators) to a float64 array of the same length as `prices`.
+            Values are NaN until an indicator has enough data.
+  """
+  values = np.asarray(prices, dtype=np.float64)
+  if values.ndim != 1:
+      raise ValueError("prices must be one-dimensional.")
+  parsed = {spec: parse_indicator(spec) for spec in specs}
+  n = len(values)
+  METRICS.increment('signals.indicator_rows', n)
+
+  # Rolling windows over prices share one cumulative-sum pass (and one more
+  # over the squares when a variance is needed).
+  windows = {params[0] for name, params in parsed.values() if name in _PRICE_WINDOW_INDICATORS}
+  variance_windows = {params[0] for name, params in parsed.values() if name in _PRICE_VARIANCE_INDICATORS}
+  means = rolling_means(values, windows)
+  variances = _rolling_variances(values, means, variance_windows)
+
+  cache = {}
+  def shared(key, compute):
+      if key not in cache:
+          cache[key] = compute()
+      return cache[key]
+
+  def changes():
+      return shared('changes', lambda: np.diff(values))
+
+  def log_returns():
+      # NaN where either price is not positive, like `IndicatorStream`.
+      return shared('log_returns', lambda: np.diff(np.log(np.where(values > 0, values, np.nan))))
+
+  def ratio(current, previous):
+      with np.errstate(divide='ignore', invalid='ignore'):
+          return np.where(previous != 0, current / previous, np.nan)
+
+  def ema(span):
+      return shared(('ema', span), lambda: _ema(values, 2.0 / (span + 1)))
+
+  def padded(tail):
+      column = np.full(n, np.nan)
+      if len(tail):
+          column[n - len(tail):] = tail
+      return column
+
+  columns = {}
+  for spec, (name, params) in parsed.items():
+      if name == 'returns':
+          columns[spec] = padded(ratio(changes(), values[:-1]))
+      elif name == 'log_returns':
+          columns[spec] = padded(log_returns())
+      elif name == 'sma':
+          columns[spec] = means[params[0]]
+      elif name == 'ema':
+          columns[spec] = ema(params[0])
+      elif name == 'std':
+          columns[spec] = np.sqrt(variances[params[0]])
+      elif name == 'zscore':
+          std = np.sqrt(variances[params[0]])
+          with np.errstate(divide='ignore', invalid='ignore'):
+              columns[spec] = np.where(std > 0, (values - means[params[0]]) / std, np.nan)
+      elif name == 'bollinger':
+          window, width = params
+          middle, std = means[window], np.sqrt(variances[window])
+          columns[spec + '_upper'] = middle + width * std
+          columns[spec + '_middle'] = middle
+          columns[spec + '_lower'] = middle - width * std
+      elif name == 'volatility':
+          window = params[0]
+          returns = log_returns()
+          # Windows with a missing return are NaN; the rest are unaffected by them.
+          missing = np.isnan(returns)
+          returns = np.where(missing, 0.0, returns)
+          return_means = shared(('log_return_means', window), lambda: rolling_means(returns, (window,)))
+          volatility = np.sqrt(_rolling_variances(returns, return_means, (window,))[window])
+          volatility[rolling_means(missing.astype(np.float64), (window,))[window] > 0] = np.nan
+          columns[spec] = padded(volatility)
+      elif name in ('roc', 'momentum'):
+          current, previous = _shifted(values, params[0])
+          columns[spec] = padded(ratio(current, previous) - 1.0 if name == 'roc' else current - previous)
+      elif name == 'rsi':
+          period = params[0]
+          steps = changes()
+          gains = _wilder_average(np.maximum(steps, 0.0), period)
+          losses = _wilder_average(np.maximum(-steps, 0.0), period)
+          # Needs `period` changes before it is defined.
+          columns[spec] = padded(_rsi(gains, losses))
+      elif name == 'macd':
+          fast, slow, signal = params
+          macd = ema(fast) - ema(slow)
+          signal_line = _ema(macd, 2.0 / (signal + 1))
+          columns[spec] = macd
+          columns[spec + '_signal'] = signal_line
+          columns[spec + '_hist'] = macd - signal_line
+  return columns
+
+def calculate_rsi(prices: list, period: int = 14) -> list:
+  """
+  Calculates the Relative Strength Index (RSI) for a given list of prices.
+  The first `period` values are None.
+  """
+  rsi_values = compute_indicators(prices, [f'rsi_{period}'])[f'rsi_{period}'].tolist()
+  return [None if value != value else value for value in rsi_values] # NaN -> None
+
+class _RollingMoments:
+  """
+  Streaming counterpart of `rolling_means` / `_rolling_variances` for one series:
+  ring buffers of running (centred) sums and sums of squares. NaN values are
+  counted as missing: windows containing one are NaN.
+  """
+
+  def __init__(self, max_window: int):
+      self.anchor = None
+      self.count = 0
+      self.total = 0.0
+      self.total_squares = 0.0
+      self.missing = 0
+      self.cumulative = deque([0.0], maxlen=max_window + 1)
+      self.cumulative_squares = deque([0.0], maxlen=max_window + 1)
+      self.cumulative_missing = deque([0], maxlen=max_window + 1)
+
+  def push(self, value: float) -> None:
+      if value != value:
+          self.missing += 1
+          centred = 0.0
+      else:
+          if self.anchor is None:
+              self.anchor = value
+          centred = value - self.anchor
+      self.total += centred
+      self.total_squares += centred * centred
+      self.cumulative.append(self.total)
+      self.cumulative_squares.append(self.total_squares)
+      self.cumulative_missing.append(self.missing)
+      self.count += 1
+
+  def mean(self, window: int) -> float:
+      if self.count < window or self.cumulative_missing[-1] != self.cumulative_missing[-1 - window]:
+          return math.nan
+      return (self.cumulative[-1] - self.cumulative[-1 - window] + self.anchor * window) / window
+
+  def variance(self, window: int, mean: float) -> float:
+      if mean != mean: # Too short, or a value is missing
+          return math.nan
+      mean_squares = (self.cumulative_squares[-1] - self.cumulative_squares[-1 - window]) / window
+      return max(mean_squares - (mean - self.anchor) ** 2, 0.0)
+
+  def get_state(self) -> dict:
+      return {
+          'anchor': self.anchor,
+          'count': self.count,
+          'total': self.total,
+          'total_squares': self.total_squares,
+          'cumulative': list(self.cumulative),
+          'cumulative_squares': list(self.cumulative_squares),
+          'missing': self.missing,
+          'cumulative_missing': list(self.cumulative_missing),
+      }
+
+  def set_state(self, state: dict) -> None:
+      self.anchor = state['anchor']
+      self.count = state['count']
+      self.total = state['total']
+      self.total_squares = state['total_squares']
+      self.cumulative.clear()
+      self.cumulative.extend(state['cumulative'])
+      self.cumulative_squares.clear()
+      self.cumulative_squares.extend(state['cumulative_squares'])
+      self.missing = state.get('missing', 0)
+      self.cumulative_missing.clear()
+      self.cumulative_missing.extend(state.get('cumulative_missing', [0] * len(self.cumulative)))
+
+class IndicatorStream:
+  """
+  Incremental counterpart of `compute_indicators` for live price feeds.
+
+  Each tick costs O(number of indicators): rolling windows keep ring buffers
+  of running sums, and EMAs, RSI and MACD keep their smoothed levels. Shared
+  intermediates (EMAs of the same span, rolling sums over the same series)
+  are updated once per tick. Replaying a series through the stream gives the
+  same columns as `compute_indicators`, up to floating-point rounding.
+
+  Args:
+      specs (iterable of str): The indicators to compute (see `compute_indicators`).
+  """
+
+  def __init__(self, specs):
+      self.specs = list(specs)
+      self._parsed = {spec: parse_indicator(spec) for spec in self.specs}
+      self.columns = [column for spec in self.specs for column in indicator_columns(spec)]
+      parsed = self._parsed.values()
+
+      self.ticks = 0
+      self.previous = None
+      self._windows = sorted({params[0] for name, params in parsed if name in _PRICE_WINDOW_INDICATORS})
+      self._variance_windows = sorted({params[0] for name, params in parsed if name in _PRICE_VARIANCE_INDICATORS})
+      self._return_windows = sorted({params[0] for name, params in parsed if name == 'volatility'})
+      self._needs_log_returns = bool(self._return_windows) or any(name == 'log_returns' for name, _ in parsed)
+      lags = [params[0] for name, params in parsed if name in ('roc', 'momentum')]
+      self._prices = deque(maxlen=max(lags, default=0) + 1)
+      self._price_moments = _RollingMoments(max(self._windows, default=0))
+      self._return_moments = _RollingMoments(max(self._return_windows, default=0))
+
+      spans = set()
+      for name, params in parsed:
+          if name == 'ema':
+              spans.add(params[0])
+          elif name == 'macd':
+              spans.update(params[:2])
+      self._emas = dict.fromkeys(sorted(spans))                      # span -> level
+      self._rsi = {params[0]: None for name, params in parsed if name == 'rsi'} # period -> [gain, loss]
+      self._macd_signals = {spec: None for spec, (name, _) in self._parsed.items() if name == 'macd'}
+
+  def update(self, price: float) -> dict:
+      """
+      Feeds one price into the stream.
+
+      Returns:
+          dict: The latest value of every column (NaN during warm-up).
+      """
+      price = float(price)
+      previous = self.previous
+      self.ticks += 1
+      self.previous = price
+      self._prices.append(price)
+      self._price_moments.push(price)
+      log_return = math.nan
+      if previous is not None and self._needs_log_returns:
+          if price > 0 and previous > 0: # Dexscreener reports "0" for some prices
+              log_return = math.log(price / previous)
+          self._return_moments.push(log_return)
+
+      for span, level in self._emas.items():
+          alpha = 2.0 / (span + 1)
+          self._emas[span] = alpha * price + (1.0 - alpha) * (price if level is None else level)
+      if previous is not None:
+          change = price - previous
+          gain, loss = max(change, 0.0), max(-change, 0.0)
+          changes = self.ticks - 1
+          for period, levels in self._rsi.items():
+              if levels is None:
+                  levels = self._rsi[period] = [0.0, 0.0]
+              if changes < period: # Sum the first `period` changes for Wilder's seed
+                  levels[0] += gain
+                  levels[1] += loss
+              elif changes == period:
+                  levels[0] = (levels[0] + gain) / period
+                  levels[1] = (levels[1] + loss) / period
+              else:
+                  levels[0] += (gain - levels[0]) / period
+                  levels[1] += (loss - levels[1]) / period
+
+      means = {window: self._price_moments.mean(window) for window in self._windows}
+      stds = {window: math.sqrt(self._price_moments.variance(window, means[window]))
+              for window in self._variance_windows}
+
+      row = {}
+      for spec, (name, params) in self._parsed.items():
+          if name == 'returns':
+              row[spec] = math.nan if not previous else (price - previous) / previous
+          elif name == 'log_returns':
+              row[spec] = log_return
+          elif name == 'sma':
+              row[spec] = means[params[0]]
+          elif name == 'ema':
+              row[spec] = self._emas[params[0]]
+          elif name == 'std':
+              row[spec] = stds[params[0]]
+          elif name == 'zscore':
+              std = stds[params[0]]
+              row[spec] = (price - means[params[0]]) / std if std > 0 else math.nan
+          elif name == 'bollinger':
+              window, width = params
+              middle, std = means[window], stds[window]
+              row[spec + '_upper'] = middle + width * std
+              row[spec + '_middle'] = middle
+              row[spec + '_lower'] = middle - width * std
+          elif name == 'volatility':
+              window = params[0]
+              mean = self._return_moments.mean(window)
+              row[spec] = math.sqrt(self._return_moments.variance(window, mean))
+          elif name in ('roc', 'momentum'):
+              lag = params[0]
+              if self.ticks <= lag:
+                  row[spec] = math.nan
+              else:
+                  past = self._prices[-1 - lag]
+                  if name == 'momentum':
+                      row[spec] = price - past
+                  else:
+                      row[spec] = price / past - 1.0 if past else math.nan
+          elif name == 'rsi':
+              period = params[0]
+              levels = self._rsi[period]
+              if self.ticks <= period:
+                  row[spec] = math.nan
+              elif levels[1] == 0.0:
+                  row[spec] = 50.0 if levels[0] == 0.0 else 100.0
+              else:
+                  row[spec] = 100.0 - 100.0 / (1.0 + levels[0] / levels[1])
+          elif name == 'macd':
+              fast, slow, signal = params
+              macd = self._emas[fast] - self._emas[slow]
+              alpha = 2.0 / (signal + 1)
+              level = self._macd_signals[spec]
+              level = alpha * macd + (1.0 - alpha) * (macd if level is None else level)
+              self._macd_signals[spec] = level
+              row[spec] = macd
+              row[spec + '_signal'] = level
+              row[spec + '_hist'] = macd - level
+      return row
 
-  signals = [None] * len(prices)
+  def update_many(self, prices) -> dict:
+      """
+      Feeds a batch of prices and returns their columns, like `compute_indicators`.
+      """
+      rows = [self.update(price) for price in prices]
+      return {column: np.array([row[column] for row in rows], dtype=np.float64) for column in self.columns}
 
-  for i in range(1, len(prices)):
-      if short_sma[i] is not None and long_sma[i] is not None:
-          if short_sma[i-1] is not None and long_sma[i-1] is not None:
-              if short_sma[i] > long_sma[i] and short_sma[i-1] <= long_sma[i-1]: # Corrected from &lt;=
-                  signals[i] = 'BUY'
-              elif short_sma[i] < long_sma[i] and short_sma[i-1] >= long_sma[i-1]: # Corrected from &lt; and >=
-                  signals[i] = 'SELL'
-  return signals
+  def get_state(self) -> dict:
+      """
+      Returns a JSON-serialisable snapshot of the stream state.
+      """
+      return {
+          'specs': self.specs,
+          'ticks': self.ticks,
+          'previous': self.previous,
+          'prices': list(self._prices),
+          'price_moments': self._price_moments.get_state(),
+          'return_moments': self._return_moments.get_state(),
+          'emas': [[span, level] for span, level in self._emas.items()],
+          'rsi': [[period, levels] for period, levels in self._rsi.items()],
+          'macd_signals': self._macd_signals,
+      }
 
-# You can add more signal generation functions here, e.g.,
-# def calculate_rsi(prices: list, period: int = 14) -> list:
-#     """Calculates the Relative Strength Index (RSI)."""
-#     pass
+  @classmethod
+  def from_state(cls, state: dict) -> 'IndicatorStream':
+      """
+      Restores a stream from a snapshot produced by `get_state`.
+      """
+      stream = cls(state['specs'])
+      stream.ticks = state['ticks']
+      stream.previous = state['previous']
+      stream._prices.extend(state['prices'])
+      stream._price_moments.set_state(state['price_moments'])
+      stream._return_moments.set_state(state['return_moments'])
+      stream._emas.update((span, level) for span, level in state['emas'])
+      stream._rsi.update((period, levels) for period, levels in state['rsi'])
+      stream._macd_signals.update(state['macd_signals'])
+      return stream
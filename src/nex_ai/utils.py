@@ -5,7 +5,31 @@ This could include:
 - Logging setup.
 - Error handling decorators.
 - Configuration loading.
+
+Instrumentation
+---------------
+All package modules log through `get_logger`, under the 'nex_ai' logger.
+Nothing is emitted until `configure_logging` attaches a handler, and per-call
+messages on hot paths are logged at DEBUG level.
+
+`timed(stage)` / `instrument(stage)` record call counts and wall-clock time
+into the in-process `METRICS` registry (counters and histograms); read them
+with `METRICS.snapshot()` or `METRICS.export_json()`. `enable_profiling(stage)`
+additionally runs that stage under cProfile.
 """
+import bisect
+import contextlib
+import functools
+import io
+import json
+import logging
+import math
+import threading
+import time
+
+LOGGER_NAME = 'nex_ai'
+
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
 
 def format_timestamp(timestamp: int) -> str:
     """
@@ -18,5 +42,270 @@ def load_config(config_path: str) -> dict:
     """
     Loads configuration from a specified path (e.g., JSON, YAML).
     """
-    print(f"Loading configuration from {config_path}...")
+    logger.info("Loading configuration from %s...", config_path)
     return {"api_key": "dummy_key", "data_source": "mock"}
+
+# --- Logging ---
+
+# Attributes every LogRecord has; anything else was passed via `extra=`.
+_STANDARD_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+    Fields passed with `extra={...}` are included as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns the package logger for a module, e.g. get_logger(__name__).
+    """
+    if name != LOGGER_NAME and not name.startswith(LOGGER_NAME + '.'):
+        name = f"{LOGGER_NAME}.{name.rsplit('.', 1)[-1]}"
+    return logging.getLogger(name)
+
+def configure_logging(level='INFO', structured: bool = False, stream=None) -> logging.Handler:
+    """
+    Sends package log records at `level` and above to `stream` (stderr by default).
+
+    Args:
+        level (str | int): Minimum level, e.g. 'DEBUG' to see per-call hot-path messages.
+        structured (bool): Emit one JSON object per line instead of plain text.
+        stream: File-like object to write to.
+
+    Returns:
+        logging.Handler: The installed handler (replacing one installed earlier).
+    """
+    package_logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(package_logger.handlers):
+        if getattr(handler, '_nex_ai_handler', False):
+            package_logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler._nex_ai_handler = True
+    handler.setFormatter(StructuredFormatter() if structured
+                         else logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    package_logger.addHandler(handler)
+    package_logger.setLevel(level)
+    return handler
+
+logger = get_logger(__name__)
+
+# --- Metrics ---
+
+# Histogram bucket upper bounds: 1us .. ~100s, four buckets per decade.
+DEFAULT_BUCKETS = tuple(10 ** (exponent / 4) for exponent in range(-24, 9))
+
+class Counter:
+    """A thread-safe monotonically increasing counter."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+class Histogram:
+    """
+    A thread-safe histogram with fixed bucket bounds.
+    Quantiles in the snapshot are bucket upper bounds, i.e. approximate.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1) # Last bucket is +inf
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value < self._min:
+                self._min = value
+            if value > self._max:
+                self._max = value
+
+    def _quantile(self, q: float) -> float:
+        target = q * self._count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target and count:
+                return self.buckets[index] if index < len(self.buckets) else self._max
+        return self._max
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if not self._count:
+                return {'count': 0, 'sum': 0.0}
+            return {
+                'count': self._count,
+                'sum': self._sum,
+                'mean': self._sum / self._count,
+                'min': self._min,
+                'max': self._max,
+                'p50': self._quantile(0.5),
+                'p90': self._quantile(0.9),
+                'p99': self._quantile(0.99),
+            }
+
+class MetricsRegistry:
+    """
+    Named counters and histograms, created on first use.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+        return counter
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def increment(self, name: str, amount=1) -> None:
+        self.counter(name).inc(amount)
+
+    def observe(self, name: str, value: float) -> None:
+        self.histogram(name).observe(value)
+
+    def snapshot(self) -> dict:
+        """
+        Returns {'counters': {name: value}, 'histograms': {name: summary}}.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+        return {
+            'counters': {name: counter.value for name, counter in sorted(counters.items())},
+            'histograms': {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+        }
+
+    def export_json(self, path: str | None = None) -> str:
+        """
+        Serialises a snapshot to JSON, writing it to `path` when given.
+        """
+        payload = json.dumps(dict(self.snapshot(), exported_at=time.time()), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(payload)
+        return payload
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+METRICS = MetricsRegistry()
+
+# --- Profiling ---
+
+_profilers = {}
+_profilers_lock = threading.Lock()
+
+def enable_profiling(*stages: str) -> None:
+    """
+    Runs the given stages (as named in `timed`/`instrument`) under cProfile.
+    """
+    import cProfile
+
+    with _profilers_lock:
+        for stage in stages:
+            _profilers.setdefault(stage, cProfile.Profile())
+
+def disable_profiling(*stages: str) -> None:
+    """
+    Stops profiling the given stages (all stages if none are given) and discards their data.
+    """
+    with _profilers_lock:
+        for stage in stages or list(_profilers):
+            _profilers.pop(stage, None)
+
+def profile_stats(stage: str, sort: str = 'cumulative', limit: int = 25) -> str:
+    """
+    Returns the accumulated cProfile report for a stage, or '' if it is not profiled.
+    """
+    profiler = _profilers.get(stage)
+    if profiler is None:
+        return ''
+    import pstats
+
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+# --- Timing ---
+
+@contextlib.contextmanager
+def timed(stage: str):
+    """
+    Context manager recording `<stage>.calls` and the `<stage>.seconds` histogram.
+    Errors raised inside the block are counted in `<stage>.errors`.
+    """
+    profiler = _profilers.get(stage)
+    profiling = False
+    if profiler is not None:
+        try:
+            profiler.enable()
+            profiling = True
+        except ValueError: # Another profiler is already active in this thread
+            pass
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        METRICS.increment(f"{stage}.errors")
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiling:
+            profiler.disable()
+        METRICS.increment(f"{stage}.calls")
+        METRICS.observe(f"{stage}.seconds", elapsed)
+
+def instrument(stage: str):
+    """
+    Decorator form of `timed`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
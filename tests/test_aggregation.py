@@ -0,0 +1,65 @@
+"""
+Unit tests for the aggregation module.
+"""
+import unittest
+
+from src.nex_ai.aggregation import BarAggregator, aggregate_ticks, parse_interval
+from src.nex_ai.data_ingestion import process_raw_data
+
+class TestBarAggregation(unittest.TestCase):
+
+    def test_parse_interval(self):
+        self.assertEqual(parse_interval('1m'), 60)
+        self.assertEqual(parse_interval('4h'), 14400)
+        for bad in ('', '1x', 'm', '0h'):
+            with self.assertRaises(ValueError):
+                parse_interval(bad)
+
+    def test_ohlcv_across_intervals(self):
+        ticks = [(0, 10.0, 1), (20, 12.0, 2), (50, 9.0, 1), (65, 11.0, 3), (130, 13.0, 1)]
+        emitted = []
+        aggregator = BarAggregator(intervals=('1m', '5m'), on_bar=emitted.append)
+        closed = []
+        for tick in ticks:
+            closed += aggregator.add_tick(*tick)
+
+        self.assertEqual(closed, emitted)
+        self.assertEqual([(b.interval, b.start) for b in closed], [('1m', 0), ('1m', 60)])
+        first = closed[0]
+        self.assertEqual((first.open, first.high, first.low, first.close, first.volume, first.ticks),
+                         (10.0, 12.0, 9.0, 9.0, 4.0, 3))
+
+        remaining = aggregator.flush()
+        self.assertEqual([(b.interval, b.start) for b in remaining], [('1m', 120), ('5m', 0)])
+        self.assertEqual(remaining[1].volume, 8.0)
+        self.assertEqual(remaining[1].close, 13.0)
+
+    def test_late_ticks_within_grace_period(self):
+        aggregator = BarAggregator(intervals=('1m',), grace_period=30)
+        aggregator.add_tick(10, 5.0)
+        aggregator.add_tick(70, 6.0) # Minute 0 still open: 60 + 30 > 70
+        self.assertEqual(aggregator.add_tick(5, 4.0), []) # Late tick becomes the open
+
+        closed = aggregator.add_tick(95, 7.0)
+        self.assertEqual(len(closed), 1)
+        self.assertEqual((closed[0].open, closed[0].close, closed[0].ticks), (4.0, 5.0, 2))
+
+        aggregator.add_tick(30, 1.0) # Too late: minute 0 was already emitted
+        self.assertEqual(aggregator.dropped_ticks['1m'], 1)
+
+    def test_aggregate_ticks_generator(self):
+        bars = list(aggregate_ticks(((t, 1.0 + t) for t in range(0, 600, 10)), intervals=('5m',)))
+        self.assertEqual([b.start for b in bars], [0, 300])
+        self.assertEqual(bars[0].ticks, 30)
+
+    def test_add_snapshot_skips_missing_price(self):
+        aggregator = BarAggregator(intervals=('1m',))
+        aggregator.add_snapshot({'priceUsd': '0.5'}, timestamp=0)
+        aggregator.add_snapshot({'priceUsd': None}, timestamp=1)
+        aggregator.add_snapshot(process_raw_data({'priceUsd': '0.7'}), timestamp=2)
+        aggregator.add_snapshot(process_raw_data({}), timestamp=3)
+        bar = aggregator.flush()[0]
+        self.assertEqual((bar.ticks, bar.close), (2, 0.7))
+
+if __name__ == '__main__':
+    unittest.main()
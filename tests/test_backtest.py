@@ -0,0 +1,74 @@
+"""
+Unit tests for the backtest module.
+"""
+import unittest
+
+import numpy as np
+
+from src.nex_ai.backtest import backtest_grid, parameter_grid, summarize_grid, sweep_universe
+from src.nex_ai.signal_generation import generate_trading_signals
+
+def naive_backtest(prices, short_window, long_window, fee):
+    # Reference: walk the list signals bar by bar.
+    signals = generate_trading_signals(list(prices), short_window, long_window)
+    position, equity, peak, max_drawdown = 0, 1.0, 1.0, 0.0
+    trades = wins = turnover = 0
+    entry_equity = None
+    for t, signal in enumerate(signals):
+        if t > 0 and position:
+            equity *= prices[t] / prices[t - 1]
+        if signal == 'BUY' and not position:
+            entry_equity, position = equity, 1
+            equity *= 1 - fee
+            trades, turnover = trades + 1, turnover + 1
+        elif signal == 'SELL' and position:
+            equity *= 1 - fee
+            position, turnover = 0, turnover + 1
+            wins += equity > entry_equity
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, 1 - equity / peak)
+    if position:
+        wins += equity > entry_equity
+    hit_rate = wins / trades if trades else float('nan')
+    return equity - 1, hit_rate, max_drawdown, turnover, trades
+
+class TestBacktest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(12)
+        self.series = [100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))) for n in (400, 250, 20)]
+
+    def test_parameter_grid_skips_invalid_pairs(self):
+        self.assertEqual(parameter_grid([5, 3, 10], [5, 10]), [(3, 5), (3, 10), (5, 10)])
+
+    def test_grid_matches_naive_backtest(self):
+        for fee in (0.0, 0.004):
+            results = backtest_grid(self.series[0], [2, 4, 7], [5, 12, 30], fee=fee)
+            self.assertEqual(len(results), 8)
+            for row in results:
+                expected = naive_backtest(self.series[0], row['short_window'], row['long_window'], fee)
+                actual = (row['pnl'], row['hit_rate'], row['max_drawdown'], row['turnover'], row['trades'])
+                np.testing.assert_allclose(actual, expected, rtol=1e-9, equal_nan=True)
+
+    def test_short_series_has_no_trades(self):
+        row = backtest_grid(self.series[2], [5], [30])[0]
+        self.assertEqual((row['pnl'], row['trades'], row['turnover']), (0.0, 0, 0))
+        self.assertTrue(np.isnan(row['hit_rate']))
+
+    def test_sweep_universe_and_summary(self):
+        serial = sweep_universe(self.series, [3, 5], [10, 20], max_workers=1)
+        parallel = sweep_universe(self.series, [3, 5], [10, 20], max_workers=2)
+        for field in serial.dtype.names:
+            np.testing.assert_array_equal(serial[field], parallel[field])
+        self.assertEqual(serial['token'].tolist(), [0] * 4 + [1] * 4 + [2] * 4)
+
+        summary = summarize_grid(serial, top=2)
+        self.assertEqual(len(summary), 2)
+        self.assertTrue((summary['tokens'] == 3).all())
+        self.assertGreaterEqual(summary['mean_pnl'][0], summary['mean_pnl'][1])
+        first = serial[(serial['short_window'] == summary['short_window'][0])
+                       & (serial['long_window'] == summary['long_window'][0])]
+        self.assertAlmostEqual(summary['mean_pnl'][0], first['pnl'].mean())
+
+if __name__ == '__main__':
+    unittest.main()
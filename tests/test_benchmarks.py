@@ -0,0 +1,38 @@
+"""
+Unit tests for the benchmark runner's regression gate.
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from benchmarks.run_benchmarks import compare_results, main, run_benchmarks
+
+class TestBenchmarkGate(unittest.TestCase):
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {'a[1000]': 0.100, 'b[1000]': 0.001, 'c[1000]': 0.050}
+        results = {'a[1000]': 0.200, 'b[1000]': 0.004, 'c[1000]': 0.060, 'new[1000]': 1.0}
+        # b is 4x slower but only by 3 ms (timer noise); c is within the threshold.
+        self.assertEqual(compare_results(results, baseline, threshold=1.5), [('a[1000]', 0.100, 0.200)])
+
+    def test_smoke_run(self):
+        results = run_benchmarks(max_size=1000, only=['signals', 'fetch_token_pairs'], repeat=1)
+        self.assertIn('signals.calculate_sma[1000]', results)
+        self.assertIn('ingestion.fetch_token_pairs[1000]', results)
+        self.assertNotIn('models.train_price_prediction_model[1000]', results)
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+
+    def test_missing_baseline_fails_the_gate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            args = ['--baseline', path, '--only', 'calculate_sma', '--max-size', '1000', '--repeat', '1']
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main(args), 2)
+                self.assertFalse(os.path.exists(path))
+                self.assertEqual(main([*args, '--update-baseline']), 0)
+                self.assertEqual(main([*args, '--threshold', '1000']), 0)
+
+if __name__ == '__main__':
+    unittest.main()
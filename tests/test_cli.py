@@ -0,0 +1,91 @@
+"""
+Unit tests for the command-line entry point and the package's import-time budget.
+"""
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.nex_ai.cli import DEFAULT_HISTORY_DIR, main
+from src.nex_ai.history import PriceHistoryStore
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+# Modules that must import without NumPy, scikit-learn, SciPy or asyncio. Import
+# time itself is tracked by the `startup` benchmarks, not asserted here.
+LIGHT_MODULES = ('nex_ai.cli', 'nex_ai.utils', 'nex_ai.data_ingestion')
+
+def import_in_subprocess(module: str) -> dict:
+    """Imports `module` in a fresh interpreter; returns the heavy modules it loaded."""
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        "heavy = [name for name in ('numpy', 'sklearn', 'scipy', 'asyncio') if name in sys.modules]\n"
+        "print(json.dumps({'heavy': heavy}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=SRC_DIR)).stdout
+    return json.loads(output)
+
+def run_cli(*argv) -> tuple[int, str]:
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        code = main(list(argv))
+    return code, stdout.getvalue() + stderr.getvalue()
+
+class TestImportBudget(unittest.TestCase):
+
+    def test_light_modules_skip_heavy_dependencies(self):
+        for module in LIGHT_MODULES:
+            self.assertEqual(import_in_subprocess(module)['heavy'], [], module)
+
+    def test_models_import_defers_sklearn(self):
+        self.assertEqual(import_in_subprocess('nex_ai.models')['heavy'], ['numpy'])
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        prices = 100 + 10 * np.sin(np.arange(120) / 6)
+        PriceHistoryStore(self.tmp.name).append('solana', 'TOKEN', np.arange(120.0), prices)
+
+    def test_signals(self):
+        code, output = run_cli('--history-dir', self.tmp.name, 'signals', 'solana', 'TOKEN', '--short', '3', '--long', '8')
+        self.assertEqual(code, 0)
+        self.assertIn('BUY', output)
+        self.assertIn('SELL', output)
+
+        code, output = run_cli('--history-dir', self.tmp.name, 'signals', 'solana', 'UNKNOWN')
+        self.assertEqual(code, 1)
+        self.assertIn('Only 0 stored prices', output)
+
+    def test_default_history_dir_ignores_working_directory(self):
+        self.assertTrue(os.path.isabs(DEFAULT_HISTORY_DIR))
+        self.assertEqual(os.path.basename(DEFAULT_HISTORY_DIR), 'history')
+
+    def test_train(self):
+        code, output = run_cli('--history-dir', self.tmp.name, 'train', 'solana', 'TOKEN', '--look-back', '4')
+        self.assertEqual(code, 0)
+        self.assertIn('Predicted next price based on last 4 points', output)
+
+    def test_fetch(self):
+        pair = {'baseToken': {'address': 'TOKEN', 'symbol': 'TOK'}, 'quoteToken': {'symbol': 'SOL'},
+                'priceUsd': '1.5', 'priceChange': {'h24': -2.5}, 'liquidity': {'usd': 10.0}}
+        with mock.patch('src.nex_ai.data_ingestion.fetch_token_pair_data', return_value=pair) as fetch:
+            code, output = run_cli('--history-dir', self.tmp.name, 'fetch', 'solana', 'TOKEN', '--history')
+        fetch.assert_called_once_with('solana', 'TOKEN')
+        self.assertEqual(code, 0)
+        self.assertIn('TOK/SOL', output)
+        self.assertIn('-2.50% 24h', output)
+        self.assertEqual(PriceHistoryStore(self.tmp.name).count('solana', 'TOKEN'), 121)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+"""
+Unit tests for the data_ingestion module.
+These run against a local stub of the Dexscreener tokens endpoint.
+"""
+import asyncio
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.nex_ai import data_ingestion
+from src.nex_ai.data_ingestion import (
+    PairSnapshot,
+    ResponseCache,
+    fetch_token_pair_data,
+    fetch_token_pairs,
+    fetch_token_pairs_batch,
+    iter_token_pairs,
+    process_raw_batch,
+    process_raw_data,
+    snapshot_dtype,
+)
+from src.nex_ai.utils import METRICS
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                            'benchmarks', 'fixtures', 'dexscreener_tokens_v1.json')
+
+def make_pair(address):
+    return {
+        'chainId': 'solana',
+        'pairAddress': f'pair-{address}',
+        'baseToken': {'address': address, 'symbol': address.upper()},
+        'quoteToken': {'address': 'sol', 'symbol': 'SOL'},
+        'priceUsd': '1.5',
+    }
+
+class StubDexscreenerHandler(BaseHTTPRequestHandler):
+    """Serves /tokens/v1/<chain>/<a,b,c> with one pair per address."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.paths.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            addresses = self.path.rsplit('/', 1)[-1].split(',')
+            if 'broken' in addresses:
+                self.send_response(500)
+                self.end_headers()
+                return
+            if server.etag and self.headers.get('If-None-Match') == server.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps([make_pair(address) for address in addresses]).encode()
+            self.send_response(200)
+            if server.etag:
+                self.send_header('ETag', server.etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubDexscreenerHandler)
+        self.server.lock = threading.Lock()
+        self.server.paths = []
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.delay = 0.0
+        self.server.etag = None
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                                  daemon=True)
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestBulkFetching(StubServerTestCase):
+
+    def test_fetch_token_pairs_batches_addresses(self):
+        addresses = [f'tok{i}' for i in range(75)]
+        pairs = fetch_token_pairs('solana', addresses + addresses[:5], base_url=self.base_url)
+
+        self.assertEqual(len(self.server.paths), 3) # 30 + 30 + 15, duplicates dropped
+        self.assertTrue(all(path.startswith('/tokens/v1/solana/') for path in self.server.paths))
+        self.assertEqual(sorted(p['baseToken']['address'] for p in pairs), sorted(addresses))
+
+    def test_in_flight_requests_are_capped(self):
+        self.server.delay = 0.05
+        addresses = [f'tok{i}' for i in range(12)]
+        pairs = fetch_token_pairs('solana', addresses, batch_size=1, max_concurrency=3,
+                                  base_url=self.base_url)
+        self.assertEqual(len(pairs), 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_failed_batch_is_skipped(self):
+        pairs = fetch_token_pairs('solana', ['good1', 'broken', 'good2'], batch_size=1,
+                                  base_url=self.base_url)
+        self.assertEqual(sorted(p['baseToken']['address'] for p in pairs), ['good1', 'good2'])
+
+    def test_fetch_token_pair_data_records_metrics(self):
+        METRICS.reset()
+        pair = fetch_token_pair_data('solana', 'tok1', base_url=self.base_url)
+        self.assertEqual(pair['baseToken']['address'], 'tok1')
+        self.assertIsNone(fetch_token_pair_data('solana', 'broken', base_url=self.base_url))
+
+        snapshot = METRICS.snapshot()
+        self.assertEqual(snapshot['counters']['ingestion.request.calls'], 2)
+        self.assertEqual(snapshot['counters']['ingestion.http_errors'], 1)
+        self.assertGreater(snapshot['counters']['ingestion.bytes_parsed'], 0)
+        self.assertEqual(snapshot['histograms']['ingestion.request.seconds']['count'], 2)
+
+    def test_iter_token_pairs_yields_as_batches_arrive(self):
+        async def first_pair():
+            async for pair in iter_token_pairs('solana', ['a', 'b', 'c'], batch_size=1,
+                                               base_url=self.base_url):
+                return pair
+        pair = asyncio.run(first_pair())
+        self.assertIn(pair['baseToken']['address'], ['a', 'b', 'c'])
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+class TestResponseCache(StubServerTestCase):
+
+    def fetch(self, cache, addresses=('a',)):
+        return fetch_token_pairs_batch('solana', list(addresses), base_url=self.base_url, cache=cache)
+
+    def test_ttl_hits_and_expiry(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=10, clock=clock)
+        first = self.fetch(cache)
+        clock.now += 5
+        self.assertEqual(self.fetch(cache), first)
+        self.assertEqual(len(self.server.paths), 1)
+
+        clock.now += 10
+        self.fetch(cache)
+        self.assertEqual(len(self.server.paths), 2)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stale']), (1, 1, 1))
+
+    def test_etag_revalidation(self):
+        self.server.etag = '"v1"'
+        clock = FakeClock()
+        cache = ResponseCache(ttl=1, clock=clock)
+        first = self.fetch(cache)
+        clock.now += 2
+        self.assertEqual(self.fetch(cache), first)
+        self.assertEqual(len(self.server.paths), 2)
+        self.assertEqual(cache.stats()['revalidated'], 1)
+
+        # The revalidated entry is fresh again
+        self.fetch(cache)
+        self.assertEqual(len(self.server.paths), 2)
+
+    def test_concurrent_requests_are_collapsed(self):
+        self.server.delay = 0.1
+        cache = ResponseCache(ttl=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.fetch(cache))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.server.paths), 1)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(cache.stats()['coalesced'], 7)
+
+    def test_lru_evicts_oldest(self):
+        cache = ResponseCache(ttl=60, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c').data, 'c')
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = self.fetch(ResponseCache(ttl=60, disk_path=cache_dir))
+            restarted = ResponseCache(ttl=60, disk_path=cache_dir)
+            self.assertEqual(self.fetch(restarted), first)
+            self.assertEqual(len(self.server.paths), 1)
+            self.assertEqual(restarted.stats()['hits'], 1)
+
+class TestPairSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        with open(FIXTURE_PATH, 'rb') as f:
+            self.body = f.read()
+        self.pairs = json.loads(self.body)
+
+    def test_process_raw_data_parses_numbers(self):
+        snapshot = process_raw_data(self.pairs[0])
+        self.assertIsInstance(snapshot, PairSnapshot)
+        self.assertEqual((snapshot.chain_id, snapshot.dex_id, snapshot.base_symbol, snapshot.quote_symbol),
+                         ('solana', 'raydium', 'BUNKER', 'SOL'))
+        self.assertEqual(snapshot.base_address, '8NCievmJCg2d9Vc2TWgz2HkE6ANeSX7kwvdq5AL7pump')
+        self.assertEqual(snapshot.price_usd, 0.000008121)
+        self.assertEqual((snapshot.volume_h1, snapshot.liquidity_usd, snapshot.price_change_h24),
+                         (1304.12, 21984.06, -12.64))
+        self.assertEqual((snapshot.buys_h24, snapshot.sells_h24), (1893.0, 1702.0))
+        self.assertEqual(snapshot.pair_created_at, 1735689600.0)
+
+        sparse = process_raw_data({'priceUsd': 'n/a', 'baseToken': None, 'volume': {'h24': '12'}})
+        self.assertEqual((sparse.base_address, sparse.volume_h24), ('', 12.0))
+        self.assertTrue(math.isnan(sparse.price_usd) and math.isnan(sparse.fdv))
+
+    def test_process_raw_batch_matches_records(self):
+        array = process_raw_batch(self.body)
+        self.assertEqual(array.dtype, snapshot_dtype())
+        self.assertEqual(len(array), len(self.pairs))
+        for row, pair in zip(array, self.pairs):
+            snapshot = process_raw_data(pair)
+            for name in PairSnapshot._fields:
+                value = row[name]
+                value = value.decode() if isinstance(value, bytes) else value
+                self.assertEqual(value, getattr(snapshot, name), name)
+        self.assertEqual(len(process_raw_batch([])), 0)
+
+    def test_process_raw_batch_keeps_long_strings(self):
+        coin_type = '0x' + '6864a6f921804860930db6ddbe2e16acdf8504495ea7481637a1c8b9a8fe54b1' + '::cetus::CETUS'
+        pairs = [dict(self.pairs[0], pairAddress=coin_type, baseToken={'address': coin_type, 'symbol': 'S' * 23}),
+                 self.pairs[0]]
+        array = process_raw_batch(pairs)
+        self.assertEqual(array['pair_address'][0].decode(), coin_type)
+        self.assertEqual(array['base_address'][0].decode(), coin_type)
+        self.assertEqual(array['base_symbol'][0], 'S' * 23)
+        self.assertEqual(array['base_symbol'][1], 'BUNKER')
+        self.assertEqual(array['quote_symbol'].dtype, snapshot_dtype()['quote_symbol']) # Untouched fields keep their width
+
+    def test_json_decoder_fallback(self):
+        decoded = data_ingestion._json_loads(self.body)
+        original = data_ingestion.orjson
+        data_ingestion.orjson = None
+        try:
+            self.assertEqual(data_ingestion._json_loads(self.body), decoded)
+            with self.assertRaises(ValueError):
+                data_ingestion._json_loads(b'{not json')
+        finally:
+            data_ingestion.orjson = original
+
+if __name__ == '__main__':
+    unittest.main()
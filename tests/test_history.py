@@ -0,0 +1,82 @@
+"""
+Unit tests for the history module.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.nex_ai.data_ingestion import process_raw_data
+from src.nex_ai.history import PriceHistoryStore
+
+class TestPriceHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = PriceHistoryStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_range_query(self):
+        self.store.append('solana', 'tok', [1, 2, 3], [10.0, 11.0, 12.0], [5, 6, 7], [100, 100, 100])
+        self.store.append('solana', 'tok', [4, 5], [13.0, 14.0])
+
+        history = self.store.query('solana', 'tok')
+        np.testing.assert_array_equal(history.timestamp, [1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(history.price_usd, [10, 11, 12, 13, 14])
+        self.assertTrue(np.isnan(history.volume[-2:]).all())
+
+        window = self.store.query('solana', 'tok', start=2, end=4)
+        np.testing.assert_array_equal(window.price_usd, [11.0, 12.0])
+        self.assertIsInstance(window.price_usd, np.memmap) # a view, not a copy
+
+    def test_append_snapshot_and_unknown_token(self):
+        pair = {'priceUsd': '0.0042', 'volume': {'h24': 1234.5}, 'liquidity': {'usd': 99.0}}
+        self.store.append_snapshot('solana', 'addr/with/slashes', pair, timestamp=100.0)
+        self.store.append_snapshot('solana', 'addr/with/slashes', {'priceUsd': 'n/a'}, timestamp=101.0)
+        self.store.append_snapshot('solana', 'addr/with/slashes', process_raw_data(pair), timestamp=102.0)
+
+        history = self.store.query('solana', 'addr/with/slashes')
+        self.assertEqual(history.price_usd[0], 0.0042)
+        self.assertEqual(history.volume[0], 1234.5)
+        self.assertTrue(np.isnan(history.price_usd[1]))
+        self.assertEqual((history.price_usd[2], history.volume[2], history.liquidity[2]), (0.0042, 1234.5, 99.0))
+        self.assertEqual(self.store.tokens(), [('solana', 'addr/with/slashes')])
+        self.assertEqual(len(self.store.query('solana', 'missing').timestamp), 0)
+
+    def test_dot_ids_stay_inside_root(self):
+        store = PriceHistoryStore(os.path.join(self.tmp.name, 'store'))
+        store.append('..', '..', [1], [1.0])
+        store.append('solana', '.', [1], [2.0])
+        self.assertEqual(os.listdir(self.tmp.name), ['store']) # Nothing written next to the store
+        self.assertEqual(sorted(store.tokens()), [('..', '..'), ('solana', '.')])
+        self.assertEqual(store.query('..', '..').price_usd[0], 1.0)
+        self.assertEqual(store.query('solana', '.').price_usd[0], 2.0)
+        with self.assertRaises(ValueError):
+            store.append('solana', '', [1], [1.0])
+
+    def test_out_of_order_rows_are_dropped(self):
+        self.store.append('eth', 'tok', [10, 20], [1.0, 2.0])
+        written = self.store.append('eth', 'tok', [15, 30, 25], [9.0, 3.0, 2.5])
+        self.assertEqual(written, 2)
+        np.testing.assert_array_equal(self.store.query('eth', 'tok').timestamp, [10, 20, 25, 30])
+
+    def test_compaction_applies_retention(self):
+        store = PriceHistoryStore(self.tmp.name, max_points=3, max_age=50)
+        store.append('eth', 'tok', [0, 10, 60, 70, 70, 80, 90], [1, 2, 3, 4, 5, 6, 7])
+        view_before = store.query('eth', 'tok')
+
+        removed = store.compact('eth', 'tok', now=100)
+        history = store.query('eth', 'tok')
+        np.testing.assert_array_equal(history.timestamp, [70, 80, 90])
+        np.testing.assert_array_equal(history.price_usd, [5, 6, 7])
+        self.assertEqual(removed, 4)
+        self.assertEqual(len(view_before.timestamp), 7) # existing readers are unaffected
+
+        self.store.append('eth', 'tok', [100], [8])
+        self.assertEqual(store.count('eth', 'tok'), 4)
+
+if __name__ == '__main__':
+    unittest.main()
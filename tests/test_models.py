@@ -0,0 +1,273 @@
+"""
+Unit tests for the models module.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.nex_ai.models import (
+    AnomalyDetector,
+    OnlinePricePredictor,
+    create_dataset,
+    predict_next_price,
+    predict_next_prices,
+    stack_models,
+    train_price_prediction_model,
+    train_price_prediction_models,
+)
+
+class TestCreateDataset(unittest.TestCase):
+
+    def test_windows_are_views(self):
+        prices = np.arange(10.0)
+        X, y = create_dataset(prices, look_back=3)
+        self.assertEqual(X.shape, (7, 3))
+        np.testing.assert_array_equal(X[0], [0, 1, 2])
+        np.testing.assert_array_equal(y, np.arange(3.0, 10.0))
+        self.assertTrue(np.shares_memory(X, prices))
+
+    def test_matches_list_slicing(self):
+        prices = [3, 1, 4, 1, 5, 9, 2, 6]
+        X, y = create_dataset(prices, look_back=2)
+        self.assertEqual(X.tolist(), [prices[i:i + 2] for i in range(6)])
+        self.assertEqual(y.tolist(), prices[2:])
+
+    def test_not_enough_data(self):
+        X, y = create_dataset([1, 2], look_back=2)
+        self.assertEqual((len(X), len(y)), (0, 0))
+
+class TestBatchTraining(unittest.TestCase):
+
+    def test_matches_individual_fits(self):
+        rng = np.random.default_rng(42)
+        series = [100 + np.cumsum(rng.normal(0, 1, n)) for n in (50, 50, 80, 4, 200)]
+        batch = train_price_prediction_models(series, look_back=3)
+
+        for i, prices in enumerate(series):
+            model = train_price_prediction_model(list(prices), look_back=3)
+            if model is None:
+                self.assertTrue(np.isnan(batch.coef_[i]).all())
+                self.assertEqual(batch.n_samples_[i], 0)
+                continue
+            np.testing.assert_allclose(batch.coef_[i], model.coef_, rtol=1e-6, atol=1e-8)
+            self.assertAlmostEqual(batch.intercept_[i], model.intercept_, places=5)
+
+    def test_matrix_input_and_predict(self):
+        rng = np.random.default_rng(1)
+        matrix = 1e-4 * (1 + np.cumsum(rng.normal(0, 0.01, (6, 40)), axis=1))
+        batch = train_price_prediction_models(matrix, look_back=4)
+        self.assertEqual(batch.coef_.shape, (6, 4))
+
+        latest = matrix[:, -4:]
+        expected = [train_price_prediction_model(list(row), look_back=4).predict(row[-4:].reshape(1, -1))[0]
+                    for row in matrix]
+        np.testing.assert_allclose(batch.predict(latest), expected, rtol=1e-8)
+
+class TestOnlinePricePredictor(unittest.TestCase):
+
+    def test_matches_batch_fit_without_forgetting(self):
+        rng = np.random.default_rng(7)
+        for scale in (1e-6, 1.0, 5e3):
+            prices = scale * (1 + np.cumsum(rng.normal(0, 0.01, 300)))
+            online = OnlinePricePredictor(look_back=4)
+            online.update_many(prices)
+            batch = train_price_prediction_model(list(prices), look_back=4)
+
+            np.testing.assert_allclose(online.coef_, batch.coef_, rtol=1e-7, atol=1e-9)
+            self.assertAlmostEqual(online.intercept_ / scale, batch.intercept_ / scale, places=7)
+            self.assertAlmostEqual(predict_next_price(online, list(prices[-4:])) / scale,
+                                   online.predict_next() / scale, places=9)
+
+    def test_state_round_trip(self):
+        rng = np.random.default_rng(8)
+        prices = 50 + np.cumsum(rng.normal(0, 1, 120))
+        uninterrupted = OnlinePricePredictor(look_back=3, forgetting_factor=0.98)
+        uninterrupted.update_many(prices)
+
+        model = OnlinePricePredictor(look_back=3, forgetting_factor=0.98)
+        model.update_many(prices[:2]) # Restore mid warm-up as well as after it
+        model = OnlinePricePredictor.from_state(json.loads(json.dumps(model.get_state())))
+        model.update_many(prices[2:60])
+        model = OnlinePricePredictor.from_state(json.loads(json.dumps(model.get_state())))
+        model.update_many(prices[60:])
+
+        np.testing.assert_allclose(model.coef_, uninterrupted.coef_, rtol=1e-9)
+        self.assertEqual(model.n_updates, len(prices) - 3)
+
+    def test_forgetting_factor_tracks_regime_change(self):
+        prices = [100.0 + 0.5 * i for i in range(100)] + [150.0 - 1.5 * i for i in range(100)]
+        model = OnlinePricePredictor(look_back=2, forgetting_factor=0.9)
+        model.update_many(prices)
+        self.assertAlmostEqual(model.predict_next(), prices[-1] - 1.5, places=4)
+
+    def test_collinear_windows_stay_in_warm_up(self):
+        # On a linear ramp every window is collinear with the intercept.
+        prices = [100.0 + 0.5 * i for i in range(40)]
+        model = OnlinePricePredictor(look_back=5)
+        model.update_many(prices)
+        self.assertIsNotNone(model.get_state()['gram']) # Never full rank, so never inverted
+        self.assertAlmostEqual(model.predict_next(), prices[-1] + 0.5, places=4)
+
+    def test_flat_start_matches_batch_fit(self):
+        rng = np.random.default_rng(9)
+        for n_flat in (6, 20):
+            prices = np.r_[np.full(n_flat, 4.3), 4.3 + np.cumsum(rng.normal(0, 0.05, 200))]
+            online = OnlinePricePredictor(look_back=5)
+            online.update_many(prices[:n_flat])
+            self.assertEqual(online.coef_.tolist(), [0.0] * 5)
+            self.assertAlmostEqual(online.predict_next(), 4.3, places=12)
+            online.update_many(prices[n_flat:])
+            batch = train_price_prediction_models(prices[None, :], look_back=5)
+
+            self.assertIsNone(online.get_state()['gram'])
+            np.testing.assert_allclose(online.coef_, batch.coef_[0], rtol=1e-7, atol=1e-8)
+            self.assertAlmostEqual(online.intercept_, batch.intercept_[0], places=7)
+
+    def test_untrained_model(self):
+        model = OnlinePricePredictor(look_back=3)
+        model.update_many([1.0, 2.0])
+        self.assertIsNone(model.predict_next())
+        self.assertTrue(np.isnan(model.coef_).all())
+
+class TestBatchForecasting(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.history = 100 + np.cumsum(rng.normal(0, 1, (5, 150)), axis=1)
+        self.model = train_price_prediction_models(self.history, look_back=4)
+        self.windows = self.history[:, -4:]
+
+    def test_next_step_matches_single_predictions(self):
+        forecast = predict_next_prices(self.model, self.windows)
+        self.assertEqual(forecast.predictions.shape, (5, 1))
+        self.assertEqual(forecast.errors, {})
+        models = [train_price_prediction_model(list(row), look_back=4) for row in self.history]
+        expected = [predict_next_price(m, list(w)) for m, w in zip(models, self.windows)]
+        np.testing.assert_allclose(forecast.predictions[:, 0], expected, rtol=1e-8)
+
+    def test_multi_step_matches_recursive_feedback(self):
+        horizon = 11
+        forecast = predict_next_prices(self.model, self.windows, horizon=horizon)
+        for row in range(5):
+            window = list(self.windows[row])
+            for step in range(horizon):
+                window.append(float(np.dot(window[-4:], self.model.coef_[row]) + self.model.intercept_[row]))
+            np.testing.assert_allclose(forecast.predictions[row], window[4:], rtol=1e-10)
+
+    def test_errors_are_reported_per_row(self):
+        models = [train_price_prediction_model(list(row), look_back=4) for row in self.history[:3]]
+        stacked = stack_models(models + [None])
+        windows = [list(self.windows[0]), [1.0, 2.0], [1.0, float('nan'), 3.0, 4.0], list(self.windows[1])]
+        forecast = predict_next_prices(stacked, windows, horizon=3)
+
+        self.assertEqual(sorted(forecast.errors), [1, 2, 3])
+        self.assertIn('Expected 4', forecast.errors[1])
+        self.assertIn('not trained', forecast.errors[3])
+        self.assertTrue(np.isfinite(forecast.predictions[0]).all())
+        self.assertTrue(np.isnan(forecast.predictions[1:]).all())
+
+def ewma_z_scores(values, alpha, warm_up):
+    """Per-token reference: z-score of each value against the (debiased) EWMA mean/variance before it."""
+    mean = variance = None
+    scores = []
+    for count, value in enumerate(values):
+        if mean is None:
+            mean, variance = value, 0.0
+            scores.append(np.nan)
+            continue
+        deviation = value - mean
+        debiased = variance / (1 - (1 - alpha) ** (count - 1)) if count > 1 else 0.0
+        scores.append(deviation / np.sqrt(debiased) if count >= warm_up else np.nan)
+        mean += alpha * deviation
+        variance = (1 - alpha) * (variance + alpha * deviation ** 2)
+    return scores
+
+class TestAnomalyDetector(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.n_tokens, self.n_cycles = 500, 120
+        self.prices = 10 ** rng.uniform(-6, 3, self.n_tokens) * np.exp(np.cumsum(rng.normal(0, 0.01, (self.n_cycles, self.n_tokens)), axis=0))
+        self.volumes = rng.lognormal(10, 0.3, (self.n_cycles, self.n_tokens))
+        self.tokens = [f'token{i}' for i in range(self.n_tokens)]
+
+    def test_matches_per_token_ewma(self):
+        prices = self.prices.copy()
+        prices[::7, 3] = np.nan # Token 3 is missing from some cycles
+        detector = AnomalyDetector(self.tokens, alpha=0.1, warm_up=5)
+        scores = [detector.update(prices[t], self.volumes[t]) for t in range(self.n_cycles)]
+        return_z = np.array([score.return_z for score in scores])
+        volume_z = np.array([score.volume_z for score in scores])
+        for token in (0, 3):
+            observed = ~np.isnan(prices[:, token])
+            token_prices = prices[observed, token]
+            expected = ewma_z_scores(np.log(token_prices[1:] / token_prices[:-1]), 0.1, 5)
+            np.testing.assert_allclose(return_z[observed, token][1:], expected, rtol=1e-9)
+        np.testing.assert_allclose(volume_z[:, 0], ewma_z_scores(np.log1p(self.volumes[:, 0]), 0.1, 5), rtol=1e-9)
+
+    def test_flags_injected_spikes(self):
+        prices, volumes = self.prices.copy(), self.volumes.copy()
+        prices[-1, 7] *= 1.5     # +50% in one cycle against ~1% moves
+        prices[-1, 8] *= 0.6
+        volumes[-1, 9] *= 100.0  # Volume surge
+        for robust in (False, True):
+            with self.subTest(robust=robust):
+                detector = AnomalyDetector(self.tokens, threshold=8.0, robust=robust)
+                for t in range(self.n_cycles - 1):
+                    scores = detector.update(prices[t], volumes[t])
+                    self.assertFalse((scores.price_spike | scores.volume_spike).any())
+                scores = detector.update(prices[-1], volumes[-1])
+                np.testing.assert_array_equal(np.flatnonzero(scores.price_spike), [7, 8])
+                np.testing.assert_array_equal(np.flatnonzero(scores.volume_spike), [9])
+
+    def test_robust_variant_resists_bursts(self):
+        # A token whose volume surges for several cycles in a row: the EWMA
+        # variance absorbs the first spike, the clipped absolute deviation does not.
+        volumes = self.volumes[:, :1].copy()
+        volumes[-5:] *= 100.0
+        flags = {}
+        for robust in (False, True):
+            detector = AnomalyDetector(['token'], threshold=4.0, robust=robust)
+            flags[robust] = sum(bool(detector.update(np.ones(1), volumes[t]).volume_spike[0]) for t in range(self.n_cycles))
+        self.assertLess(flags[False], 5)
+        self.assertEqual(flags[True], 5)
+
+    def test_flat_history_is_not_flagged_on_tiny_moves(self):
+        for robust in (False, True):
+            with self.subTest(robust=robust):
+                detector = AnomalyDetector(['token'], robust=robust)
+                for t in range(30):
+                    detector.update([1.0], [1000.0])
+                scores = detector.update([1.0001], [1001.0])
+                self.assertTrue(np.isfinite(scores.return_z).all() and np.isfinite(scores.volume_z).all())
+                self.assertFalse(scores.price_spike[0] or scores.volume_spike[0])
+                self.assertTrue(detector.update([1.05], [1001.0]).price_spike[0])
+
+    def test_rows_and_persistence(self):
+        detector = AnomalyDetector(self.tokens[:2], robust=True, warm_up=3)
+        rows = detector.add_tokens(['token1', 'new'])
+        np.testing.assert_array_equal(rows, [1, 2])
+        for t in range(10):
+            detector.update(self.prices[t, :2], self.volumes[t, :2], rows=rows)
+        self.assertTrue(np.isnan(detector.state[0, 0])) # token0 was never observed
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'anomaly.npz')
+            detector.save(path)
+            restored = AnomalyDetector.load(path)
+        self.assertEqual(restored.tokens, ['token0', 'token1', 'new'])
+        self.assertEqual((restored.alpha, restored.threshold, restored.warm_up, restored.robust, restored.min_scale),
+                         (0.05, 4.0, 3, True, 1e-3))
+        np.testing.assert_array_equal(restored.state, detector.state)
+        expected = detector.update(self.prices[10, :2], self.volumes[10, :2], rows=rows)
+        actual = restored.update(self.prices[10, :2], self.volumes[10, :2], rows=rows)
+        np.testing.assert_array_equal(actual.return_z, expected.return_z)
+
+        with self.assertRaises(ValueError):
+            detector.update([1.0], rows=rows)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Unit tests for the pipeline module.
+"""
+import unittest
+
+import numpy as np
+
+from src.nex_ai.models import train_price_prediction_models
+from src.nex_ai.pipeline import SharedSeries, guided_chunks, map_series, run_pipeline
+from src.nex_ai.signal_generation import generate_trading_signals_array
+
+def series_stats(prices):
+    return len(prices), float(np.sum(prices))
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        lengths = [0, 3, 40, 800, 2500, 120, 60, 1500, 7, 300]
+        self.series = [100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))) for n in lengths]
+
+    def test_shared_series_round_trip(self):
+        with SharedSeries(self.series) as shared:
+            self.assertEqual(len(shared), len(self.series))
+            self.assertEqual(shared.lengths.tolist(), [len(s) for s in self.series])
+            for index, prices in enumerate(self.series):
+                np.testing.assert_array_equal(shared[index], prices)
+            attached = SharedSeries.attach(shared.name, shared.offsets)
+            np.testing.assert_array_equal(attached[4], self.series[4])
+            attached.close()
+
+    def test_guided_chunks_cover_tokens_largest_first(self):
+        lengths = [len(s) for s in self.series]
+        chunks = guided_chunks(lengths, workers=2, min_chunk_work=100)
+        self.assertEqual(sorted(np.concatenate(chunks).tolist()), list(range(len(lengths))))
+        self.assertEqual(chunks[0][0], 4) # The longest series goes out first
+        work = [sum(lengths[i] for i in chunk) for chunk in chunks]
+        self.assertGreater(work[0], work[-1])
+
+    def test_parallel_matches_serial(self):
+        expected_signals = [generate_trading_signals_array(s, 5, 20) for s in self.series]
+        expected_model = train_price_prediction_models(self.series, look_back=4)
+        for max_workers in (1, 3):
+            result = run_pipeline(self.series, 5, 20, look_back=4, max_workers=max_workers, min_chunk_work=100)
+            self.assertEqual(len(result.signals), len(self.series))
+            for codes, expected in zip(result.signals, expected_signals):
+                np.testing.assert_array_equal(codes, expected)
+            np.testing.assert_allclose(result.model.coef_, expected_model.coef_, rtol=1e-9, atol=1e-12, equal_nan=True)
+            np.testing.assert_allclose(result.model.intercept_, expected_model.intercept_, rtol=1e-9, atol=1e-9, equal_nan=True)
+            np.testing.assert_array_equal(result.model.n_samples_, expected_model.n_samples_)
+
+        signals_only = run_pipeline(self.series, look_back=None, max_workers=2, min_chunk_work=100)
+        self.assertIsNone(signals_only.model)
+        models_only = run_pipeline(self.series, signals=False, max_workers=2, min_chunk_work=100)
+        self.assertIsNone(models_only.signals)
+
+    def test_map_series_keeps_order(self):
+        expected = [series_stats(s) for s in self.series]
+        self.assertEqual(map_series(series_stats, self.series, max_workers=3, min_chunk_work=100), expected)
+        self.assertEqual(map_series(series_stats, self.series, max_workers=1), expected)
+        self.assertEqual(map_series(series_stats, [], max_workers=2), [])
+
+if __name__ == '__main__':
+    unittest.main()
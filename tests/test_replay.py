@@ -0,0 +1,153 @@
+"""
+Unit tests for the record-and-replay module.
+"""
+import contextlib
+import gzip
+import io
+import json
+import math
+import os
+import tempfile
+import unittest
+
+import requests
+
+from src.nex_ai.cli import main
+from src.nex_ai.data_ingestion import fetch_token_pair_data, fetch_token_pairs_batch
+from src.nex_ai.replay import RecordingSession, ReplaySession, read_log
+from src.nex_ai.scanner import ManualClock, Scanner, make_fetcher
+
+def pair(address: str, price: float) -> dict:
+    return {'baseToken': {'address': address, 'symbol': address.upper()}, 'priceUsd': str(price)}
+
+class FakeApi:
+    """Stands in for a requests session: serves `prices[address]` and then bumps it."""
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get(self, url, timeout=None, headers=None):
+        addresses = url.rsplit('/', 1)[-1].split(',')
+        body = [pair(address, self.prices[address]) for address in addresses if address in self.prices]
+        for address in addresses:
+            if address in self.prices:
+                self.prices[address] += 1.0
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(body).encode()
+        return response
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'feed.jsonl.gz')
+        self.clock = ManualClock(1000.0)
+
+    def record(self, polls: int, every: float = 60.0) -> list:
+        """Records `polls` polls of two tokens, one every `every` seconds; returns the live prices."""
+        live = []
+        with RecordingSession(self.path, FakeApi({'aaa': 1.0, 'bbb': 10.0}), clock=self.clock) as session:
+            for _ in range(polls):
+                live.append([p['priceUsd'] for p in fetch_token_pairs_batch('solana', ['aaa', 'bbb'], session=session)])
+                self.clock.advance(every)
+        return live
+
+    def test_recording_round_trips(self):
+        live = self.record(3)
+        records = list(read_log(self.path))
+        self.assertEqual([r['ts'] for r in records], [1000.0, 1060.0, 1120.0])
+        self.assertEqual(records[0]['headers'], {'Content-Type': 'application/json'})
+
+        replay = ReplaySession(self.path, speed=math.inf)
+        replayed = [[p['priceUsd'] for p in fetch_token_pairs_batch('solana', ['aaa', 'bbb'], session=replay,
+                                                                    base_url='http://replay.invalid')]
+                    for _ in range(4)]
+        self.assertEqual(replayed, live + live[-1:]) # The last response repeats once the log runs out
+        self.assertTrue(replay.finished.is_set())
+
+    def test_timeline_follows_speed(self):
+        self.record(3)
+        clock = ManualClock(0.0)
+        replay = ReplaySession(self.path, speed=60.0, clock=clock)
+        prices = []
+        for _ in range(4):
+            prices.append(fetch_token_pairs_batch('solana', ['aaa', 'bbb'], session=replay)[0]['priceUsd'])
+            clock.advance(1.0) # One recorded minute
+        self.assertEqual(prices, ['1.0', '2.0', '3.0', '3.0'])
+
+    def test_play_paces_records(self):
+        self.record(5)
+        clock = ManualClock(0.0)
+        played = [(ts, response.json()[0]['priceUsd']) for ts, _, response in ReplaySession(self.path, speed=10.0, clock=clock).play()]
+        self.assertEqual(played[-1], (1240.0, '5.0'))
+        self.assertAlmostEqual(clock.now, 24.0) # 240 recorded seconds at 10x
+
+        clock = ManualClock(0.0)
+        self.assertEqual(len(list(ReplaySession(self.path, speed=math.inf, clock=clock).play())), 5)
+        self.assertEqual(clock.now, 0.0)
+
+    def test_unrecorded_url_and_truncated_log(self):
+        self.record(2)
+        replay = ReplaySession(self.path, speed=math.inf)
+        self.assertIsNone(fetch_token_pair_data('solana', 'ccc', session=replay))
+        self.assertIsNone(fetch_token_pair_data('ethereum', 'aaa', session=replay))
+
+        with gzip.open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(gzip.compress(data)[:-12]) # Cut into the last record and the gzip trailer
+        with self.assertLogs('nex_ai.replay', level='WARNING'):
+            records = list(read_log(self.path))
+        self.assertLessEqual(len(records), 2)
+        self.assertEqual(records[0]['url'], 'https://api.dexscreener.com/tokens/v1/solana/aaa,bbb')
+
+    def test_tokens_matched_per_address(self):
+        self.record(2)
+        replay = ReplaySession(self.path, speed=math.inf)
+        # Recorded as one 'aaa,bbb' batch, requested alone or grouped differently.
+        self.assertEqual(fetch_token_pair_data('solana', 'bbb', session=replay)['priceUsd'], '10.0')
+        pairs = fetch_token_pairs_batch('solana', ['ccc', 'bbb', 'aaa'], session=replay)
+        self.assertEqual([(p['baseToken']['address'], p['priceUsd']) for p in pairs], [('bbb', '11.0'), ('aaa', '1.0')])
+        self.assertFalse(replay.finished.is_set()) # 'aaa' has one more record
+        fetch_token_pairs_batch('solana', ['aaa'], session=replay)
+        self.assertTrue(replay.finished.is_set())
+
+    def scan(self, fetcher, clock, tokens, **kwargs) -> list:
+        results = []
+        scanner = Scanner(fetcher=fetcher, publish=results.append, clock=clock, min_interval=10.0, base_interval=30.0)
+        for token in tokens:
+            scanner.add('solana', token)
+        scanner.run(**kwargs)
+        return [(r.token_address, r.timestamp, r.price_usd) for r in results]
+
+    def test_scanner_round_trip(self):
+        api = FakeApi({'aaa': 1.0, 'bbb': 10.0})
+        with RecordingSession(self.path, api, clock=self.clock) as session:
+            live = self.scan(make_fetcher(session), self.clock, ['aaa', 'bbb'], max_iterations=12)
+
+        for speed in (math.inf, 60.0):
+            with self.subTest(speed=speed):
+                replay = ReplaySession(self.path, speed=speed, clock=ManualClock(0.0))
+                # Watching one token, so the recorded batches are regrouped.
+                replayed = self.scan(make_fetcher(replay), replay.scanner_clock(), ['bbb'],
+                                     stop_event=replay.finished, max_iterations=1000)
+                self.assertTrue(replay.finished.is_set())
+                self.assertEqual(replayed, [result for result in live if result[0] == 'bbb'])
+                self.assertGreater(len(replayed), 3)
+
+    def test_cli_replay_ends_with_the_log(self):
+        self.record(3)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main(['scan', '--chain', 'solana', 'aaa', 'bbb', '--replay', self.path, '--speed', 'inf'])
+        self.assertEqual(code, 0)
+        # Polls follow the scanner's schedule on the recorded timeline (t=0, 60,
+        # then about 30s later) and stop at the last record (t=120).
+        prices = [float(line.split()[1]) for line in output.getvalue().splitlines()[1:]]
+        self.assertEqual(prices, [1.0, 10.0, 2.0, 11.0, 2.0, 11.0])
+
+if __name__ == '__main__':
+    unittest.main()
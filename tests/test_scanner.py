@@ -0,0 +1,218 @@
+"""
+Unit tests for the scanner module.
+"""
+import queue
+import threading
+import unittest
+
+import requests
+
+from src.nex_ai.scanner import ManualClock, RateLimiter, Scanner
+from src.nex_ai.signal_generation import generate_trading_signals
+
+def http_error(status: int, headers: dict | None = None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+class FakeFetcher:
+    """Serves prices from per-token callables of the token's poll number; can fail on demand."""
+
+    def __init__(self, prices, volume_h1=0.0):
+        self.prices = prices
+        self.volume_h1 = volume_h1
+        self.calls = []
+        self.errors = []
+        self.polls = {}
+
+    def __call__(self, chain_id, addresses):
+        self.calls.append((chain_id, list(addresses)))
+        if self.errors:
+            raise self.errors.pop(0)
+        pairs = []
+        for address in addresses:
+            if address in self.prices:
+                n = self.polls[address] = self.polls.get(address, 0) + 1
+                pairs.append({'baseToken': {'address': address, 'symbol': address.upper()},
+                              'priceUsd': str(self.prices[address](n)), 'volume': {'h1': self.volume_h1}})
+        return pairs
+
+class TestScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = ManualClock(1000.0)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(2.0, burst=2, clock=self.clock)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertAlmostEqual(limiter.time_until_available(), 0.5)
+        self.clock.advance(0.5)
+        self.assertTrue(limiter.try_acquire())
+
+    def test_batches_respect_request_budget(self):
+        addresses = [f"t{i}" for i in range(65)]
+        fetcher = FakeFetcher({address: (lambda n: 1.0) for address in addresses})
+        scanner = Scanner(fetcher, clock=self.clock, requests_per_second=1.0)
+        for address in addresses:
+            scanner.add('solana', address)
+
+        self.assertEqual(scanner.run_once(), 1)  # Budget allows one request now
+        self.assertEqual(len(fetcher.calls[0][1]), 30)
+        self.assertEqual(scanner.seconds_until_next_poll(), 1.0)
+        self.clock.advance(1.0)
+        self.assertEqual(scanner.run_once(), 1)
+        self.clock.advance(1.0)
+        self.assertEqual(scanner.run_once(), 1)
+        self.assertEqual(sorted(sum((batch for _, batch in fetcher.calls), [])), sorted(addresses))
+        self.assertEqual(scanner.run_once(), 0)  # Nothing due until the base interval passes
+
+    def test_intervals_adapt_to_volatility_and_volume(self):
+        fetcher = FakeFetcher({
+            'calm': lambda n: 1.0,
+            'wild': lambda n: 1.0 + 0.05 * (n % 2),
+        })
+        scanner = Scanner(fetcher, clock=self.clock, requests_per_second=100.0, seed=1)
+        scanner.add('solana', 'calm')
+        scanner.add('solana', 'wild')
+        scanner.run(max_iterations=20)
+        self.assertEqual(scanner.interval('solana', 'calm'), 60.0)
+        self.assertLess(scanner.interval('solana', 'wild'), 1.5 * scanner.min_interval)
+
+        busy = Scanner(FakeFetcher({'busy': lambda n: 1.0}, volume_h1=1e6), clock=self.clock)
+        busy.add('solana', 'busy')
+        busy.run(max_iterations=10)
+        self.assertLess(busy.interval('solana', 'busy'), 60.0)
+
+    def test_backoff_on_retryable_errors(self):
+        fetcher = FakeFetcher({'a': lambda n: 1.0})
+        fetcher.errors = [http_error(503), http_error(429, {'Retry-After': '120'})]
+        scanner = Scanner(fetcher, clock=self.clock, backoff_base=2.0, seed=7)
+        scanner.add('solana', 'a')
+
+        self.assertEqual(scanner.run_once(), 1)
+        first_delay = scanner.backoff_until - self.clock.time()
+        self.assertTrue(1.0 <= first_delay <= 3.0)
+        self.assertEqual(scanner.run_once(), 0)
+        self.clock.advance(first_delay)
+        self.assertEqual(scanner.run_once(), 1)
+        self.assertGreaterEqual(scanner.backoff_until - self.clock.time(), 120.0)  # Retry-After wins
+        self.assertEqual(scanner.consecutive_failures, 2)
+
+        self.clock.advance(scanner.seconds_until_next_poll())
+        self.assertEqual(scanner.run_once(), 1)
+        self.assertEqual(scanner.consecutive_failures, 0)
+
+        # Same seed, same jitter.
+        replay = Scanner(FakeFetcher({}), clock=ManualClock(1000.0), backoff_base=2.0, seed=7)
+        replay.fetcher.errors = [http_error(503)]
+        replay.add('solana', 'a')
+        replay.run_once()
+        self.assertEqual(replay.backoff_until - 1000.0, first_delay)
+
+    def test_client_errors_do_not_back_off(self):
+        fetcher = FakeFetcher({'a': lambda n: 1.0})
+        fetcher.errors = [http_error(404)]
+        scanner = Scanner(fetcher, clock=self.clock)
+        scanner.add('solana', 'a')
+        scanner.run_once()
+        self.assertEqual(scanner.consecutive_failures, 0)
+        self.assertEqual(scanner.next_due(), self.clock.time() + scanner.min_interval)
+
+    def test_bad_payload_reschedules_batch(self):
+        fetcher = FakeFetcher({'a': lambda n: 1.0, 'b': lambda n: 2.0})
+        fetcher.errors = [ValueError("Expected a list of pairs, got dict.")]
+        scanner = Scanner(fetcher, clock=self.clock)
+        scanner.add('solana', 'a')
+        scanner.add('solana', 'b')
+        self.assertEqual(scanner.run_once(), 1)
+        self.assertEqual(scanner.next_due(), self.clock.time() + scanner.min_interval)
+        self.clock.advance(scanner.min_interval)
+        self.assertEqual(scanner.run_once(), 1)
+        self.assertEqual(fetcher.polls, {'a': 1, 'b': 1})
+
+    def test_run_survives_failing_cycles(self):
+        def publish(result):
+            raise RuntimeError("subscriber bug")
+
+        scanner = Scanner(FakeFetcher({'a': lambda n: 1.0}), publish=publish, clock=self.clock)
+        scanner.add('solana', 'a')
+        with self.assertLogs('nex_ai.scanner', level='ERROR'):
+            scanner.run(max_iterations=3)
+        self.assertEqual(len(scanner.fetcher.calls), 3) # Every cycle still polled the token
+
+    def test_watchlist_usable_during_requests(self):
+        in_flight, release = threading.Event(), threading.Event()
+        prices = FakeFetcher({'a': lambda n: 1.0})
+
+        def fetcher(chain_id, addresses):
+            in_flight.set()
+            release.wait(5)
+            return prices(chain_id, addresses)
+
+        scanner = Scanner(fetcher, clock=self.clock)
+        scanner.add('solana', 'a')
+        worker = threading.Thread(target=scanner.run_once)
+        worker.start()
+        self.assertTrue(in_flight.wait(5))
+        adder = threading.Thread(target=scanner.add, args=('solana', 'b'))
+        adder.start()
+        adder.join(1)
+        self.assertFalse(adder.is_alive()) # Not blocked by the request in flight
+        release.set()
+        worker.join(5)
+        self.assertEqual(sorted(scanner.watchlist()), [('solana', 'a'), ('solana', 'b')])
+
+    def test_publishes_incremental_signals(self):
+        prices = [10, 11, 12, 11, 10, 9, 8, 9, 10, 11, 12, 13, 12, 11, 10]
+        fetcher = FakeFetcher({'a': lambda n: prices[n - 1]})
+        results = queue.Queue()
+        scanner = Scanner(fetcher, publish=results, clock=self.clock, short_window=2, long_window=4)
+        scanner.add('solana', 'a')
+        scanner.run(max_iterations=len(prices))
+
+        published = [results.get_nowait() for _ in range(results.qsize())]
+        self.assertEqual([r.price_usd for r in published], prices)
+        self.assertEqual([r.signal for r in published], generate_trading_signals(prices, 2, 4))
+
+        seen = []
+        callback = Scanner(FakeFetcher({'a': lambda n: 1.0}), publish=seen.append, clock=self.clock)
+        callback.add('solana', 'a')
+        callback.run_once()
+        self.assertEqual(seen[0].token_address, 'a')
+
+    def test_matches_addresses_case_insensitively(self):
+        checksummed = '0xAbCdEf0000000000000000000000000000000001'
+        fetcher = FakeFetcher({checksummed: lambda n: 2.5})
+        seen = []
+        scanner = Scanner(lambda chain_id, addresses: fetcher(chain_id, [checksummed]),
+                          publish=seen.append, clock=self.clock)
+        scanner.add('ethereum', checksummed.lower())
+        scanner.run_once()
+        self.assertEqual([(r.token_address, r.price_usd) for r in seen], [(checksummed.lower(), 2.5)])
+
+    def test_matches_quote_token(self):
+        def fetcher(chain_id, addresses):
+            return [{'baseToken': {'address': 'meme'}, 'quoteToken': {'address': 'SOL'},
+                     'priceUsd': '0.5', 'priceNative': '0.0025'}]
+        seen = []
+        scanner = Scanner(fetcher, publish=seen.append, clock=self.clock)
+        scanner.add('solana', 'sol')
+        scanner.add('solana', 'meme')
+        scanner.run_once()
+        prices = {r.token_address: r.price_usd for r in seen}
+        self.assertEqual(prices['meme'], 0.5)
+        self.assertAlmostEqual(prices['sol'], 200.0)
+
+    def test_remove_drops_token(self):
+        fetcher = FakeFetcher({'a': lambda n: 1.0})
+        scanner = Scanner(fetcher, clock=self.clock)
+        scanner.add('solana', 'a')
+        scanner.remove('solana', 'a')
+        self.assertEqual(scanner.run_once(), 0)
+        self.assertEqual(scanner.watchlist(), [])
+
+if __name__ == '__main__':
+    unittest.main()
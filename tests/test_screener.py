@@ -0,0 +1,100 @@
+"""
+Unit tests for the screener index.
+"""
+import math
+import random
+import unittest
+
+from src.nex_ai.data_ingestion import PairSnapshot
+from src.nex_ai.screener import ScreenerIndex
+
+CHAINS = {'solana': ('raydium', 'orca', 'meteora'), 'base': ('uniswap', 'aerodrome')}
+
+def make_snapshot(rng: random.Random, i: int, **fields) -> PairSnapshot:
+    chain_id = rng.choice(sorted(CHAINS))
+    values = dict.fromkeys(PairSnapshot._fields, math.nan)
+    values.update(chain_id=chain_id, dex_id=rng.choice(CHAINS[chain_id]), pair_address=f'pair{i}',
+                  base_address=f'token{i}', base_symbol=f'T{i}', quote_address='', quote_symbol='SOL',
+                  price_usd=rng.lognormvariate(0, 2), liquidity_usd=rng.lognormvariate(11, 2),
+                  volume_h1=rng.lognormvariate(8, 2), price_change_h1=rng.gauss(0, 5),
+                  fdv=rng.lognormvariate(14, 2) if rng.random() < 0.8 else math.nan)
+    values.update(fields)
+    return PairSnapshot(**values)
+
+def brute_force(snapshots, chain_id=None, dex_id=None, where=None, sort_by=None, descending=True, top=None):
+    matches = [s for s in snapshots
+               if (chain_id is None or s.chain_id == chain_id) and (dex_id is None or s.dex_id == dex_id)
+               and all((low is None or getattr(s, field) >= low) and (high is None or getattr(s, field) <= high)
+                       for field, (low, high) in (where or {}).items())]
+    if sort_by is not None:
+        matches = sorted((s for s in matches if not math.isnan(getattr(s, sort_by))),
+                         key=lambda s: getattr(s, sort_by), reverse=descending)
+    return matches if top is None else matches[:top]
+
+class TestScreenerIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(3)
+        self.snapshots = {i: make_snapshot(self.rng, i) for i in range(2000)}
+        self.index = ScreenerIndex()
+        self.index.update(self.snapshots.values())
+
+    def assertMatchesBruteForce(self, sort_by=None, **query):
+        expected = brute_force(self.snapshots.values(), sort_by=sort_by, **query)
+        actual = self.index.query(sort_by=sort_by, **query)
+        if sort_by is None:
+            self.assertCountEqual(actual, expected)
+        else:
+            self.assertEqual(actual, expected)
+
+    def test_queries_match_brute_force(self):
+        queries = [
+            dict(chain_id='solana', where={'liquidity_usd': (100_000, None)}, sort_by='volume_h1', top=50),
+            dict(chain_id='solana', dex_id='orca', sort_by='price_change_h1', descending=False, top=10),
+            dict(where={'liquidity_usd': (None, 1_000)}, sort_by='volume_h1', top=20), # Narrow filter: scanned, not walked
+            dict(where={'fdv': (1e5, 1e7), 'price_change_h1': (0, None)}, sort_by='fdv'),
+            dict(dex_id='uniswap', where={'volume_h1': (1e3, 1e4)}),
+            dict(chain_id='base', top=5000),
+            dict(sort_by='fdv', top=3000), # NaN FDVs are never ranked
+            dict(chain_id='unknown', sort_by='volume_h1', top=5),
+        ]
+        for query in queries:
+            with self.subTest(**query):
+                self.assertMatchesBruteForce(**query)
+        self.assertEqual(self.index.query(top=0), [])
+
+    def test_incremental_updates(self):
+        for step in range(3000):
+            i = self.rng.randrange(2500)
+            if self.rng.random() < 0.1:
+                old = self.snapshots.pop(i, None)
+                self.assertEqual(self.index.remove(old.chain_id if old else 'solana', f'pair{i}'), old is not None)
+            elif i in self.snapshots and self.rng.random() < 0.5:
+                # Same pair, same chain, some fields moved (others unchanged, some DEX moves).
+                self.snapshots[i] = self.snapshots[i]._replace(
+                    volume_h1=self.rng.lognormvariate(8, 2),
+                    dex_id=self.rng.choice(CHAINS[self.snapshots[i].chain_id]) if step % 7 == 0 else self.snapshots[i].dex_id)
+                self.index.upsert(self.snapshots[i])
+            else:
+                snapshot = make_snapshot(self.rng, i)
+                if i in self.snapshots:
+                    self.index.remove(self.snapshots[i].chain_id, f'pair{i}') # The pair may have changed chain
+                self.snapshots[i] = snapshot
+                self.index.upsert(snapshot)
+        self.assertEqual(len(self.index), len(self.snapshots))
+        self.assertMatchesBruteForce(chain_id='solana', where={'liquidity_usd': (100_000, None)}, sort_by='volume_h1', top=50)
+        self.assertMatchesBruteForce(dex_id='raydium', where={'volume_h1': (1e3, 1e5)}, sort_by='liquidity_usd')
+
+    def test_raw_pairs_and_errors(self):
+        index = ScreenerIndex(fields=('volume_h1',))
+        index.upsert({'chainId': 'solana', 'dexId': 'raydium', 'pairAddress': 'P', 'volume': {'h1': 5.0}})
+        self.assertEqual(index.get('solana', 'P').volume_h1, 5.0)
+        with self.assertRaises(ValueError):
+            index.upsert({'chainId': 'solana', 'volume': {'h1': 5.0}})
+        with self.assertRaises(ValueError):
+            index.query(sort_by='fdv')
+        with self.assertRaises(ValueError):
+            ScreenerIndex(fields=('volume',))
+
+if __name__ == '__main__':
+    unittest.main()
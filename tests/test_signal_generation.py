@@ -1,8 +1,49 @@
 """
 Unit tests for the signal_generation module.
 """
+import json
+import math
+import random
 import unittest
-from src.nex_ai.signal_generation import calculate_sma, generate_trading_signals
+from unittest import mock
+
+import numpy as np
+
+from src.nex_ai.signal_generation import (
+    SIGNAL_BUY,
+    SIGNAL_SELL,
+    IndicatorStream,
+    SignalStream,
+    calculate_rsi,
+    calculate_sma,
+    calculate_sma_array,
+    compute_indicators,
+    generate_trading_signals,
+    generate_trading_signals_array,
+    indicator_columns,
+    parse_indicator,
+    rolling_means,
+)
+
+INDICATOR_SPECS = ['returns', 'log_returns', 'sma_10', 'ema_12', 'std_20', 'zscore_20', 'bollinger_20_2.5',
+                   'volatility_15', 'roc_5', 'momentum_7', 'rsi', 'rsi_3', 'macd']
+
+def naive_sma(prices, window):
+    # Reference implementation: re-sums each window.
+    return [None if i < window - 1 else sum(prices[i - window + 1:i + 1]) / window
+            for i in range(len(prices))]
+
+def naive_signals(prices, short_window, long_window):
+    # Reference implementation: the original per-index crossover loop.
+    short_sma, long_sma = naive_sma(prices, short_window), naive_sma(prices, long_window)
+    signals = [None] * len(prices)
+    for i in range(1, len(prices)):
+        if None not in (short_sma[i], long_sma[i], short_sma[i - 1], long_sma[i - 1]):
+            if short_sma[i] > long_sma[i] and short_sma[i - 1] <= long_sma[i - 1]:
+                signals[i] = 'BUY'
+            elif short_sma[i] < long_sma[i] and short_sma[i - 1] >= long_sma[i - 1]:
+                signals[i] = 'SELL'
+    return signals
 
 class TestSignalGeneration(unittest.TestCase):
 
@@ -47,5 +88,171 @@ class TestSignalGeneration(unittest.TestCase):
         # Test with not enough data
         self.assertEqual(generate_trading_signals([1,2,3,4], short_window=2, long_window=5), [None, None, None, None])
 
+    def test_rolling_means_matches_naive_sma(self):
+        rng = random.Random(7)
+        prices = [rng.randint(1, 500) for _ in range(300)]
+        means = rolling_means(prices, (1, 5, 30, 300, 301))
+        for window, sma in means.items():
+            expected = [np.nan if v is None else v for v in naive_sma(prices, window)]
+            np.testing.assert_array_equal(sma, expected)
+
+        with self.assertRaises(ValueError):
+            rolling_means(prices, (0,))
+
+    def test_calculate_sma_array_warm_up_is_nan(self):
+        sma = calculate_sma_array(np.array([10.0, 20.0, 30.0, 40.0]), 3)
+        self.assertTrue(np.isnan(sma[:2]).all())
+        np.testing.assert_allclose(sma[2:], [20.0, 30.0])
+
+    def test_generate_trading_signals_array_matches_list_api(self):
+        rng = random.Random(11)
+        prices = [100 + rng.uniform(-5, 5) for _ in range(2000)]
+        codes = generate_trading_signals_array(prices, short_window=5, long_window=20)
+        signals = generate_trading_signals(prices, short_window=5, long_window=20)
+
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual([i for i, s in enumerate(signals) if s == 'BUY'],
+                         np.flatnonzero(codes == SIGNAL_BUY).tolist())
+        self.assertEqual([i for i, s in enumerate(signals) if s == 'SELL'],
+                         np.flatnonzero(codes == SIGNAL_SELL).tolist())
+        self.assertIn('BUY', signals)
+
+        # Not enough data yields no signals
+        np.testing.assert_array_equal(generate_trading_signals_array([1, 2, 3], 2, 5), [0, 0, 0])
+
+    def test_signal_stream_matches_batch(self):
+        rng = random.Random(5)
+        prices = [rng.gauss(100, 3) for _ in range(3000)]
+        stream = SignalStream(short_window=7, long_window=25)
+        streamed = stream.update_many(prices[:10])
+        streamed += [stream.update(price) for price in prices[10:]]
+        self.assertEqual(streamed, generate_trading_signals(prices, short_window=7, long_window=25))
+
+    def test_flat_and_rounded_series_match_original_loop(self):
+        # Cumulative-sum residue must not turn equal SMAs into crossovers.
+        flat = [100.0] * 3 + [0.1234567] * 40
+        self.assertEqual(calculate_sma(flat, 5), naive_sma(flat, 5))
+        self.assertEqual(calculate_sma(flat, 5)[-1], 0.1234567)
+
+        rng = random.Random(17)
+        series = [flat]
+        for _ in range(60):
+            walk = [round(50 * math.exp(rng.gauss(0, 0.3)), 2)]
+            for _ in range(rng.randrange(200, 700)):
+                walk.append(max(0.01, round(walk[-1] * math.exp(rng.gauss(0, 0.02)), rng.choice((2, 4)))))
+            series.append(walk + [walk[-1]] * rng.randrange(0, 120)) # Often ends in a flat run
+        for prices in series:
+            expected = naive_signals(prices, 5, 20)
+            self.assertEqual(generate_trading_signals(prices, 5, 20), expected)
+            self.assertEqual(SignalStream(5, 20).update_many(prices), expected)
+            self.assertEqual(calculate_sma(prices, 20), naive_sma(prices, 20))
+
+    def test_signal_stream_state_round_trip(self):
+        rng = random.Random(9)
+        prices = [rng.uniform(0.5, 1.5) for _ in range(500)]
+        uninterrupted = SignalStream(5, 15).update_many(prices)
+
+        stream = SignalStream(5, 15)
+        first_half = stream.update_many(prices[:250])
+        restored = SignalStream.from_state(stream.get_state())
+        self.assertEqual(first_half + restored.update_many(prices[250:]), uninterrupted)
+        self.assertEqual(restored.ticks, len(prices))
+
+    def test_parse_indicator(self):
+        self.assertEqual(parse_indicator('rsi'), ('rsi', (14,)))
+        self.assertEqual(parse_indicator('bollinger_10'), ('bollinger', (10, 2.0)))
+        self.assertEqual(parse_indicator('macd_5_13_4'), ('macd', (5, 13, 4)))
+        self.assertEqual(parse_indicator('log_returns'), ('log_returns', ()))
+        self.assertEqual(indicator_columns('macd'), ['macd', 'macd_signal', 'macd_hist'])
+        for spec in ('vwap_10', 'sma_0', 'sma_x', 'sma_5_5', 'returns_3'):
+            with self.assertRaises(ValueError):
+                parse_indicator(spec)
+
+    def test_compute_indicators_matches_references(self):
+        rng = np.random.default_rng(3)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+        columns = compute_indicators(prices, INDICATOR_SPECS)
+        self.assertEqual(list(columns), [c for spec in INDICATOR_SPECS for c in indicator_columns(spec)])
+        self.assertTrue(all(len(values) == len(prices) for values in columns.values()))
+
+        np.testing.assert_array_equal(columns['sma_10'], calculate_sma_array(prices, 10))
+        std = np.array([np.nan] * 19 + [prices[i - 19:i + 1].std() for i in range(19, 500)])
+        np.testing.assert_allclose(columns['std_20'], std, rtol=1e-9)
+        np.testing.assert_allclose(columns['bollinger_20_2.5_upper'], columns['bollinger_20_2.5_middle'] + 2.5 * std, rtol=1e-12)
+        np.testing.assert_allclose(columns['zscore_20'], (prices - calculate_sma_array(prices, 20)) / std, rtol=1e-9)
+        log_returns = np.diff(np.log(prices))
+        volatility = [np.nan] * 15 + [log_returns[i - 15:i].std() for i in range(15, 500)]
+        np.testing.assert_allclose(columns['volatility_15'], volatility, rtol=1e-9)
+        np.testing.assert_allclose(columns['roc_5'][5:], prices[5:] / prices[:-5] - 1)
+
+        ema, alpha = [prices[0]], 2 / 13
+        for price in prices[1:]:
+            ema.append(alpha * price + (1 - alpha) * ema[-1])
+        np.testing.assert_allclose(columns['ema_12'], ema, rtol=1e-12)
+
+        # Wilder's RSI by hand: changes 1, 1, -1 -> average gain 2/3, average loss 1/3.
+        self.assertEqual(calculate_rsi([1, 2, 3, 2], period=3)[:3], [None, None, None])
+        self.assertAlmostEqual(calculate_rsi([1, 2, 3, 2], period=3)[3], 100 - 100 / 3)
+        self.assertEqual(calculate_rsi([1, 2, 3, 4, 5], period=2)[2:], [100.0, 100.0, 100.0])
+        self.assertEqual(calculate_rsi([5] * 4, period=2)[2:], [50.0, 50.0])
+
+    def test_compute_indicators_short_and_empty_input(self):
+        columns = compute_indicators([1.0, 2.0], ['roc_5', 'rsi', 'volatility_5', 'macd'])
+        self.assertTrue(np.isnan(columns['roc_5']).all())
+        self.assertTrue(np.isnan(columns['rsi']).all())
+        self.assertEqual(len(compute_indicators([], INDICATOR_SPECS)['macd_hist']), 0)
+
+    def test_ema_without_scipy(self):
+        prices = np.linspace(1, 2, 200) + np.sin(np.arange(200))
+        expected = compute_indicators(prices, ['ema_9', 'macd', 'rsi'])
+        with mock.patch('src.nex_ai.signal_generation._lfilter', None): # As resolved without SciPy
+            fallback = compute_indicators(prices, ['ema_9', 'macd', 'rsi'])
+        for column, values in expected.items():
+            np.testing.assert_allclose(fallback[column], values, rtol=1e-12, equal_nan=True)
+
+    def test_indicator_stream_matches_batch(self):
+        rng = np.random.default_rng(8)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 1500)))
+        expected = compute_indicators(prices, INDICATOR_SPECS)
+
+        stream = IndicatorStream(INDICATOR_SPECS)
+        first = stream.update_many(prices[:700])
+        restored = IndicatorStream.from_state(json.loads(json.dumps(stream.get_state())))
+        second = restored.update_many(prices[700:])
+        for column, values in expected.items():
+            streamed = np.concatenate([first[column], second[column]])
+            np.testing.assert_allclose(streamed, values, rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=column)
+        self.assertEqual(set(stream.update(101.0)), set(expected))
+
+    def test_rsi_uses_wilder_seed(self):
+        rng = np.random.default_rng(5)
+        prices = 10 + np.cumsum(rng.normal(0, 0.5, 60))
+        period = 14
+        changes = np.diff(prices)
+        gain, loss = np.maximum(changes[:period], 0).mean(), np.maximum(-changes[:period], 0).mean()
+        expected = [np.nan] * period + [100 - 100 / (1 + gain / loss)]
+        for change in changes[period:]:
+            gain += (max(change, 0) - gain) / period
+            loss += (max(-change, 0) - loss) / period
+            expected.append(100 - 100 / (1 + gain / loss))
+        np.testing.assert_allclose(compute_indicators(prices, ['rsi'])['rsi'], expected, rtol=1e-10, equal_nan=True)
+        np.testing.assert_allclose(IndicatorStream(['rsi']).update_many(prices)['rsi'], expected, rtol=1e-10, equal_nan=True)
+
+    def test_zero_prices(self):
+        # Dexscreener reports "0" for some prices: no errors, no warnings, NaN where undefined.
+        self.assertEqual(IndicatorStream(['sma_3']).update_many([1.0, 0.0, 1.0])['sma_3'][-1], 2 / 3)
+        prices = np.array([1.0, 2.0, 0.0, 3.0, 4.0, 5.0, 6.0, 7.0, 0.0, 8.0, 9.0, 10.0, 11.0, 12.0])
+        specs = ['returns', 'log_returns', 'roc_2', 'volatility_3', 'rsi_3', 'sma_3']
+        with np.errstate(all='raise'):
+            expected = compute_indicators(prices, specs)
+        self.assertTrue(np.isnan(expected['log_returns'][[2, 3, 8, 9]]).all())
+        self.assertTrue(np.isnan(expected['volatility_3'][2:6]).all())
+        self.assertTrue(np.isfinite(expected['volatility_3'][6:8]).all())
+        self.assertTrue(np.isnan(expected['roc_2'][[4, 10]]).all())
+        self.assertTrue(np.isfinite(expected['volatility_3'][12:]).all())
+        streamed = IndicatorStream(specs).update_many(prices)
+        for column, values in expected.items():
+            np.testing.assert_allclose(streamed[column], values, rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=column)
+
 if __name__ == '__main__':
     unittest.main()
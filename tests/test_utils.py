@@ -0,0 +1,115 @@
+"""
+Unit tests for the utils module (logging, metrics and profiling).
+"""
+import contextlib
+import io
+import json
+import logging
+import sys
+import unittest
+
+from src.nex_ai.models import train_price_prediction_model
+from src.nex_ai.signal_generation import generate_trading_signals
+from src.nex_ai.utils import (
+    METRICS,
+    Histogram,
+    MetricsRegistry,
+    StructuredFormatter,
+    configure_logging,
+    disable_profiling,
+    enable_profiling,
+    get_logger,
+    instrument,
+    profile_stats,
+    timed,
+)
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_snapshot(self):
+        histogram = Histogram(buckets=(1, 2, 5, 10))
+        for value in (0.5, 1.5, 1.5, 3, 20):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 5)
+        self.assertEqual((snapshot['min'], snapshot['max']), (0.5, 20))
+        self.assertEqual(snapshot['p50'], 2)
+        self.assertEqual(snapshot['p99'], 20) # Overflow bucket reports the max
+        self.assertEqual(Histogram().snapshot(), {'count': 0, 'sum': 0.0})
+
+    def test_registry_snapshot_and_export(self):
+        registry = MetricsRegistry()
+        registry.increment('rows', 3)
+        registry.increment('rows')
+        registry.observe('latency', 0.01)
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['counters'], {'rows': 4})
+        self.assertEqual(snapshot['histograms']['latency']['count'], 1)
+        self.assertEqual(json.loads(registry.export_json())['counters'], {'rows': 4})
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {'counters': {}, 'histograms': {}})
+
+    def test_timed_counts_calls_and_errors(self):
+        @instrument('test.stage')
+        def work(fail=False):
+            if fail:
+                raise RuntimeError('boom')
+            return 42
+
+        METRICS.reset()
+        self.assertEqual(work(), 42)
+        with self.assertRaises(RuntimeError):
+            work(fail=True)
+        snapshot = METRICS.snapshot()
+        self.assertEqual(snapshot['counters']['test.stage.calls'], 2)
+        self.assertEqual(snapshot['counters']['test.stage.errors'], 1)
+        self.assertEqual(snapshot['histograms']['test.stage.seconds']['count'], 2)
+
+    def test_hot_paths_are_silent_and_instrumented(self):
+        METRICS.reset()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            generate_trading_signals(list(range(100)), 5, 20)
+            train_price_prediction_model([float(i % 7) for i in range(50)], look_back=3)
+        self.assertEqual(output.getvalue(), '')
+        counters = METRICS.snapshot()['counters']
+        self.assertEqual(counters['signals.rows'], 100)
+        self.assertEqual(counters['models.rows_fitted'], 47)
+        self.assertEqual(counters['models.fit.calls'], 1)
+
+class TestProfilingAndLogging(unittest.TestCase):
+
+    def test_profiling_per_stage(self):
+        enable_profiling('test.profiled')
+        try:
+            with timed('test.profiled'):
+                sorted(range(1000), key=lambda x: -x)
+            with timed('test.unprofiled'):
+                pass
+            self.assertIn('sorted', profile_stats('test.profiled'))
+            self.assertEqual(profile_stats('test.unprofiled'), '')
+        finally:
+            disable_profiling()
+        self.assertEqual(profile_stats('test.profiled'), '')
+
+    def test_structured_logging(self):
+        stream = io.StringIO()
+        handler = configure_logging('DEBUG', structured=True, stream=stream)
+        try:
+            get_logger('src.nex_ai.example').info('fetched %d pairs', 3, extra={'chain': 'solana'})
+        finally:
+            logging.getLogger('nex_ai').removeHandler(handler)
+            logging.getLogger('nex_ai').setLevel(logging.NOTSET)
+        entry = json.loads(stream.getvalue())
+        self.assertEqual((entry['logger'], entry['level'], entry['msg']), ('nex_ai.example', 'INFO', 'fetched 3 pairs'))
+        self.assertEqual(entry['chain'], 'solana')
+
+    def test_formatter_includes_exceptions(self):
+        try:
+            raise ValueError('bad')
+        except ValueError:
+            record = logging.LogRecord('nex_ai', logging.ERROR, __file__, 1, 'failed', (), sys.exc_info())
+        self.assertIn('ValueError', json.loads(StructuredFormatter().format(record))['exc'])
+
+if __name__ == '__main__':
+    unittest.main()